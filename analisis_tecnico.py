@@ -8,6 +8,8 @@ import sys
 import json
 import os
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
@@ -15,17 +17,35 @@ from src.binance_client import BinanceClient
 from src.indicators import TechnicalIndicators
 from src.evaluator import ConditionEvaluator
 from src.reporter import Reporter
+from src.kline_store import KlineStore
+from src.indicator_cache import IndicatorCache
+from src.resampler import KlineResampler
+from src.scanner import MarketScanner
 
 
 class TradingAnalysis:
     """Clase principal para análisis técnico"""
 
-    def __init__(self):
+    # Símbolos por defecto del escáner (se reemplazan con el archivo simbolos.txt)
+    DEFAULT_SCAN_SYMBOLS = [
+        "BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT", "ADAUSDT",
+        "AVAXUSDT", "LINKUSDT", "DOTUSDT", "LTCUSDT", "TRXUSDT", "BCHUSDT", "NEARUSDT",
+        "ATOMUSDT", "UNIUSDT", "APTUSDT", "ARBUSDT", "OPUSDT", "FILUSDT"
+    ]
+    SCAN_SYMBOLS_FILE = "simbolos.txt"
+
+    def __init__(self, symbol: str = "ETHUSDT", base_interval: Optional[str] = None):
         self.client = BinanceClient()
         self.reporter = Reporter()
         self.evaluator = ConditionEvaluator()
         self.state_file = "estado.json"
-        self.symbol = "ETHUSDT"
+        self.symbol = symbol
+        self.store = KlineStore()
+        # Indicadores memoizados por vela cerrada (solo se recalcula la vela en progreso)
+        self.indicator_cache = IndicatorCache()
+        # Intervalo base (ej: '5m') desde el que se construyen localmente los
+        # timeframes superiores; None = descargar cada timeframe por separado
+        self.base_interval = base_interval
 
     def load_state(self) -> dict:
         """Carga el estado guardado desde archivo"""
@@ -64,50 +84,197 @@ class TradingAnalysis:
         except Exception as e:
             print(f"Error guardando estado: {e}")
 
-    def get_klines_dataframe(self, interval: str, limit: int = 50, use_spot: bool = False) -> pd.DataFrame:
+    def sync_klines(self, interval: str, limit: int = 50, use_spot: bool = False) -> np.ndarray:
         """
-        Obtiene velas de Binance y las convierte a DataFrame.
+        Sincroniza el almacén local con Binance y devuelve las últimas `limit` velas.
+        Solo descarga las velas posteriores a la última vela cerrada guardada
+        (startTime), actualizando la vela que seguía en progreso.
+
+        Args:
+            interval: Timeframe (4h, 1h, 15m, 5m)
+            limit: Número de velas a devolver
+            use_spot: Si True, usa el mercado SPOT. Si False, FUTUROS (default)
+
+        Returns:
+            Array estructurado con las últimas `limit` velas
+        """
+        market = 'spot' if use_spot else 'futures'
+        interval_ms = BinanceClient.INTERVAL_MS.get(interval)
+
+        stored = self.store.tail(market, self.symbol, interval, limit)
+
+        # Solo se puede sincronizar incrementalmente si hay suficientes velas
+        # guardadas y son contiguas (intervalos de duración fija)
+        incremental = (
+            interval_ms is not None
+            and len(stored) >= limit
+            and bool(np.all(np.diff(stored['open_time']) == interval_ms))
+        )
+
+        if incremental:
+            # La última vela guardada pudo estar en progreso: descargar desde su apertura
+            last_open = int(stored['open_time'][-1])
+            now_ms = self.client.server_now_ms()
+            missing = (now_ms - last_open) // interval_ms + 1
+
+            max_page = self._max_page(use_spot)
+            if missing < max_page:
+                # Margen de una vela por posible desfase del reloj local
+                page = int(missing) + 1
+                while True:
+                    new_klines = self.client.get_klines_array(
+                        self.symbol, interval, page, start_time=last_open, use_spot=use_spot
+                    )
+                    self.store.upsert(market, self.symbol, interval, new_klines)
+                    # Página incompleta: ya se alcanzó la vela en progreso
+                    if len(new_klines) < page:
+                        break
+                    last_open = int(new_klines['open_time'][-1])
+                    page = max_page
+                return self.store.tail(market, self.symbol, interval, limit)
+
+        # Descarga completa: primera vez, historial insuficiente o hueco demasiado grande
+        new_klines = self._download_klines(interval, limit, use_spot)
+        has_gap = (
+            len(stored) == 0
+            or interval_ms is None
+            or new_klines['open_time'][0] > stored['open_time'][-1] + interval_ms
+        )
+        self.store.upsert(market, self.symbol, interval, new_klines, replace=has_gap)
+        return new_klines[-limit:]
+
+    @staticmethod
+    def _max_page(use_spot: bool) -> int:
+        """Máximo de velas por solicitud de /klines en cada mercado"""
+        return BinanceClient.MAX_KLINES_SPOT if use_spot else BinanceClient.MAX_KLINES
+
+    def _download_klines(self, interval: str, limit: int, use_spot: bool) -> np.ndarray:
+        """
+        Descarga las últimas `limit` velas. Si superan el máximo por solicitud,
+        pagina hacia adelante (startTime) desde la vela que corresponde.
+        """
+        page = self._max_page(use_spot)
+        interval_ms = BinanceClient.INTERVAL_MS.get(interval)
+        if limit <= page or interval_ms is None:
+            return self.client.get_klines_array(self.symbol, interval, min(limit, page), use_spot=use_spot)
+
+        now_ms = self.client.server_now_ms()
+        current_open, _ = self.client.candle_bounds(interval, now_ms)
+        start_time = current_open - (limit - 1) * interval_ms
+        pages = []
+        while start_time <= now_ms:
+            klines = self.client.get_klines_array(
+                self.symbol, interval, page, start_time=start_time, use_spot=use_spot
+            )
+            pages.append(klines)
+            if len(klines) < page:
+                break
+            start_time = int(klines['open_time'][-1]) + interval_ms
+        return np.concatenate(pages)[-limit:]
+
+    def get_klines_dataframe(self, interval: str, limit: int = 50, use_spot: bool = False,
+                             compact: bool = False) -> pd.DataFrame:
+        """
+        Obtiene velas (desde el almacén local sincronizado con Binance) como DataFrame.
 
         Args:
             interval: Timeframe (4h, 1h, 15m, 5m)
             limit: Número de velas
             use_spot: Si True, obtiene datos de SPOT. Si False, obtiene de FUTUROS (default)
+            compact: Si True, DataFrame compacto (float32, sin datetime) para historiales largos
 
         Returns:
             DataFrame con datos OHLCV
         """
-        if use_spot:
-            klines = self.client.get_klines_spot(self.symbol, interval, limit)
-        else:
-            klines = self.client.get_klines(self.symbol, interval, limit)
+        klines = self.sync_klines(interval, limit, use_spot)
+
+        return BinanceClient.klines_to_dataframe(klines, compact=compact)
 
-        df = pd.DataFrame(klines)
-        df['datetime'] = pd.to_datetime(df['open_time'], unit='ms')
-        df = df[['datetime', 'open', 'high', 'low', 'close', 'volume',
-                'open_time', 'close_time']]
+    def fetch_timeframes(self, intervals: List[str], limit: int = 50) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+        """
+        Descarga en paralelo las velas de FUTUROS y SPOT de varios timeframes.
+        Todas las solicitudes (mercado, intervalo) se lanzan a la vez, por lo que
+        el tiempo total es cercano al de la solicitud más lenta.
+        Cada solicitud conserva los reintentos de BinanceClient.
 
-        return df
+        Con base_interval, los timeframes que son múltiplos del intervalo base
+        se construyen localmente (KlineResampler) desde una sola sincronización
+        del intervalo base por mercado.
 
-    def analyze_timeframe(self, interval: str, limit: int = 50) -> dict:
+        Args:
+            intervals: Timeframes a descargar (ej: ['4h', '1h', '15m'])
+            limit: Número de velas por solicitud
+
+        Returns:
+            Diccionario {intervalo: (df_futures, df_spot)}
+        """
+        derived = [
+            interval for interval in intervals
+            if self.base_interval and KlineResampler.can_resample(self.base_interval, interval)
+        ]
+        requests = {
+            (interval, use_spot): limit
+            for interval in intervals if interval not in derived for use_spot in (False, True)
+        }
+        if derived:
+            # Velas base para `limit` velas completas del timeframe más largo
+            # (el primer bucket puede quedar incompleto y se descarta)
+            base_limit = limit * max(KlineResampler.ratio(self.base_interval, i) for i in derived)
+            for use_spot in (False, True):
+                job = (self.base_interval, use_spot)
+                requests[job] = max(base_limit, requests.get(job, 0))
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as executor:
+            pending = {
+                job: executor.submit(self.sync_klines, job[0], job_limit, job[1])
+                for job, job_limit in requests.items()
+            }
+            # result() propaga la excepción original de la solicitud que falló
+            results = {job: future.result() for job, future in pending.items()}
+
+        frames = {}
+        for interval in intervals:
+            pair = []
+            for use_spot in (False, True):
+                if interval in derived:
+                    klines = KlineResampler.resample(
+                        results[(self.base_interval, use_spot)], self.base_interval, interval
+                    )
+                else:
+                    klines = results[(interval, use_spot)]
+                pair.append(BinanceClient.klines_to_dataframe(klines[-limit:]))
+            frames[interval] = tuple(pair)
+        return frames
+
+    def analyze_timeframe(self, interval: str, limit: int = 50,
+                          df_futures: pd.DataFrame = None, df_spot: pd.DataFrame = None,
+                          indicators: dict = None, use_cache: bool = True) -> dict:
         """
         Analiza un timeframe específico.
         MACD y Volumen se calculan con datos de SPOT, el resto con FUTUROS.
+        Sin velas SPOT (df_spot None) MACD y Volumen también usan FUTUROS.
 
         Args:
             interval: Timeframe a analizar
             limit: Número de velas a obtener
+            df_futures: Velas de FUTUROS ya descargadas (opcional)
+            df_spot: Velas de SPOT ya descargadas (opcional, solo junto con df_futures;
+                     None = par sin mercado SPOT)
+            indicators: Indicadores ya calculados para df_futures/df_spot (opcional, ej: panel del escáner)
+            use_cache: Memoizar los indicadores de self.symbol (False si las velas son de otro símbolo)
 
         Returns:
             Diccionario con análisis completo
         """
-        # Obtener datos de FUTUROS
-        df_futures = self.get_klines_dataframe(interval, limit, use_spot=False)
-
-        # Obtener datos de SPOT para MACD y Volumen
-        df_spot = self.get_klines_dataframe(interval, limit, use_spot=True)
+        # Obtener datos de FUTUROS y SPOT (en paralelo) si no se recibieron
+        if df_futures is None:
+            df_futures, df_spot = self.fetch_timeframes([interval], limit)[interval]
 
-        # Calcular indicadores (MACD y Volumen usan datos SPOT)
-        indicators = TechnicalIndicators.calculate_all_indicators(df_futures, df_spot)
+        # Calcular indicadores (MACD y Volumen con SPOT, o con FUTUROS si df_spot es None)
+        if indicators is None and use_cache:
+            indicators = self.indicator_cache.calculate_all_indicators(self.symbol, interval, df_futures, df_spot)
+        elif indicators is None:
+            indicators = TechnicalIndicators.calculate_all_indicators(df_futures, df_spot)
 
         # Clasificar estados
         ema_position = self.evaluator.classify_ema_position(
@@ -192,10 +359,13 @@ class TradingAnalysis:
         if 'last_candle_close_time' not in old_timeframe_state:
             return True
 
-        # Obtener última vela del timeframe
-        df = self.get_klines_dataframe(interval, limit=2)
-        last_candle = df.iloc[-1]
-        current_close_time = int(last_candle['close_time'])
+        if interval not in BinanceClient.INTERVAL_MS:
+            # Intervalos sin duración fija: consultar la última vela
+            df = self.get_klines_dataframe(interval, limit=2)
+            current_close_time = int(df.iloc[-1]['close_time'])
+        else:
+            # Límites de la vela en progreso calculados con el reloj del servidor (sin solicitudes)
+            _, current_close_time = BinanceClient.candle_bounds(interval, self.client.server_now_ms())
         saved_close_time = old_timeframe_state['last_candle_close_time']
 
         # Si el close_time cambió, significa que hay una nueva vela
@@ -217,11 +387,16 @@ class TradingAnalysis:
             # Analizar los 3 timeframes
             print("\n📊 Analizando timeframes...")
 
+            intervals = ['4h', '1h', '15m']
+            prefetched = self.fetch_timeframes(intervals, limit=50)
+
             data = {}
-            for interval in ['4h', '1h', '15m']:
+            for interval in intervals:
                 print(f"  Analizando {interval}...")
                 tf_key = interval.replace('m', 'min')
-                data[tf_key] = self.analyze_timeframe(interval, limit=50)
+                df_futures, df_spot = prefetched[interval]
+                data[tf_key] = self.analyze_timeframe(interval, limit=50,
+                                                      df_futures=df_futures, df_spot=df_spot)
 
             # Generar reporte
             print("\n📝 Generando reporte...")
@@ -268,8 +443,8 @@ class TradingAnalysis:
                     'atr': indicators['atr'],
                     'long_count': evaluations['long_count'],
                     'short_count': evaluations['short_count'],
-                    'long_conditions': evaluations['long_conditions'],
-                    'short_conditions': evaluations['short_conditions'],
+                    'long_mask': self.evaluator.encode_conditions(evaluations['long_conditions']),
+                    'short_mask': self.evaluator.encode_conditions(evaluations['short_conditions']),
                     'sl_tp_long': evaluations.get('sl_tp_long'),
                     'sl_tp_short': evaluations.get('sl_tp_short'),
                     'last_candle_open_time': tf_data['candle_open_time'],
@@ -312,8 +487,11 @@ class TradingAnalysis:
             timeframes_to_update = []
             timeframes_skipped = []
 
-            for interval in ['4h', '1h', '15m']:
-                if self.should_update_timeframe(interval, state):
+            intervals = ['4h', '1h', '15m']
+            needs_update = [self.should_update_timeframe(tf, state) for tf in intervals]
+
+            for interval, update in zip(intervals, needs_update):
+                if update:
                     timeframes_to_update.append(interval)
                     tf_key = interval.replace('m', 'min')
                     print(f"  ✅ {interval}: Nueva vela cerrada - se actualizará")
@@ -331,13 +509,17 @@ class TradingAnalysis:
             # Analizar solo timeframes que necesitan actualización
             print(f"\n📊 Analizando {len(timeframes_to_update)} timeframe(s)...")
 
+            prefetched = self.fetch_timeframes(timeframes_to_update, limit=50)
+
             data = {}
             changes = {}
 
             for interval in timeframes_to_update:
                 print(f"  Analizando {interval}...")
                 tf_key = interval.replace('m', 'min')
-                data[tf_key] = self.analyze_timeframe(interval, limit=50)
+                df_futures, df_spot = prefetched[interval]
+                data[tf_key] = self.analyze_timeframe(interval, limit=50,
+                                                      df_futures=df_futures, df_spot=df_spot)
 
                 # Detectar cambios
                 old_state = state['timeframes'].get(tf_key, {})
@@ -349,8 +531,8 @@ class TradingAnalysis:
                     'macd_histograma': data[tf_key]['indicators']['macd_histogram'],
                     'long_count': data[tf_key]['evaluations']['long_count'],
                     'short_count': data[tf_key]['evaluations']['short_count'],
-                    'long_conditions': data[tf_key]['evaluations']['long_conditions'],
-                    'short_conditions': data[tf_key]['evaluations']['short_conditions']
+                    'long_mask': self.evaluator.encode_conditions(data[tf_key]['evaluations']['long_conditions']),
+                    'short_mask': self.evaluator.encode_conditions(data[tf_key]['evaluations']['short_conditions'])
                 }
 
                 changes[tf_key] = self.evaluator.detect_changes(old_state, new_state, tf_key)
@@ -410,8 +592,8 @@ class TradingAnalysis:
                     'atr': indicators['atr'],
                     'long_count': evaluations['long_count'],
                     'short_count': evaluations['short_count'],
-                    'long_conditions': evaluations['long_conditions'],
-                    'short_conditions': evaluations['short_conditions'],
+                    'long_mask': self.evaluator.encode_conditions(evaluations['long_conditions']),
+                    'short_mask': self.evaluator.encode_conditions(evaluations['short_conditions']),
                     'sl_tp_long': evaluations.get('sl_tp_long'),
                     'sl_tp_short': evaluations.get('sl_tp_short'),
                     'last_candle_open_time': tf_data['candle_open_time'],
@@ -516,6 +698,50 @@ class TradingAnalysis:
             import traceback
             traceback.print_exc()
 
+    def load_scan_symbols(self) -> List[str]:
+        """Carga la lista de símbolos a escanear (uno por línea en simbolos.txt)"""
+        if not os.path.exists(self.SCAN_SYMBOLS_FILE):
+            return list(self.DEFAULT_SCAN_SYMBOLS)
+
+        with open(self.SCAN_SYMBOLS_FILE, 'r', encoding='utf-8') as f:
+            symbols = [line.strip().upper() for line in f
+                       if line.strip() and not line.startswith('#')]
+        return list(dict.fromkeys(symbols))
+
+    def option4_scan(self):
+        """OPCIÓN 4: Escaneo multi-símbolo (4h, 1h, 15min)"""
+        symbols = self.load_scan_symbols()
+        intervals = ['4h', '1h', '15m']
+
+        print(f"\n🛰️  Ejecutando Escaneo de {len(symbols)} símbolos...")
+
+        try:
+            start = datetime.now()
+            scanner = MarketScanner()
+            table, errors = scanner.scan(
+                symbols, intervals,
+                lambda interval, df_futures, df_spot, indicators: self.analyze_timeframe(
+                    interval, limit=50, df_futures=df_futures, df_spot=df_spot, indicators=indicators,
+                    use_cache=False
+                )
+            )
+            elapsed = (datetime.now() - start).total_seconds()
+
+            print("\n📝 Generando reporte...")
+            report = self.reporter.generate_scan_report(table, intervals, errors, elapsed)
+
+            filepath = self.reporter.save_report(report, "escaneo")
+            print(f"✅ Reporte guardado: {filepath}")
+
+            print("\n" + "="*60)
+            print(report)
+            print("="*60)
+
+        except Exception as e:
+            print(f"\n❌ ERROR: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
     def show_menu(self):
         """Muestra el menú principal"""
         print("\n" + "="*50)
@@ -525,7 +751,8 @@ class TradingAnalysis:
         print("\n1. ANÁLISIS INICIAL (4h, 1h, 15min)")
         print("2. ACTUALIZACIÓN 15 MINUTOS (4h, 1h, 15min)")
         print("3. ANÁLISIS 5 MINUTOS (timing de entrada)")
-        print("4. Salir")
+        print("4. ESCANEO MULTI-SÍMBOLO (4h, 1h, 15min)")
+        print("5. Salir")
         print()
 
     def run(self):
@@ -543,10 +770,12 @@ class TradingAnalysis:
                 elif choice == '3':
                     self.option3_5min_analysis()
                 elif choice == '4':
+                    self.option4_scan()
+                elif choice == '5':
                     print("\n👋 Saliendo del programa...")
                     sys.exit(0)
                 else:
-                    print("\n❌ Opción inválida. Por favor seleccione 1, 2, 3 o 4.")
+                    print("\n❌ Opción inválida. Por favor seleccione 1, 2, 3, 4 o 5.")
 
             except KeyboardInterrupt:
                 print("\n\n👋 Programa interrumpido por el usuario.")
@@ -0,0 +1,272 @@
+"""
+Cliente asíncrono (asyncio) para la API pública de Binance Futures y Spot.
+Misma API que BinanceClient, pensado para analizar muchos símbolos desde un
+único event loop sin abrir un hilo por solicitud.
+"""
+
+import asyncio
+import json
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import numpy as np
+
+from .binance_client import BinanceClient, InvalidSymbolError, INVALID_SYMBOL_CODE
+from .rate_limiter import WeightScheduler, endpoint_weight
+
+
+class AsyncBinanceClient:
+    """Cliente asíncrono para API pública de Binance Futures y Spot"""
+
+    BASE_URL = BinanceClient.BASE_URL
+    SPOT_URL = "https://api.binance.com"
+
+    # Utilidades de tiempo compartidas con el cliente síncrono
+    calculate_candle_completion = staticmethod(BinanceClient.calculate_candle_completion)
+    format_candle_time = staticmethod(BinanceClient.format_candle_time)
+    parse_klines = staticmethod(BinanceClient.parse_klines)
+    parse_klines_array = staticmethod(BinanceClient.parse_klines_array)
+
+    def __init__(self, base_url: str = None, spot_url: str = None, pool_size: int = 20):
+        """
+        Inicializa el cliente. Las sesiones se crean bajo demanda dentro del event loop.
+
+        Args:
+            base_url: URL base de FUTUROS (default fapi.binance.com).
+                      Permite apuntar a un servidor HTTP local en pruebas.
+            spot_url: URL base de SPOT (default api.binance.com)
+            pool_size: Conexiones keep-alive máximas en el pool de cada host
+        """
+        self.base_url = (base_url or self.BASE_URL).rstrip('/')
+        self.spot_url = (spot_url or self.SPOT_URL).rstrip('/')
+        self.pool_size = pool_size
+        # Un pool de conexiones keep-alive (ClientSession) por host
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        # Planificadores de peso compartidos con el cliente síncrono (límite por IP)
+        self.schedulers = {
+            url: WeightScheduler.for_host(urlparse(url).netloc)
+            for url in (self.base_url, self.spot_url)
+        }
+
+    async def __aenter__(self) -> "AsyncBinanceClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self, base_url: str) -> aiohttp.ClientSession:
+        """Devuelve (creándola si no existe) la sesión compartida de un host"""
+        session = self._sessions.get(base_url)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=60
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+                headers={
+                    'Content-Type': 'application/json',
+                    'User-Agent': 'TradingBot/1.0'
+                }
+            )
+            self._sessions[base_url] = session
+        return session
+
+    async def close(self):
+        """Cierra todas las sesiones y sus conexiones"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+
+    async def _get_text(self, base_url: str, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Realiza un GET respetando el límite de peso del host y devuelve el cuerpo
+        como texto. Lanza ConnectionError ante rate limit (429/418) e
+        InvalidSymbolError si el par no existe en ese mercado (código -1121).
+        """
+        scheduler = self.schedulers[base_url]
+        await scheduler.acquire_async(endpoint_weight(path, params))
+
+        session = self._get_session(base_url)
+        async with session.get(f"{base_url}{path}", params=params) as response:
+            scheduler.update_from_headers(response.headers)
+            if response.status in (418, 429):
+                retry_after = int(response.headers.get('Retry-After', 60))
+                scheduler.penalize(retry_after)
+                raise ConnectionError(f"Rate limit excedido. Esperar {retry_after} segundos")
+
+            if response.status == 400:
+                try:
+                    error = json.loads(await response.text())
+                except ValueError:
+                    error = None
+                if isinstance(error, dict) and error.get('code') == INVALID_SYMBOL_CODE:
+                    raise InvalidSymbolError(f"{params.get('symbol')}: {error.get('msg', 'Invalid symbol.')}")
+
+            response.raise_for_status()
+            return await response.text()
+
+    async def _get_json(self, base_url: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Realiza un GET y devuelve el JSON decodificado"""
+        return json.loads(await self._get_text(base_url, path, params))
+
+    async def _request_klines(self, params: Dict[str, Any]) -> str:
+        """
+        Solicita /fapi/v1/klines con reintentos ante timeouts y errores de conexión
+        (mismos reintentos que BinanceClient).
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+        """
+        max_retries = 3
+        retry_delay = 1  # segundos
+
+        for attempt in range(max_retries):
+            try:
+                return await self._get_text(self.base_url, "/fapi/v1/klines", params)
+
+            except asyncio.TimeoutError:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                raise ConnectionError("Timeout al conectar con Binance API")
+
+            except aiohttp.ClientConnectionError:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                raise ConnectionError("Error de conexión con Binance API. Verificar internet")
+
+            except aiohttp.ClientError as e:
+                raise ConnectionError(f"Error en solicitud a Binance API: {str(e)}")
+
+        raise ConnectionError("Máximo número de reintentos alcanzado")
+
+    async def _request_klines_spot(self, params: Dict[str, Any]) -> str:
+        """
+        Solicita /api/v3/klines (SPOT) con reintentos ante errores HTTP
+        (mismos reintentos que BinanceClient).
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+        """
+        max_retries = 3
+        retry_delay = 1  # segundos
+
+        for attempt in range(max_retries):
+            try:
+                return await self._get_text(self.spot_url, "/api/v3/klines", params)
+
+            except aiohttp.ClientResponseError:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (attempt + 1))
+                    continue
+                raise ConnectionError("Error de conexión con Binance SPOT API. Verificar internet")
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise ConnectionError(f"Error en solicitud a Binance SPOT API: {str(e)}")
+
+        raise ConnectionError("Máximo número de reintentos alcanzado")
+
+    async def get_klines(self, symbol: str, interval: str, limit: int = 200,
+                         start_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene velas (klines) de FUTUROS. Incluye la vela actual en progreso.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
+            limit: Número de velas a obtener (máximo 1500)
+            start_time: Si se indica, solo velas con open_time >= start_time (ms)
+
+        Returns:
+            Lista de diccionarios con datos de velas
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+            ValueError: Si la respuesta de la API es inválida
+        """
+        text = await self._request_klines(BinanceClient._klines_params(symbol, interval, limit, start_time))
+        data = json.loads(text)
+
+        if not isinstance(data, list) or len(data) == 0:
+            raise ValueError("Respuesta de API inválida o vacía")
+
+        return self.parse_klines(data)
+
+    async def get_klines_spot(self, symbol: str, interval: str, limit: int = 200,
+                              start_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene velas (klines) del mercado SPOT. Incluye la vela actual en progreso.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
+            limit: Número de velas a obtener (máximo 1500)
+            start_time: Si se indica, solo velas con open_time >= start_time (ms)
+
+        Returns:
+            Lista de diccionarios con datos de velas
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+        """
+        text = await self._request_klines_spot(BinanceClient._klines_params(symbol, interval, limit, start_time))
+        return self.parse_klines(json.loads(text))
+
+    async def get_klines_array(self, symbol: str, interval: str, limit: int = 200,
+                               start_time: Optional[int] = None, use_spot: bool = False) -> np.ndarray:
+        """
+        Obtiene velas como array estructurado (columnar). Ver BinanceClient.get_klines_array.
+
+        Returns:
+            Array estructurado con dtype KLINE_DTYPE
+        """
+        params = BinanceClient._klines_params(symbol, interval, limit, start_time)
+        if use_spot:
+            text = await self._request_klines_spot(params)
+        else:
+            text = await self._request_klines(params)
+
+        klines = self.parse_klines_array(text)
+
+        if not use_spot and len(klines) == 0:
+            raise ValueError("Respuesta de API inválida o vacía")
+
+        return klines
+
+    async def get_current_price(self, symbol: str) -> float:
+        """
+        Obtiene el precio actual del símbolo.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+
+        Returns:
+            Precio actual como float
+        """
+        try:
+            data = await self._get_json(self.base_url, "/fapi/v1/ticker/price", {'symbol': symbol})
+            return float(data['price'])
+        except Exception as e:
+            raise ConnectionError(f"Error obteniendo precio actual: {str(e)}")
+
+    async def test_connection(self) -> bool:
+        """
+        Prueba la conexión con la API de Binance.
+
+        Returns:
+            True si la conexión es exitosa, False en caso contrario
+        """
+        try:
+            await self.schedulers[self.base_url].acquire_async(endpoint_weight("/fapi/v1/ping"))
+            session = self._get_session(self.base_url)
+            async with session.get(f"{self.base_url}/fapi/v1/ping",
+                                   timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status == 200
+        except Exception:
+            return False
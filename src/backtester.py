@@ -0,0 +1,280 @@
+"""
+Backtesting de la estrategia de conteo de condiciones (5 de 7) con SL/TP por ATR.
+Las condiciones de todas las velas se evalúan de una vez
+(ConditionEvaluator.evaluate_conditions_series) y los niveles SL/TP1/TP2 se
+calculan para todas las velas con TechnicalIndicators.calculate_sl_tp_arrays.
+Solo se recorren las operaciones (no las velas): la salida de cada una se
+busca con comparaciones vectorizadas por bloques.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .evaluator import ConditionEvaluator
+from .indicators import TechnicalIndicators
+from .intrabar import IntrabarSimulator
+
+
+# Velas mínimas antes de la primera señal (igual que calculate_all_indicators)
+MIN_CANDLES = 50
+
+# Tamaño inicial del bloque de búsqueda de salidas (se duplica en cada paso)
+_SEARCH_BLOCK = 64
+
+
+class Backtester:
+    """
+    Simula la estrategia sobre un historial de velas: una posición a la vez,
+    entrada al cierre de la vela con señal, salida parcial en TP1 (70%) y el
+    resto en TP2 o en el SL original.
+
+    Cuando una misma vela toca el SL y un TP no se sabe cuál ocurrió primero:
+    se asume el SL (conservador) y la operación se marca como ambigua, salvo
+    que se entreguen velas inferiores (IntrabarSimulator) que resuelvan el orden.
+    """
+
+    def __init__(self, min_conditions: int = 5, atr_multiplier: float = 2.0,
+                 tp1_ratio: float = 1.5, tp2_ratio: float = 2.25,
+                 min_sl_pct: float = 1.5, max_sl_pct: float = 3.0,
+                 tp1_fraction: float = 0.7, fee_pct: float = 0.0,
+                 max_bars: Optional[int] = None):
+        """
+        Inicializa el backtester con las reglas por defecto de la estrategia.
+
+        Args:
+            min_conditions: Condiciones cumplidas para abrir una operación
+            atr_multiplier: Distancia del SL base en ATRs
+            tp1_ratio: TP1 = SL x tp1_ratio (en %)
+            tp2_ratio: TP2 = SL x tp2_ratio (en %)
+            min_sl_pct: Límite mínimo del SL (%)
+            max_sl_pct: Límite máximo del SL (%)
+            tp1_fraction: Parte de la posición que se cierra en TP1
+            fee_pct: Comisión por lado (% del nocional)
+            max_bars: Velas máximas por operación (None = sin límite)
+        """
+        self.min_conditions = min_conditions
+        self.atr_multiplier = atr_multiplier
+        self.tp1_ratio = tp1_ratio
+        self.tp2_ratio = tp2_ratio
+        self.min_sl_pct = min_sl_pct
+        self.max_sl_pct = max_sl_pct
+        self.tp1_fraction = tp1_fraction
+        self.fee_pct = fee_pct
+        self.max_bars = max_bars
+
+    def signals(self, df: pd.DataFrame, df_spot: pd.DataFrame = None,
+                evaluation: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """
+        Dirección de la señal en cada vela: 1 (LONG), -1 (SHORT) o 0.
+
+        Una vela tiene señal si cumple al menos min_conditions condiciones en
+        una dirección y más que en la contraria.
+
+        Args:
+            df: DataFrame OHLCV de FUTUROS
+            df_spot: DataFrame SPOT alineado con df (opcional)
+            evaluation: Resultado de evaluate_conditions_series ya calculado (opcional)
+        """
+        if evaluation is None:
+            evaluation = ConditionEvaluator.evaluate_conditions_series(df, df_spot)
+        long_count = evaluation['long_count']
+        short_count = evaluation['short_count']
+
+        direction = np.zeros(len(df), dtype=np.int8)
+        direction[(long_count >= self.min_conditions) & (long_count > short_count)] = 1
+        direction[(short_count >= self.min_conditions) & (short_count > long_count)] = -1
+        direction[:MIN_CANDLES - 1] = 0
+        return direction
+
+    def levels(self, price: np.ndarray, atr: np.ndarray, direction: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Niveles SL/TP1/TP2 de cada vela con las reglas de calculate_sl_tp_with_atr
+        (SL base = ATR x atr_multiplier, limitado a [min_sl_pct, max_sl_pct]).
+
+        Returns:
+            Diccionario de arrays: sl, tp1, tp2, sl_pct, clamp
+        """
+        levels = TechnicalIndicators.calculate_sl_tp_arrays(
+            price, atr, self.atr_multiplier, self.min_sl_pct, self.max_sl_pct,
+            self.tp1_ratio, self.tp2_ratio
+        )
+        return TechnicalIndicators.select_sl_tp(levels, direction)
+
+    @staticmethod
+    def _first_hit(values: np.ndarray, start: int, stop: int, level: float, above: bool) -> int:
+        """
+        Primera posición en [start, stop) con values >= level (above) o
+        values <= level; devuelve stop si no hay ninguna.
+        """
+        block = _SEARCH_BLOCK
+        while start < stop:
+            end = min(start + block, stop)
+            chunk = values[start:end]
+            hits = chunk >= level if above else chunk <= level
+            if hits.any():
+                return start + int(hits.argmax())
+            start = end
+            block *= 2
+        return stop
+
+    def run(self, df: pd.DataFrame, df_spot: pd.DataFrame = None,
+            atr: Optional[np.ndarray] = None, start: int = 0,
+            evaluation: Optional[Dict[str, np.ndarray]] = None,
+            intrabar: Optional[IntrabarSimulator] = None) -> Dict[str, Any]:
+        """
+        Ejecuta el backtest sobre todas las velas del DataFrame.
+
+        Args:
+            df: DataFrame OHLCV de FUTUROS con 'open_time'
+            df_spot: DataFrame SPOT alineado con df (opcional, para MACD y Volumen)
+            atr: ATR de cada vela (opcional; por defecto ATR 14 de Wilder)
+            start: Primera vela en la que se pueden abrir operaciones (las
+                   anteriores solo sirven para calentar los indicadores)
+            evaluation: Resultado de evaluate_conditions_series ya calculado
+                        (opcional, para reutilizarlo entre varios parámetros)
+            intrabar: Velas de un timeframe inferior (opcional). Las velas que
+                      tocan el SL y un TP se resuelven con ellas en lugar de
+                      asumir el SL; requiere 'open_time' y 'close_time' en df
+
+        Returns:
+            Diccionario con 'trades' (DataFrame, una fila por operación) y
+            'summary' (PnL, win rate, drawdown, etc.)
+        """
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        if atr is None:
+            atr = TechnicalIndicators.calculate_atr(df, 14).to_numpy()
+
+        bar_times = None
+        if intrabar is not None:
+            if 'open_time' not in df.columns or 'close_time' not in df.columns:
+                raise ValueError("La resolución intravela requiere 'open_time' y 'close_time'")
+            bar_times = (df['open_time'].to_numpy(dtype=np.int64), df['close_time'].to_numpy(dtype=np.int64))
+
+        direction = self.signals(df, df_spot, evaluation)
+        direction[:start] = 0
+        levels = self.levels(close, atr, direction)
+        n = len(close)
+        # La señal de la última vela no tiene velas posteriores para simular la salida
+        signal_index = np.flatnonzero(direction[:n - 1])
+
+        trades = []
+        position = 0
+        while True:
+            k = int(np.searchsorted(signal_index, position))
+            if k >= len(signal_index):
+                break
+            entry = int(signal_index[k])
+            trade = self._simulate(entry, int(direction[entry]), close[entry], levels,
+                                   high, low, close, n, intrabar, bar_times)
+            trades.append(trade)
+            position = trade['exit_index'] + 1
+
+        table = pd.DataFrame(trades, columns=[
+            'entry_index', 'direction', 'entry', 'sl', 'tp1', 'tp2', 'sl_pct',
+            'exit_index', 'exit_price', 'exit_reason', 'tp1_hit', 'ambiguous', 'intrabar', 'pnl_pct'
+        ])
+        if 'open_time' in df.columns and len(table):
+            open_time = df['open_time'].to_numpy()
+            table.insert(1, 'entry_time', open_time[table['entry_index']])
+            table.insert(9, 'exit_time', open_time[table['exit_index']])
+
+        return {'trades': table, 'summary': self.summarize(table)}
+
+    def _simulate(self, entry: int, side: int, price: float, levels: Dict[str, np.ndarray],
+                  high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int,
+                  intrabar: Optional[IntrabarSimulator] = None,
+                  bar_times: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+        """Salida de una operación abierta al cierre de la vela `entry`"""
+        sl, tp1, tp2 = levels['sl'][entry], levels['tp1'][entry], levels['tp2'][entry]
+        start = entry + 1
+        stop = n if self.max_bars is None else min(n, start + self.max_bars)
+
+        # LONG: SL con mínimos, TPs con máximos (al revés para SHORT)
+        adverse, favorable = (low, high) if side == 1 else (high, low)
+        sl_hit = self._first_hit(adverse, start, stop, sl, above=(side == -1))
+        tp1_hit = self._first_hit(favorable, start, min(sl_hit + 1, stop), tp1, above=(side == 1))
+        ambiguous = sl_hit < stop and tp1_hit == sl_hit
+        tp1_reached = tp1_hit < sl_hit
+
+        if tp1_reached:
+            tp2_hit = self._first_hit(favorable, tp1_hit, min(sl_hit + 1, stop), tp2, above=(side == 1))
+            ambiguous = ambiguous or (sl_hit < stop and tp2_hit == sl_hit)
+            if tp2_hit < sl_hit:
+                exit_index, exit_price, reason = tp2_hit, tp2, 'TP2'
+            elif sl_hit < stop:
+                exit_index, exit_price, reason = sl_hit, sl, 'SL'
+            else:
+                exit_index, exit_price, reason = stop - 1, close[stop - 1], 'FIN'
+        elif sl_hit < stop:
+            exit_index, exit_price, reason = sl_hit, sl, 'SL'
+        else:
+            exit_index, exit_price, reason = stop - 1, close[stop - 1], 'FIN'
+
+        # Vela ambigua: orden real de los niveles con las velas inferiores
+        resolved = None
+        if ambiguous and intrabar is not None:
+            resolved = intrabar.resolve(int(bar_times[0][sl_hit]), int(bar_times[1][sl_hit]),
+                                        side, sl, tp1, tp2, tp1_done=tp1_reached)
+        if resolved is not None:
+            reason = resolved['exit_reason']
+            exit_index, exit_price = sl_hit, (tp2 if reason == 'TP2' else sl)
+            tp1_reached = resolved['tp1_hit']
+            ambiguous = resolved['ambiguous']
+
+        if tp1_reached:
+            first_leg = self.tp1_fraction * (tp1 - price)
+            rest = (1 - self.tp1_fraction) * (exit_price - price)
+            pnl = side * (first_leg + rest) / price * 100
+        else:
+            pnl = side * (exit_price - price) / price * 100
+
+        return {
+            'entry_index': entry,
+            'direction': 'LONG' if side == 1 else 'SHORT',
+            'entry': price,
+            'sl': sl,
+            'tp1': tp1,
+            'tp2': tp2,
+            'sl_pct': levels['sl_pct'][entry],
+            'exit_index': max(exit_index, entry),
+            'exit_price': exit_price,
+            'exit_reason': reason,
+            'tp1_hit': tp1_reached,
+            'ambiguous': bool(ambiguous),
+            'intrabar': resolved is not None,
+            'pnl_pct': pnl - 2 * self.fee_pct
+        }
+
+    @staticmethod
+    def summarize(trades: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Métricas del backtest: PnL total (suma y compuesto), win rate, profit
+        factor y máximo drawdown de la curva de capital (al cierre de cada operación).
+        """
+        pnl = trades['pnl_pct'].to_numpy(dtype=np.float64) if len(trades) else np.empty(0)
+        equity = np.cumprod(1 + pnl / 100)
+        peak = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+        gains = pnl[pnl > 0].sum()
+        losses = -pnl[pnl < 0].sum()
+        if losses > 0:
+            profit_factor = float(gains / losses)
+        else:
+            profit_factor = float('inf') if gains > 0 else 0.0
+
+        return {
+            'trades': len(pnl),
+            'long_trades': int((trades['direction'] == 'LONG').sum()) if len(trades) else 0,
+            'short_trades': int((trades['direction'] == 'SHORT').sum()) if len(trades) else 0,
+            'win_rate': float((pnl > 0).mean() * 100) if len(pnl) else 0.0,
+            'total_pnl_pct': float(pnl.sum()),
+            'compounded_pnl_pct': float((equity[-1] - 1) * 100) if len(pnl) else 0.0,
+            'avg_pnl_pct': float(pnl.mean()) if len(pnl) else 0.0,
+            'profit_factor': profit_factor,
+            'max_drawdown_pct': float(((peak - equity) / peak).max() * 100) if len(pnl) else 0.0,
+            'ambiguous_trades': int(trades['ambiguous'].sum()) if len(trades) else 0,
+            'intrabar_trades': int(trades['intrabar'].sum()) if len(trades) else 0
+        }
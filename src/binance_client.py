@@ -5,14 +5,82 @@ Obtiene datos de velas (klines) incluyendo la vela en progreso.
 
 import requests
 from datetime import datetime, timezone
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import threading
 import time
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+from .rate_limiter import WeightScheduler, endpoint_weight
+from .response_cache import ResponseCache
+
+
+# Columnas de una vela tal como las entrega la API de Binance
+KLINE_DTYPE = np.dtype([
+    ('open_time', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+    ('close_time', 'i8'),
+    ('quote_volume', 'f8'),
+    ('trades', 'i8'),
+    ('taker_buy_base', 'f8'),
+    ('taker_buy_quote', 'f8')
+])
+
+# Campos por vela en la respuesta cruda (incluye el campo final "ignore")
+KLINE_FIELDS = 12
+
+_KLINE_STRIP_TABLE = str.maketrans('', '', '[]"')
+
+# Código de error de Binance para un par inexistente en el mercado consultado
+INVALID_SYMBOL_CODE = -1121
+
+
+class InvalidSymbolError(ValueError):
+    """El par no existe en el mercado consultado (Binance responde código -1121)"""
 
 
 class BinanceClient:
     """Cliente para API pública de Binance Futures"""
 
     BASE_URL = "https://fapi.binance.com"
+    SPOT_URL = "https://api.binance.com"
+
+    # Duración de cada intervalo en milisegundos (intervalos de duración fija)
+    INTERVAL_MS = {
+        '1m': 60_000,
+        '3m': 3 * 60_000,
+        '5m': 5 * 60_000,
+        '15m': 15 * 60_000,
+        '30m': 30 * 60_000,
+        '1h': 3_600_000,
+        '2h': 2 * 3_600_000,
+        '4h': 4 * 3_600_000,
+        '6h': 6 * 3_600_000,
+        '8h': 8 * 3_600_000,
+        '12h': 12 * 3_600_000,
+        '1d': 86_400_000,
+        '3d': 3 * 86_400_000,
+        '1w': 7 * 86_400_000
+    }
+
+    # Máximo de velas por solicitud de /klines (FUTUROS y SPOT)
+    MAX_KLINES = 1500
+    MAX_KLINES_SPOT = 1000
+
+    # Las velas semanales abren el lunes 00:00 UTC (el epoch Unix fue jueves)
+    WEEK_OFFSET_MS = 4 * 86_400_000
+
+    # Segundos que se reutiliza una respuesta de /klines idéntica (nunca más allá del cierre de la vela)
+    CACHE_TTL = 10
+
+    # Segundos que se reutiliza el desfase de reloj antes de volver a consultar /fapi/v1/time
+    TIME_SYNC_INTERVAL = 3600
 
     def __init__(self):
         self.session = requests.Session()
@@ -20,38 +88,84 @@ class BinanceClient:
             'Content-Type': 'application/json',
             'User-Agent': 'TradingBot/1.0'
         })
+        # Planificadores de peso compartidos por host (límite por IP)
+        self.schedulers = {
+            self.BASE_URL: WeightScheduler.for_host(urlparse(self.BASE_URL).netloc),
+            self.SPOT_URL: WeightScheduler.for_host(urlparse(self.SPOT_URL).netloc)
+        }
+        # Desfase (ms) entre el reloj del servidor y el local, ver sync_time()
+        self.time_offset_ms = None
+        self._time_synced_at = 0.0
+        # Un solo /fapi/v1/time aunque varios hilos lean la hora a la vez
+        self._time_sync_lock = threading.Lock()
+        # Respuestas recientes de /klines y deduplicación de solicitudes en vuelo
+        self.cache = ResponseCache()
+
+    def _send(self, base_url: str, path: str, params: Optional[Dict[str, Any]] = None,
+              timeout: float = 10, cache_ttl: float = 0) -> requests.Response:
+        """
+        Envía un GET respetando el límite de peso del host: espera turno en el
+        planificador, actualiza el saldo con X-MBX-USED-WEIGHT-1M y, ante un
+        429/418, bloquea nuevas solicitudes durante Retry-After.
 
-    def get_klines(self, symbol: str, interval: str, limit: int = 200) -> List[Dict[str, Any]]:
+        Con cache_ttl > 0 las respuestas 200 se reutilizan durante ese tiempo
+        y las solicitudes idénticas simultáneas se envían una sola vez.
         """
-        Obtiene velas (klines) para un símbolo e intervalo específico.
-        Incluye la vela actual en progreso.
+        if cache_ttl <= 0:
+            return self._send_uncached(base_url, path, params, timeout)
 
-        Args:
-            symbol: Par de trading (ej: "ETHUSDT")
-            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
-            limit: Número de velas a obtener (máximo 1500)
+        return self.cache.get_or_fetch(
+            ResponseCache.make_key(base_url, path, params),
+            lambda: self._send_uncached(base_url, path, params, timeout),
+            lambda response: self._cache_expiry(response, params, cache_ttl)
+        )
 
-        Returns:
-            Lista de diccionarios con datos de velas
+    def _send_uncached(self, base_url: str, path: str, params: Optional[Dict[str, Any]],
+                       timeout: float) -> requests.Response:
+        scheduler = self.schedulers[base_url]
+        scheduler.acquire(endpoint_weight(path, params))
 
-        Raises:
-            ConnectionError: Si hay problemas de conexión
-            ValueError: Si la respuesta de la API es inválida
+        response = self.session.get(f"{base_url}{path}", params=params, timeout=timeout)
+
+        scheduler.update_from_headers(response.headers)
+        if response.status_code in (418, 429):
+            scheduler.penalize(int(response.headers.get('Retry-After', 60)))
+
+        return response
+
+    def _cache_expiry(self, response: requests.Response, params: Optional[Dict[str, Any]],
+                      cache_ttl: float) -> Optional[float]:
+        """
+        Hasta cuándo (time.time()) se puede reutilizar una respuesta: cache_ttl,
+        pero nunca más allá del cierre de la vela en progreso. None si no es 200.
         """
-        endpoint = f"{self.BASE_URL}/fapi/v1/klines"
+        if response.status_code != 200:
+            return None
 
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'limit': limit
-        }
+        now = time.time()
+        expiry = now + cache_ttl
+
+        interval = (params or {}).get('interval')
+        if interval in self.INTERVAL_MS:
+            server_now = int(now * 1000) + (self.time_offset_ms or 0)
+            _, close_time = self.candle_bounds(interval, server_now)
+            expiry = min(expiry, now + (close_time + 1 - server_now) / 1000)
+
+        return expiry
+
+    def _request_klines(self, params: Dict[str, Any]) -> requests.Response:
+        """
+        Solicita /fapi/v1/klines con reintentos ante timeouts y errores de conexión.
 
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+        """
         max_retries = 3
         retry_delay = 1  # segundos
 
         for attempt in range(max_retries):
             try:
-                response = self.session.get(endpoint, params=params, timeout=10)
+                response = self._send(self.BASE_URL, "/fapi/v1/klines", params, cache_ttl=self.CACHE_TTL)
 
                 # Manejar rate limits
                 if response.status_code == 429:
@@ -60,30 +174,7 @@ class BinanceClient:
 
                 response.raise_for_status()
 
-                data = response.json()
-
-                if not isinstance(data, list) or len(data) == 0:
-                    raise ValueError("Respuesta de API inválida o vacía")
-
-                # Convertir datos a formato más manejable
-                klines = []
-                for k in data:
-                    kline = {
-                        'open_time': k[0],
-                        'open': float(k[1]),
-                        'high': float(k[2]),
-                        'low': float(k[3]),
-                        'close': float(k[4]),
-                        'volume': float(k[5]),
-                        'close_time': k[6],
-                        'quote_volume': float(k[7]),
-                        'trades': int(k[8]),
-                        'taker_buy_base': float(k[9]),
-                        'taker_buy_quote': float(k[10])
-                    }
-                    klines.append(kline)
-
-                return klines
+                return response
 
             except requests.exceptions.Timeout:
                 if attempt < max_retries - 1:
@@ -102,38 +193,19 @@ class BinanceClient:
 
         raise ConnectionError("Máximo número de reintentos alcanzado")
 
-    def get_klines_spot(self, symbol: str, interval: str, limit: int = 200) -> List[Dict[str, Any]]:
+    def _request_klines_spot(self, params: Dict[str, Any]) -> requests.Response:
         """
-        Obtiene velas (klines) del mercado SPOT para un símbolo e intervalo específico.
-        Incluye la vela actual en progreso.
-
-        Args:
-            symbol: Par de trading (ej: "ETHUSDT")
-            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
-            limit: Número de velas a obtener (máximo 1500)
-
-        Returns:
-            Lista de diccionarios con datos de velas
+        Solicita /api/v3/klines (SPOT) con reintentos ante errores HTTP.
 
         Raises:
             ConnectionError: Si hay problemas de conexión
-            ValueError: Si la respuesta de la API es inválida
         """
-        # URL para mercado SPOT
-        endpoint = "https://api.binance.com/api/v3/klines"
-
-        params = {
-            'symbol': symbol,
-            'interval': interval,
-            'limit': limit
-        }
-
         max_retries = 3
         retry_delay = 1  # segundos
 
         for attempt in range(max_retries):
             try:
-                response = self.session.get(endpoint, params=params, timeout=10)
+                response = self._send(self.SPOT_URL, "/api/v3/klines", params, cache_ttl=self.CACHE_TTL)
 
                 # Manejar rate limits
                 if response.status_code == 429:
@@ -142,26 +214,7 @@ class BinanceClient:
 
                 response.raise_for_status()
 
-                klines_data = response.json()
-
-                # Convertir a formato consistente
-                result = []
-                for kline in klines_data:
-                    result.append({
-                        'open_time': kline[0],
-                        'open': float(kline[1]),
-                        'high': float(kline[2]),
-                        'low': float(kline[3]),
-                        'close': float(kline[4]),
-                        'volume': float(kline[5]),
-                        'close_time': kline[6],
-                        'quote_volume': float(kline[7]),
-                        'trades': int(kline[8]),
-                        'taker_buy_base': float(kline[9]),
-                        'taker_buy_quote': float(kline[10])
-                    })
-
-                return result
+                return response
 
             except requests.exceptions.HTTPError as e:
                 if attempt < max_retries - 1:
@@ -174,6 +227,226 @@ class BinanceClient:
 
         raise ConnectionError("Máximo número de reintentos alcanzado")
 
+    @staticmethod
+    def _klines_params(symbol: str, interval: str, limit: int,
+                       start_time: Optional[int] = None) -> Dict[str, Any]:
+        """Construye los parámetros de /klines"""
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        if start_time is not None:
+            params['startTime'] = int(start_time)
+        return params
+
+    def get_klines(self, symbol: str, interval: str, limit: int = 200,
+                   start_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene velas (klines) para un símbolo e intervalo específico.
+        Incluye la vela actual en progreso.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
+            limit: Número de velas a obtener (máximo 1500)
+            start_time: Si se indica, solo velas con open_time >= start_time (ms)
+
+        Returns:
+            Lista de diccionarios con datos de velas
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+            ValueError: Si la respuesta de la API es inválida
+        """
+        response = self._request_klines(self._klines_params(symbol, interval, limit, start_time))
+
+        data = response.json()
+
+        if not isinstance(data, list) or len(data) == 0:
+            raise ValueError("Respuesta de API inválida o vacía")
+
+        # Convertir datos a formato más manejable
+        return self.parse_klines(data)
+
+    def get_klines_spot(self, symbol: str, interval: str, limit: int = 200,
+                        start_time: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Obtiene velas (klines) del mercado SPOT para un símbolo e intervalo específico.
+        Incluye la vela actual en progreso.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
+            limit: Número de velas a obtener (máximo 1500)
+            start_time: Si se indica, solo velas con open_time >= start_time (ms)
+
+        Returns:
+            Lista de diccionarios con datos de velas
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+        """
+        response = self._request_klines_spot(self._klines_params(symbol, interval, limit, start_time))
+
+        # Convertir a formato consistente
+        return self.parse_klines(response.json())
+
+    def get_klines_array(self, symbol: str, interval: str, limit: int = 200,
+                         start_time: Optional[int] = None, use_spot: bool = False) -> np.ndarray:
+        """
+        Obtiene velas como array estructurado (columnar), sin crear un dict por vela.
+        Mismos reintentos que get_klines / get_klines_spot.
+
+        Args:
+            symbol: Par de trading (ej: "ETHUSDT")
+            interval: Timeframe (ej: "4h", "1h", "15m", "5m")
+            limit: Número de velas a obtener (máximo 1500)
+            start_time: Si se indica, solo velas con open_time >= start_time (ms)
+            use_spot: Si True, usa el mercado SPOT. Si False, FUTUROS (default)
+
+        Returns:
+            Array estructurado con dtype KLINE_DTYPE
+
+        Raises:
+            ConnectionError: Si hay problemas de conexión
+            ValueError: Si la respuesta de la API es inválida
+        """
+        params = self._klines_params(symbol, interval, limit, start_time)
+        if use_spot:
+            response = self._request_klines_spot(params)
+        else:
+            response = self._request_klines(params)
+
+        klines = self.parse_klines_array(response.text)
+
+        if not use_spot and len(klines) == 0:
+            raise ValueError("Respuesta de API inválida o vacía")
+
+        return klines
+
+    @staticmethod
+    def parse_klines(data: List[List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Convierte la respuesta cruda de /klines (lista de listas) a diccionarios.
+        Compartido por el cliente síncrono y el asíncrono.
+
+        Args:
+            data: Respuesta JSON de la API de klines
+
+        Returns:
+            Lista de diccionarios con datos de velas
+        """
+        klines = []
+        for k in data:
+            klines.append({
+                'open_time': k[0],
+                'open': float(k[1]),
+                'high': float(k[2]),
+                'low': float(k[3]),
+                'close': float(k[4]),
+                'volume': float(k[5]),
+                'close_time': k[6],
+                'quote_volume': float(k[7]),
+                'trades': int(k[8]),
+                'taker_buy_base': float(k[9]),
+                'taker_buy_quote': float(k[10])
+            })
+        return klines
+
+    @staticmethod
+    def parse_klines_array(text: str) -> np.ndarray:
+        """
+        Decodifica el texto JSON de /klines directamente a un array estructurado.
+        El array de arrays se aplana a una lista de números en texto, se convierte
+        en una matriz float64 con una sola llamada a NumPy y luego se reparte por
+        columnas, sin diccionarios por vela. Mismos valores que parse_klines.
+
+        Args:
+            text: Cuerpo de la respuesta de la API de klines
+
+        Returns:
+            Array estructurado con dtype KLINE_DTYPE
+
+        Raises:
+            ValueError: Si el texto no tiene el formato de klines
+        """
+        text = text.strip()
+        if not (text.startswith('[') and text.endswith(']')):
+            raise ValueError("Respuesta de API inválida o vacía")
+
+        # Quitar corchetes y comillas: queda una lista plana de números separados por comas
+        flat_text = text.translate(_KLINE_STRIP_TABLE).strip()
+        if not flat_text:
+            return np.empty(0, dtype=KLINE_DTYPE)
+        try:
+            flat = np.array(flat_text.split(','), dtype=np.float64)
+        except ValueError:
+            raise ValueError("Respuesta de API inválida: valor no numérico")
+
+        # Una fila por '[' (sin contar el externo), cada una con KLINE_FIELDS campos
+        rows = text.count('[') - 1
+        if flat.size != rows * KLINE_FIELDS:
+            raise ValueError("Respuesta de API inválida: número de campos inesperado")
+
+        matrix = flat.reshape(rows, KLINE_FIELDS)
+        klines = np.empty(rows, dtype=KLINE_DTYPE)
+        for column, name in enumerate(KLINE_DTYPE.names):
+            klines[name] = matrix[:, column]
+
+        return klines
+
+    @staticmethod
+    def klines_to_dataframe(klines: np.ndarray, compact: bool = False) -> pd.DataFrame:
+        """
+        Construye el DataFrame OHLCV usado por el análisis a partir de un array
+        estructurado. Las columnas son vistas del array (sin copiar).
+
+        Modo compacto (historiales largos): precios y volúmenes en float32, tiempos
+        solo como int64 (ms) y sin columna datetime (ver candle_datetimes). Ocupa
+        36 bytes por vela en lugar de 64. Los indicadores se siguen calculando en
+        float64; el único error es el redondeo de las entradas a float32
+        (~6e-8 relativo), verificado en test_compact_mode.py:
+          - EMA, Bollinger, VWAP, ATR y MACD: error < 1e-6 x precio
+          - RSI: error < 0.01 puntos
+          - Volumen (% vs MA): error < 1e-3 puntos porcentuales
+
+        Args:
+            klines: Array estructurado con dtype KLINE_DTYPE
+            compact: Si True, usa la representación compacta
+
+        Returns:
+            DataFrame con columnas datetime, OHLCV, open_time y close_time
+            (sin datetime en modo compacto)
+        """
+        if compact:
+            frame = {name: klines[name].astype(np.float32)
+                     for name in ('open', 'high', 'low', 'close', 'volume')}
+            frame['open_time'] = klines['open_time']
+            frame['close_time'] = klines['close_time']
+            return pd.DataFrame(frame, copy=False)
+
+        return pd.DataFrame({
+            'datetime': pd.to_datetime(klines['open_time'], unit='ms'),
+            'open': klines['open'],
+            'high': klines['high'],
+            'low': klines['low'],
+            'close': klines['close'],
+            'volume': klines['volume'],
+            'open_time': klines['open_time'],
+            'close_time': klines['close_time']
+        }, copy=False)
+
+    @staticmethod
+    def candle_datetimes(df: pd.DataFrame) -> pd.Series:
+        """
+        Apertura de cada vela como datetime (UTC naive), derivada bajo demanda de
+        'open_time' (para DataFrames compactos, que no guardan la columna datetime).
+        """
+        if 'datetime' in df.columns:
+            return df['datetime']
+        return pd.Series(pd.to_datetime(df['open_time'].to_numpy(), unit='ms'), index=df.index, name='datetime')
+
     def get_current_price(self, symbol: str) -> float:
         """
         Obtiene el precio actual del símbolo.
@@ -184,18 +457,88 @@ class BinanceClient:
         Returns:
             Precio actual como float
         """
-        endpoint = f"{self.BASE_URL}/fapi/v1/ticker/price"
-
         params = {'symbol': symbol}
 
         try:
-            response = self.session.get(endpoint, params=params, timeout=10)
+            response = self._send(self.BASE_URL, "/fapi/v1/ticker/price", params)
             response.raise_for_status()
             data = response.json()
             return float(data['price'])
         except Exception as e:
             raise ConnectionError(f"Error obteniendo precio actual: {str(e)}")
 
+    def get_server_time(self) -> int:
+        """
+        Obtiene la hora del servidor de Binance Futures.
+
+        Returns:
+            Timestamp del servidor (ms)
+        """
+        try:
+            response = self._send(self.BASE_URL, "/fapi/v1/time", timeout=5)
+            response.raise_for_status()
+            return int(response.json()['serverTime'])
+        except Exception as e:
+            raise ConnectionError(f"Error obteniendo hora del servidor: {str(e)}")
+
+    def sync_time(self) -> int:
+        """
+        Calcula el desfase entre el reloj local y el del servidor con una sola
+        solicitud a /fapi/v1/time (se asume latencia simétrica).
+
+        Returns:
+            Desfase en ms (hora servidor - hora local)
+        """
+        sent = time.time()
+        server_time = self.get_server_time()
+        received = time.time()
+
+        self.time_offset_ms = int(server_time - (sent + received) / 2 * 1000)
+        self._time_synced_at = received
+        return self.time_offset_ms
+
+    def server_now_ms(self) -> int:
+        """
+        Hora actual del servidor estimada con el reloj local y el desfase en caché.
+        Solo consulta /fapi/v1/time la primera vez o cuando el desfase caduca;
+        si varios hilos lo piden a la vez, uno sincroniza y el resto espera.
+
+        Returns:
+            Timestamp actual del servidor (ms)
+        """
+        if self._time_sync_expired():
+            with self._time_sync_lock:
+                # Otro hilo pudo sincronizar mientras se esperaba el lock
+                if self._time_sync_expired():
+                    self.sync_time()
+        return int(time.time() * 1000) + self.time_offset_ms
+
+    def _time_sync_expired(self) -> bool:
+        return self.time_offset_ms is None or time.time() - self._time_synced_at > self.TIME_SYNC_INTERVAL
+
+    @classmethod
+    def candle_bounds(cls, interval: str, timestamp_ms: int) -> tuple:
+        """
+        Calcula localmente la vela que contiene un instante (mismo alineamiento que Binance).
+
+        Args:
+            interval: Intervalo de la vela (ej: "15m", "4h", "1w")
+            timestamp_ms: Instante (ms)
+
+        Returns:
+            Tupla (open_time, close_time) en ms
+
+        Raises:
+            ValueError: Si el intervalo no tiene duración fija (ej: "1M")
+        """
+        interval_ms = cls.INTERVAL_MS.get(interval)
+        if interval_ms is None:
+            raise ValueError(f"Intervalo sin duración fija: {interval}")
+
+        offset = cls.WEEK_OFFSET_MS if interval == '1w' else 0
+        open_time = (timestamp_ms - offset) // interval_ms * interval_ms + offset
+        return open_time, open_time + interval_ms - 1
+
     @staticmethod
     def calculate_candle_completion(open_time: int, close_time: int) -> tuple:
         """
@@ -255,10 +598,8 @@ class BinanceClient:
         Returns:
             True si la conexión es exitosa, False en caso contrario
         """
-        endpoint = f"{self.BASE_URL}/fapi/v1/ping"
-
         try:
-            response = self.session.get(endpoint, timeout=5)
+            response = self._send(self.BASE_URL, "/fapi/v1/ping", timeout=5)
             return response.status_code == 200
         except:
             return False
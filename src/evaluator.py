@@ -4,8 +4,10 @@ Compara estados entre actualizaciones para detectar cambios.
 """
 
 from typing import Dict, Any, List, Tuple, Optional
+import numpy as np
 import pandas as pd
 from .indicators import TechnicalIndicators
+from .indicator_kernel import compute_indicators, volume_series
 
 
 class ConditionEvaluator:
@@ -318,6 +320,169 @@ class ConditionEvaluator:
 
         return conditions, count, sl_tp_levels
 
+    @staticmethod
+    def evaluate_conditions_series(df: pd.DataFrame, df_spot: pd.DataFrame = None) -> Dict[str, np.ndarray]:
+        """
+        Evalúa las 7 condiciones LONG y SHORT en todas las velas de un DataFrame,
+        de forma vectorizada sobre las series completas de indicadores.
+
+        La fila i coincide con evaluate_long_conditions / evaluate_short_conditions
+        sobre calculate_all_indicators(df.iloc[:i + 1], df_spot.iloc[:i + 1])
+        (la vela i como vela actual).
+
+        Args:
+            df: DataFrame con datos OHLCV de FUTUROS ('open_time' o 'datetime' para el VWAP de sesión)
+            df_spot: DataFrame SPOT alineado con df (opcional, para MACD y Volumen)
+
+        Returns:
+            Diccionario con 'long_conditions' y 'short_conditions' (matrices booleanas
+            velas x 7, en el mismo orden que las listas de evaluate_*_conditions)
+            y 'long_count' / 'short_count' (condiciones cumplidas por vela)
+        """
+        if df_spot is not None and len(df_spot) != len(df):
+            raise ValueError("Los datos SPOT deben estar alineados con los de FUTUROS")
+
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        source = df_spot if df_spot is not None else df
+        series = compute_indicators(
+            close, high, low, volume, TechnicalIndicators._open_time_ms(df),
+            source_close=df_spot['close'].to_numpy(dtype=np.float64) if df_spot is not None else None
+        )
+        n = len(close)
+
+        # 1-2. EMAs
+        above_emas = (close > series['ema21']) & (close > series['ema50'])
+        below_emas = (close < series['ema21']) & (close < series['ema50'])
+
+        # 4. Bollinger (mismo orden de reglas que classify_bollinger_position)
+        prev_high = np.concatenate((close[:1], high[:-1]))
+        prev_low = np.concatenate((close[:1], low[:-1]))
+        prev_close = np.concatenate((close[:1], close[:-1]))
+        avg_volume = volume.copy()
+        if n >= 6:
+            avg_volume[5:] = np.lib.stride_tricks.sliding_window_view(volume, 5)[:-1].mean(axis=1)
+        bb_upper, bb_lower = series['bb_upper'], series['bb_lower']
+        with np.errstate(invalid='ignore'):
+            distance_to_upper = (bb_upper - close) / close * 100
+            distance_to_lower = (close - bb_lower) / close * 100
+        bb_state = np.select(
+            [(distance_to_lower < 0.5) & ((prev_low <= bb_lower) | (prev_close <= bb_lower)),
+             (close > bb_upper) & (volume > avg_volume),
+             (distance_to_upper < 0.5) & (prev_high >= bb_upper) & (close < bb_upper),
+             (close < bb_lower) & (volume > avg_volume)],
+            [1, 2, 3, 4], default=0
+        )
+
+        # 5. MACD (histogramas previos en 0 al inicio, como calculate_all_indicators)
+        histogram = series['macd_histogram']
+        histogram_prev = np.concatenate(([0.0], histogram[:-1]))
+        histogram_prev2 = np.concatenate(([0.0, 0.0], histogram[:-2]))[:n]
+        line_above = series['macd_line'] > series['macd_signal']
+        green_rising = (histogram > 0) & (histogram > histogram_prev) & (histogram_prev > histogram_prev2)
+        red_falling = ((histogram <= 0) & (np.abs(histogram) > np.abs(histogram_prev))
+                       & (np.abs(histogram_prev) > np.abs(histogram_prev2)))
+
+        # 6. Volumen (vela anterior cerrada vs Volume MA20, fuente SPOT si existe)
+        volumes = volume_series(source['volume'].to_numpy(), source['open'].to_numpy(),
+                                source['close'].to_numpy(), 20)
+        high_volume = volumes['change_pct_previous'] > 20
+
+        with np.errstate(invalid='ignore'):
+            long_conditions = np.column_stack((
+                above_emas,
+                series['ema21'] > series['ema50'],
+                (series['rsi'] >= 45) & (series['rsi'] <= 65),
+                (bb_state == 1) | (bb_state == 2),
+                line_above & green_rising,
+                high_volume & (volumes['bullish_candles'] > volumes['bearish_candles']),
+                close > series['vwap']
+            ))
+            short_conditions = np.column_stack((
+                below_emas,
+                series['ema21'] < series['ema50'],
+                (series['rsi'] >= 35) & (series['rsi'] <= 55),
+                (bb_state == 3) | (bb_state == 4),
+                ~line_above & red_falling,
+                high_volume & (volumes['bearish_candles'] > volumes['bullish_candles']),
+                close < series['vwap']
+            ))
+
+        return {
+            'long_conditions': long_conditions,
+            'long_count': long_conditions.sum(axis=1),
+            'short_conditions': short_conditions,
+            'short_count': short_conditions.sum(axis=1)
+        }
+
+    # Bits de las condiciones SHORT en la máscara combinada de encode_condition_series
+    SHORT_SHIFT = 8
+
+    @staticmethod
+    def encode_conditions(conditions: List[bool]) -> int:
+        """
+        Codifica las 7 condiciones como máscara de bits (bit i = condición i + 1).
+
+        Ejemplo: [True, True, False, False, False, False, True] -> 0b1000011 (67)
+        """
+        mask = 0
+        for i, condition in enumerate(conditions):
+            if condition:
+                mask |= 1 << i
+        return mask
+
+    @staticmethod
+    def decode_conditions(mask: int, count: int = 7) -> List[bool]:
+        """Lista de condiciones a partir de una máscara de encode_conditions"""
+        return [bool(mask >> i & 1) for i in range(count)]
+
+    @staticmethod
+    def state_mask(state: Dict[str, Any], side: str) -> int:
+        """
+        Máscara de condiciones de un estado guardado ('long' o 'short').
+        Acepta el formato actual ('long_mask') y el anterior (lista 'long_conditions').
+        """
+        mask = state.get(f'{side}_mask')
+        if mask is not None:
+            return int(mask)
+        return ConditionEvaluator.encode_conditions(state.get(f'{side}_conditions', []))
+
+    @staticmethod
+    def encode_condition_series(evaluation: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Codifica el historial de condiciones (resultado de evaluate_conditions_series)
+        como un entero por vela: bits 0-6 LONG y bits 8-14 SHORT (2 bytes por vela).
+
+        Returns:
+            Array uint16 (velas,)
+        """
+        weights = (1 << np.arange(evaluation['long_conditions'].shape[1])).astype(np.uint16)
+        long_mask = evaluation['long_conditions'].astype(np.uint16) @ weights
+        short_mask = evaluation['short_conditions'].astype(np.uint16) @ weights
+        return long_mask | (short_mask << ConditionEvaluator.SHORT_SHIFT)
+
+    @staticmethod
+    def decode_condition_series(masks: np.ndarray, count: int = 7) -> Dict[str, np.ndarray]:
+        """
+        Inversa de encode_condition_series.
+
+        Returns:
+            Diccionario con 'long_conditions', 'short_conditions' (velas x count)
+            y 'long_count' / 'short_count'
+        """
+        masks = np.asarray(masks, dtype=np.uint16)
+        bits = np.arange(count, dtype=np.uint16)
+        long_conditions = (masks[:, None] >> bits & 1).astype(bool)
+        short_conditions = (masks[:, None] >> (bits + ConditionEvaluator.SHORT_SHIFT) & 1).astype(bool)
+        return {
+            'long_conditions': long_conditions,
+            'long_count': long_conditions.sum(axis=1),
+            'short_conditions': short_conditions,
+            'short_count': short_conditions.sum(axis=1)
+        }
+
     @staticmethod
     def detect_changes(old_state: Dict[str, Any], new_state: Dict[str, Any],
                       timeframe: str) -> Dict[str, Any]:
@@ -355,22 +520,20 @@ class ConditionEvaluator:
             changes['short_count_change'] = True
             changes['has_changes'] = True
 
-        # Comparar condiciones individuales
-        for i in range(7):
-            if old_state['long_conditions'][i] != new_state['long_conditions'][i]:
-                changes['condition_changes']['long'].append({
-                    'index': i,
-                    'old': old_state['long_conditions'][i],
-                    'new': new_state['long_conditions'][i]
-                })
-                changes['has_changes'] = True
-
-            if old_state['short_conditions'][i] != new_state['short_conditions'][i]:
-                changes['condition_changes']['short'].append({
+        # Comparar condiciones individuales: XOR de las máscaras (bits que cambiaron)
+        for side in ('long', 'short'):
+            old_mask = ConditionEvaluator.state_mask(old_state, side)
+            new_mask = ConditionEvaluator.state_mask(new_state, side)
+            changed = old_mask ^ new_mask
+            while changed:
+                i = (changed & -changed).bit_length() - 1
+                changes['condition_changes'][side].append({
                     'index': i,
-                    'old': old_state['short_conditions'][i],
-                    'new': new_state['short_conditions'][i]
+                    'old': bool(old_mask >> i & 1),
+                    'new': bool(new_mask >> i & 1)
                 })
+                changed &= changed - 1
+            if old_mask != new_mask:
                 changes['has_changes'] = True
 
         # Comparar valores de indicadores (cambios significativos)
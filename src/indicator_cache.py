@@ -0,0 +1,150 @@
+"""
+Memoización de indicadores por identidad de vela.
+Mientras no cierre una vela nueva, las velas confirmadas de una ventana no
+cambian: se guarda el motor incremental (IncrementalIndicators) ya calentado
+con ellas y en cada llamada solo se recalculan los valores provisionales de la
+vela en progreso (snapshot). Las entradas se descartan por LRU con un
+presupuesto de memoria acotado.
+"""
+
+import sys
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import pandas as pd
+
+from .streaming_indicators import IncrementalIndicators
+
+
+class IndicatorCache:
+    """Caché LRU segura para hilos de motores incrementales, con contadores de uso"""
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Memoria máxima estimada de los motores guardados
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        # key -> (motor, tamaño estimado)
+        self._entries: "OrderedDict[Hashable, Tuple[IncrementalIndicators, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _window_identity(df: Optional[pd.DataFrame]) -> Optional[Tuple[int, int, int]]:
+        """Primera apertura, último cierre confirmado y número de velas de una ventana"""
+        if df is None:
+            return None
+        close_time = df['close_time'].to_numpy()
+        return int(df['open_time'].to_numpy()[0]), int(close_time[-2]), len(close_time)
+
+    @staticmethod
+    def make_key(market: str, symbol: str, interval: str, df: pd.DataFrame,
+                 df_spot: Optional[pd.DataFrame] = None, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """
+        Clave de una ventana: mercado, símbolo, intervalo, velas confirmadas
+        (close_time de la última cerrada) y parámetros de los indicadores.
+
+        La primera apertura también forma parte de la clave porque las EMA se
+        siembran con el primer cierre de la ventana.
+        """
+        return (market, symbol, interval,
+                IndicatorCache._window_identity(df), IndicatorCache._window_identity(df_spot),
+                tuple(sorted((params or {}).items())))
+
+    @staticmethod
+    def _estimate_size(obj: Any, seen: Optional[set] = None) -> int:
+        """Tamaño aproximado en bytes de un objeto y de lo que contiene"""
+        if seen is None:
+            seen = set()
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+
+        size = sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            size += sum(IndicatorCache._estimate_size(k, seen) + IndicatorCache._estimate_size(v, seen)
+                        for k, v in obj.items())
+        elif isinstance(obj, (list, tuple, set, deque)):
+            size += sum(IndicatorCache._estimate_size(item, seen) for item in obj)
+        elif hasattr(obj, '__dict__'):
+            size += IndicatorCache._estimate_size(vars(obj), seen)
+        return size
+
+    def calculate_all_indicators(self, symbol: str, interval: str, df: pd.DataFrame,
+                                 df_spot: pd.DataFrame = None, market: str = 'futures',
+                                 **params) -> Dict[str, Any]:
+        """
+        Mismo resultado que TechnicalIndicators.calculate_all_indicators, reutilizando
+        las velas confirmadas si la ventana ya se calculó.
+
+        Args:
+            symbol: Par de trading
+            interval: Timeframe de las velas
+            df: DataFrame de FUTUROS (la última vela se considera en progreso)
+            df_spot: DataFrame SPOT opcional (para MACD y Volumen)
+            market: Mercado de las velas (parte de la clave)
+            **params: Períodos de IncrementalIndicators (por defecto los de calculate_all_indicators)
+
+        Returns:
+            Diccionario con todos los indicadores calculados
+        """
+        if len(df) < 50:
+            raise ValueError("No hay suficientes datos para calcular indicadores")
+
+        if df_spot is not None and len(df_spot) < 50:
+            raise ValueError("No hay suficientes datos SPOT para calcular indicadores")
+
+        key = self.make_key(market, symbol, interval, df, df_spot, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            engine = entry[0]
+        else:
+            engine = IncrementalIndicators.from_dataframe(df, df_spot, **params)
+            self._store(key, engine)
+
+        candle = df.iloc[-1]
+        spot_candle = df_spot.iloc[-1] if df_spot is not None else None
+        # snapshot() no modifica el estado confirmado: el motor se puede compartir
+        return engine.snapshot(candle, spot_candle)
+
+    def _store(self, key: Hashable, engine: IncrementalIndicators):
+        """Guarda un motor y descarta los menos usados hasta respetar max_bytes"""
+        size = self._estimate_size(engine)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (engine, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso de la caché"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.bytes
+        }
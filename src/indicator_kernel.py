@@ -0,0 +1,505 @@
+"""
+Kernel NumPy de indicadores técnicos.
+Calcula EMA 21/50, RSI y ATR de Wilder, Bollinger, VWAP de sesión y MACD
+directamente sobre los arrays de cierre/máximo/mínimo/volumen, escribiendo en
+arrays de salida preasignados, sin crear Series intermedias de pandas.
+Mismas semillas que TechnicalIndicators (EMA con adjust=False, Bollinger con ddof=1).
+Las recurrencias (EMA, Wilder) se delegan en src/smoothers.py.
+"""
+
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .smoothers import ewm, ewm_multi, wilder_rsi, wilder_atr, true_range_numpy
+
+
+MS_PER_DAY = 86_400_000
+
+# Filas por fragmento en rolling_mean_std() (acota la memoria temporal)
+_ROLLING_CHUNK = 65536
+
+
+def rolling_mean_std(values: np.ndarray, period: int,
+                     mean_out: Optional[np.ndarray] = None,
+                     std_out: Optional[np.ndarray] = None) -> tuple:
+    """
+    Media y desviación estándar móviles (ddof=1) sobre el último eje, NaN en las
+    primeras period-1 velas. Cada ventana se calcula en dos pasadas (sin restar
+    sumas acumuladas grandes).
+
+    Returns:
+        Tupla (media, desviación)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = x.shape[-1]
+    if mean_out is None:
+        mean_out = np.empty(x.shape)
+    if std_out is None:
+        std_out = np.empty(x.shape)
+
+    mean_out[..., :period - 1] = np.nan
+    std_out[..., :period - 1] = np.nan
+    if n < period:
+        mean_out[...] = np.nan
+        std_out[...] = np.nan
+        return mean_out, std_out
+
+    windows = np.lib.stride_tricks.sliding_window_view(x, period, axis=-1)
+    count = windows.shape[-2]
+    chunk_size = max(1, _ROLLING_CHUNK // max(1, x.size // n))
+    for start in range(0, count, chunk_size):
+        chunk = windows[..., start:start + chunk_size, :]
+        mean = chunk.mean(axis=-1)
+        deviations = chunk - mean[..., None]
+        row = start + period - 1
+        stop = row + chunk.shape[-2]
+        mean_out[..., row:stop] = mean
+        std_out[..., row:stop] = np.sqrt(
+            np.einsum('...ij,...ij->...i', deviations, deviations) / (period - 1)
+        )
+
+    return mean_out, std_out
+
+
+def _vwap_cumsums(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  volume: np.ndarray) -> tuple:
+    """Precio típico x volumen y sumas acumuladas (una sola pasada para todas las VWAP)"""
+    volume = np.asarray(volume, dtype=np.float64)
+    pv = (np.asarray(high, dtype=np.float64) + low + close) / 3 * volume
+    return pv, volume, np.cumsum(pv, axis=-1), np.cumsum(volume, axis=-1)
+
+
+def session_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                 open_time: Optional[np.ndarray] = None,
+                 out: Optional[np.ndarray] = None,
+                 session_ms: int = MS_PER_DAY) -> np.ndarray:
+    """
+    VWAP que se reinicia en cada sesión UTC (00:00) para toda la serie, con
+    sumas acumuladas agrupadas por sesión. Sin open_time acumula toda la serie.
+
+    Args:
+        high, low, close, volume: Arrays OHLCV (serie o panel símbolos x tiempo)
+        open_time: Apertura de cada vela (ms); en un panel puede ser común (tiempo,)
+        out: Array de salida preasignado (opcional)
+        session_ms: Duración de la sesión (default 1 día)
+
+    Returns:
+        Array con el VWAP de la sesión de cada vela
+    """
+    shape = np.shape(close)
+    if out is None:
+        out = np.empty(shape)
+    if out.size == 0:
+        return out
+
+    pv, volume, cum_pv, cum_volume = _vwap_cumsums(high, low, close, volume)
+
+    if open_time is None:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            np.divide(cum_pv, cum_volume, out=out)
+        return out
+
+    n = shape[-1]
+    session = np.broadcast_to(np.asarray(open_time, dtype=np.int64) // session_ms, shape)
+    is_start = np.empty(shape, dtype=bool)
+    is_start[..., 0] = True
+    np.not_equal(session[..., 1:], session[..., :-1], out=is_start[..., 1:])
+    session_start = np.maximum.accumulate(np.where(is_start, np.arange(n), 0), axis=-1)
+
+    # Acumulados anteriores al inicio de la sesión de cada vela
+    base_pv = (np.take_along_axis(cum_pv, session_start, axis=-1)
+               - np.take_along_axis(pv, session_start, axis=-1))
+    base_volume = (np.take_along_axis(cum_volume, session_start, axis=-1)
+                   - np.take_along_axis(volume, session_start, axis=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(cum_pv - base_pv, cum_volume - base_volume, out=out)
+    return out
+
+
+def anchored_vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                  open_time: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+    """
+    VWAP anclados: cada uno acumula desde la primera vela con open_time >= ancla.
+    Todas las anclas comparten las mismas sumas acumuladas (una pasada por la serie).
+
+    Args:
+        high, low, close, volume: Arrays OHLCV
+        open_time: Apertura de cada vela (ms, ordenado)
+        anchors: Instantes de anclaje (ms)
+
+    Returns:
+        Array (anclas x velas), NaN antes de cada ancla
+    """
+    anchors = np.atleast_1d(np.asarray(anchors, dtype=np.int64))
+    n = len(close)
+    out = np.full((len(anchors), n), np.nan)
+    if n == 0:
+        return out
+
+    _, _, cum_pv, cum_volume = _vwap_cumsums(high, low, close, volume)
+    starts = np.searchsorted(np.asarray(open_time, dtype=np.int64), anchors)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for row, start in enumerate(starts):
+            if start >= n:
+                continue
+            base_pv = cum_pv[start - 1] if start > 0 else 0.0
+            base_volume = cum_volume[start - 1] if start > 0 else 0.0
+            np.divide(cum_pv[start:] - base_pv, cum_volume[start:] - base_volume, out=out[row, start:])
+    return out
+
+
+def compute_indicators(close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                       volume: np.ndarray, open_time: Optional[np.ndarray] = None,
+                       source_close: Optional[np.ndarray] = None,
+                       ema_fast: int = 21, ema_slow: int = 50, rsi_period: int = 14,
+                       bb_period: int = 20, bb_std: float = 2.0, atr_period: int = 14,
+                       macd_fast: int = 12, macd_slow: int = 26,
+                       macd_signal: int = 9) -> Dict[str, np.ndarray]:
+    """
+    Calcula la serie completa de cada indicador. Acepta series (tiempo,) o
+    paneles (símbolos, tiempo): todas las operaciones van sobre el último eje.
+
+    Args:
+        close, high, low, volume: Arrays de FUTUROS
+        open_time: Apertura de cada vela (ms), para reiniciar el VWAP por sesión
+        source_close: Cierres para el MACD (SPOT); si es None se usa `close`
+
+    Returns:
+        Diccionario de arrays: ema21, ema50, rsi, bb_upper, bb_middle, bb_lower,
+        vwap, atr, macd_line, macd_signal, macd_histogram
+    """
+    close = np.asarray(close, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    source = close if source_close is None else np.asarray(source_close, dtype=np.float64)
+
+    result = {name: np.empty(close.shape) for name in (
+        'ema21', 'ema50', 'rsi', 'bb_upper', 'bb_middle', 'bb_lower', 'vwap', 'atr'
+    )}
+    result.update({name: np.empty(source.shape) for name in ('macd_line', 'macd_signal', 'macd_histogram')})
+    if close.size == 0:
+        return result
+
+    ewm(close, 2 / (ema_fast + 1), out=result['ema21'])
+    ewm(close, 2 / (ema_slow + 1), out=result['ema50'])
+
+    # RSI y ATR de Wilder (backend compilado si numba está instalado)
+    wilder_rsi(close, rsi_period, out=result['rsi'])
+    wilder_atr(high, low, close, atr_period, out=result['atr'])
+
+    # Bollinger (desviación con ddof=1 como rolling().std())
+    middle, std = rolling_mean_std(close, bb_period, mean_out=result['bb_middle'])
+    std *= bb_std
+    np.add(middle, std, out=result['bb_upper'])
+    np.subtract(middle, std, out=result['bb_lower'])
+
+    session_vwap(high, low, close, volume, open_time, out=result['vwap'])
+
+    # MACD sobre la fuente (SPOT si existe)
+    macd_line = result['macd_line']
+    ewm(source, 2 / (macd_fast + 1), out=macd_line)
+    macd_line -= ewm(source, 2 / (macd_slow + 1))
+    ewm(macd_line, 2 / (macd_signal + 1), out=result['macd_signal'])
+    np.subtract(macd_line, result['macd_signal'], out=result['macd_histogram'])
+
+    return result
+
+
+def ema_grid(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """
+    EMA de varios períodos en una sola llamada.
+
+    Args:
+        close: Serie de cierres (tiempo,)
+        periods: Períodos de EMA
+
+    Returns:
+        Matriz (períodos, tiempo); la fila i coincide con calculate_ema(df, periods[i])
+    """
+    periods = np.asarray(periods, dtype=np.float64)
+    return ewm_multi(close, 2 / (periods + 1))
+
+
+def rsi_grid(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """
+    RSI de Wilder de varios períodos: las ganancias/pérdidas se calculan una
+    sola vez y se suavizan con el alpha de cada período.
+
+    Returns:
+        Matriz (períodos, tiempo); la fila i coincide con calculate_rsi(df, periods[i])
+    """
+    close = np.asarray(close, dtype=np.float64)
+    alphas = 1 / np.asarray(periods, dtype=np.float64)
+    delta = np.zeros(close.shape)
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+
+    rsi = ewm_multi(np.maximum(delta, 0.0), alphas)
+    avg_loss = ewm_multi(np.maximum(-delta, 0.0), alphas)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsi /= avg_loss
+        rsi += 1.0
+        np.divide(100.0, rsi, out=rsi)
+        np.subtract(100.0, rsi, out=rsi)
+    return rsi
+
+
+def atr_grid(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+             periods: Sequence[int]) -> np.ndarray:
+    """
+    ATR de Wilder de varios períodos (el True Range se calcula una sola vez).
+
+    Returns:
+        Matriz (períodos, tiempo); la fila i coincide con calculate_atr(df, periods[i])
+    """
+    true_range = true_range_numpy(high, low, close)
+    return ewm_multi(true_range, 1 / np.asarray(periods, dtype=np.float64))
+
+
+def bollinger_grid(close: np.ndarray, configs: Sequence[Tuple[int, float]]) -> Dict[str, np.ndarray]:
+    """
+    Bandas de Bollinger de varias configuraciones (período, desviaciones).
+    La media y la desviación se calculan una vez por período distinto.
+
+    Returns:
+        Diccionario con 'upper', 'middle', 'lower': matrices (configuraciones, tiempo)
+    """
+    close = np.asarray(close, dtype=np.float64)
+    periods = sorted({int(period) for period, _ in configs})
+    rolling = {period: rolling_mean_std(close, period) for period in periods}
+
+    shape = (len(configs), close.shape[-1])
+    result = {name: np.empty(shape) for name in ('upper', 'middle', 'lower')}
+    for row, (period, std_dev) in enumerate(configs):
+        middle, std = rolling[int(period)]
+        result['middle'][row] = middle
+        np.multiply(std, std_dev, out=result['upper'][row])
+        np.subtract(middle, result['upper'][row], out=result['lower'][row])
+        result['upper'][row] += middle
+    return result
+
+
+def macd_grid(close: np.ndarray, configs: Sequence[Tuple[int, int, int]]) -> Dict[str, np.ndarray]:
+    """
+    MACD de varias configuraciones (rápida, lenta, señal). Cada EMA distinta
+    se calcula una sola vez y las señales de todas las líneas en una llamada.
+
+    Returns:
+        Diccionario con 'macd', 'signal', 'histogram': matrices (configuraciones, tiempo)
+    """
+    periods = sorted({int(p) for fast, slow, _ in configs for p in (fast, slow)})
+    emas = ema_grid(close, periods)
+    row_of = {period: row for row, period in enumerate(periods)}
+
+    fast_rows = [row_of[int(fast)] for fast, _, _ in configs]
+    slow_rows = [row_of[int(slow)] for _, slow, _ in configs]
+    macd_line = emas[fast_rows] - emas[slow_rows]
+    signal = ewm_multi(macd_line, [2 / (int(s) + 1) for _, _, s in configs])
+    return {
+        'macd': macd_line,
+        'signal': signal,
+        'histogram': macd_line - signal
+    }
+
+
+def volume_summary(volume: np.ndarray, open_price: np.ndarray, close: np.ndarray,
+                   lookback: int = 20) -> Dict[str, Any]:
+    """
+    Mismo resultado que TechnicalIndicators.analyze_volume sobre arrays.
+
+    Args:
+        volume, open_price, close: Arrays de la fuente de volumen (SPOT o FUTUROS)
+        lookback: Velas cerradas para contar alcistas/bajistas
+
+    Returns:
+        Diccionario con análisis de volumen
+    """
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(volume)
+    current_volume = volume[-1]
+    previous_volume = volume[-2]
+    avg_volume_20 = volume[-21:-1].mean() if n >= 21 else volume[:-1].mean()
+
+    volume_change_current = ((current_volume - avg_volume_20) / avg_volume_20) * 100 if avg_volume_20 > 0 else 0
+    volume_change_previous = ((previous_volume - avg_volume_20) / avg_volume_20) * 100 if avg_volume_20 > 0 else 0
+
+    # Velas cerradas desde -lookback-1 hasta -2 (excluye la vela en progreso)
+    start = max(n - lookback - 1, 0)
+    bullish = close[start:n - 1] > open_price[start:n - 1]
+    bullish_count = int(np.count_nonzero(bullish))
+
+    return {
+        'current': current_volume,
+        'previous': previous_volume,
+        'avg_20': avg_volume_20,
+        'change_pct_current': volume_change_current,
+        'change_pct_previous': volume_change_previous,
+        'bullish_candles': bullish_count,
+        'bearish_candles': len(bullish) - bullish_count,
+        'total_candles': len(bullish)
+    }
+
+
+def volume_summary_panel(volume: np.ndarray, open_price: np.ndarray, close: np.ndarray,
+                         lookback: int = 20) -> Dict[str, np.ndarray]:
+    """
+    volume_summary para un panel (símbolos, tiempo): un array por campo, una fila por símbolo.
+    """
+    volume = np.asarray(volume, dtype=np.float64)
+    n = volume.shape[-1]
+    current_volume = volume[:, -1]
+    previous_volume = volume[:, -2]
+    avg_volume_20 = volume[:, -21:-1].mean(axis=1) if n >= 21 else volume[:, :-1].mean(axis=1)
+
+    positive = avg_volume_20 > 0
+    safe_avg = np.where(positive, avg_volume_20, 1.0)
+    start = max(n - lookback - 1, 0)
+    bullish_count = np.count_nonzero(close[:, start:n - 1] > open_price[:, start:n - 1], axis=1)
+
+    return {
+        'current': current_volume,
+        'previous': previous_volume,
+        'avg_20': avg_volume_20,
+        'change_pct_current': np.where(positive, (current_volume - avg_volume_20) / safe_avg * 100, 0),
+        'change_pct_previous': np.where(positive, (previous_volume - avg_volume_20) / safe_avg * 100, 0),
+        'bullish_candles': bullish_count,
+        'bearish_candles': (n - 1 - start) - bullish_count,
+        'total_candles': np.full(len(volume), n - 1 - start)
+    }
+
+
+def latest_indicators(series: Dict[str, np.ndarray], price: float,
+                      volume_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Arma el diccionario de calculate_all_indicators con el último valor de cada serie.
+    """
+    histogram = series['macd_histogram']
+    return {
+        'price': np.float64(price),
+        'ema21': series['ema21'][-1],
+        'ema50': series['ema50'][-1],
+        'rsi': series['rsi'][-1],
+        'bb_upper': series['bb_upper'][-1],
+        'bb_middle': series['bb_middle'][-1],
+        'bb_lower': series['bb_lower'][-1],
+        'macd_line': series['macd_line'][-1],
+        'macd_signal': series['macd_signal'][-1],
+        'macd_histogram': histogram[-1],
+        'macd_histogram_prev': histogram[-2] if len(histogram) >= 2 else 0,
+        'macd_histogram_prev2': histogram[-3] if len(histogram) >= 3 else 0,
+        'vwap': series['vwap'][-1],
+        'volume': volume_analysis,
+        'atr': series['atr'][-1]
+    }
+
+
+def panel_latest_indicators(series: Dict[str, np.ndarray], close: np.ndarray,
+                            volume_analysis: Dict[str, np.ndarray], row: int) -> Dict[str, Any]:
+    """
+    Diccionario de calculate_all_indicators para una fila (símbolo) de un panel.
+    """
+    volume_row = {key: values[row] for key, values in volume_analysis.items()}
+    for key in ('bullish_candles', 'bearish_candles', 'total_candles'):
+        volume_row[key] = int(volume_row[key])
+    return latest_indicators({name: values[row] for name, values in series.items()},
+                             close[row, -1], volume_row)
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Suma de los `window` valores anteriores a cada posición (excluye la propia),
+    con ventanas más cortas al inicio de la serie.
+    """
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    index = np.arange(len(values))
+    return cumulative[index] - cumulative[np.maximum(index - window, 0)]
+
+
+def volume_series(volume: np.ndarray, open_price: np.ndarray, close: np.ndarray,
+                  lookback: int = 20, ma_period: int = 20) -> Dict[str, np.ndarray]:
+    """
+    volume_summary para cada vela de la serie, tratando cada vela como la "actual":
+    el valor en la posición i coincide con analyze_volume(df.iloc[:i + 1]).
+
+    Returns:
+        Diccionario de arrays: avg_20, change_pct_current, change_pct_previous,
+        bullish_candles, bearish_candles, total_candles (NaN/0 en la primera vela)
+    """
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(volume)
+    index = np.arange(n)
+
+    # Volume MA de las velas anteriores (todas las disponibles si hay menos de ma_period)
+    previous_count = np.minimum(index, ma_period)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg = _rolling_sum(volume, ma_period) / previous_count
+
+    previous_volume = np.concatenate(([np.nan], volume[:-1]))
+    positive = avg > 0
+    safe_avg = np.where(positive, avg, 1.0)
+
+    bullish = _rolling_sum(close > open_price, lookback).astype(np.int64)
+    total = np.minimum(index, lookback)
+
+    return {
+        'avg_20': avg,
+        'change_pct_current': np.where(positive, (volume - avg) / safe_avg * 100, 0.0),
+        'change_pct_previous': np.where(positive, (previous_volume - avg) / safe_avg * 100, 0.0),
+        'bullish_candles': bullish,
+        'bearish_candles': total - bullish,
+        'total_candles': total
+    }
+
+
+def candle_momentum_series(open_price: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                           count: int = 3, ma_period: int = 20) -> Dict[str, np.ndarray]:
+    """
+    analyze_last_candles para cada vela de la serie: en la posición i analiza las
+    `count` velas cerradas anteriores (i-count .. i-1), como analyze_last_candles(df.iloc[:i + 1]).
+
+    Returns:
+        Diccionario de arrays: bullish_count, bearish_count, above_average,
+        trend y volume_trend (etiquetas de texto)
+    """
+    volume = np.asarray(volume, dtype=np.float64)
+    n = len(volume)
+    index = np.arange(n)
+
+    # Promedio de volumen: 20 velas cerradas, o toda la serie disponible (incluida la actual) si hay menos de 21
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_volume = np.where(
+            index >= ma_period,
+            _rolling_sum(volume, ma_period) / ma_period,
+            np.cumsum(volume) / (index + 1)
+        )
+
+    window = np.minimum(index, count)
+    bullish_count = _rolling_sum(close > open_price, count).astype(np.int64)
+    bearish_count = window - bullish_count
+
+    # Velas del bloque con volumen sobre el promedio de la vela analizada
+    padded = np.concatenate((np.full(count, np.nan), volume))
+    previous = np.lib.stride_tricks.sliding_window_view(padded, count)[:n]
+    above_average = np.count_nonzero(previous > avg_volume[:, None], axis=1)
+    volume_increasing = above_average >= 2
+
+    trend = np.select(
+        [(bullish_count == count) & volume_increasing,
+         bullish_count >= 2,
+         (bearish_count == count) & volume_increasing,
+         bearish_count >= 2],
+        ["Fuertemente alcista", "Alcista", "Fuertemente bajista", "Bajista"],
+        default="Lateral"
+    )
+    volume_trend = np.where(volume_increasing, "Creciente",
+                            np.where(above_average == 0, "Decreciente", "Estable"))
+
+    return {
+        'bullish_count': bullish_count,
+        'bearish_count': bearish_count,
+        'above_average': above_average,
+        'trend': trend,
+        'volume_trend': volume_trend
+    }
@@ -5,12 +5,29 @@ Utiliza pandas_ta para los cálculos base.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+from .indicator_kernel import (compute_indicators, volume_summary, latest_indicators,
+                               session_vwap, anchored_vwap, volume_summary_panel,
+                               panel_latest_indicators, volume_series, candle_momentum_series,
+                               ema_grid, rsi_grid, atr_grid, bollinger_grid, macd_grid)
+from .smoothers import ewm, wilder_rsi, wilder_atr
 
 
 class TechnicalIndicators:
     """Clase para calcular indicadores técnicos"""
 
+    @staticmethod
+    def _smooth(series: pd.Series, alpha: float) -> pd.Series:
+        """
+        Equivale a series.ewm(alpha=alpha, adjust=False).mean() usando el backend
+        de src/smoothers (compilado si numba está instalado). Con NaN usa pandas.
+        """
+        values = series.to_numpy(dtype=np.float64)
+        if np.isnan(values).any():
+            return series.ewm(alpha=alpha, adjust=False).mean()
+        return pd.Series(ewm(values, alpha), index=series.index, name=series.name)
+
     @staticmethod
     def calculate_ema(df: pd.DataFrame, period: int) -> pd.Series:
         """
@@ -23,7 +40,7 @@ class TechnicalIndicators:
         Returns:
             Series con valores EMA
         """
-        return df['close'].ewm(span=period, adjust=False).mean()
+        return TechnicalIndicators._smooth(df['close'], 2 / (period + 1))
 
     @staticmethod
     def calculate_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
@@ -38,6 +55,11 @@ class TechnicalIndicators:
         Returns:
             Series con valores RSI
         """
+        close = df['close'].to_numpy(dtype=np.float64)
+        if not np.isnan(close).any():
+            # Backend de src/smoothers: un solo recorrido, mismo resultado que abajo
+            return pd.Series(wilder_rsi(close, period), index=df.index)
+
         delta = df['close'].diff()
 
         gain = delta.where(delta > 0, 0)
@@ -94,11 +116,11 @@ class TechnicalIndicators:
         Returns:
             Diccionario con 'macd', 'signal', 'histogram'
         """
-        ema_fast = df['close'].ewm(span=fast, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=slow, adjust=False).mean()
+        ema_fast = TechnicalIndicators._smooth(df['close'], 2 / (fast + 1))
+        ema_slow = TechnicalIndicators._smooth(df['close'], 2 / (slow + 1))
 
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+        signal_line = TechnicalIndicators._smooth(macd_line, 2 / (signal + 1))
         histogram = macd_line - signal_line
 
         return {
@@ -123,6 +145,11 @@ class TechnicalIndicators:
         low = df['low']
         close = df['close']
 
+        arrays = [column.to_numpy(dtype=np.float64) for column in (high, low, close)]
+        if not any(np.isnan(values).any() for values in arrays):
+            # Backend de src/smoothers: un solo recorrido, mismo resultado que abajo
+            return pd.Series(wilder_atr(*arrays, period), index=df.index)
+
         # True Range components
         tr1 = high - low
         tr2 = abs(high - close.shift(1))
@@ -137,6 +164,11 @@ class TechnicalIndicators:
 
         return atr
 
+    # Código del límite aplicado al SL (array 'clamp' de calculate_sl_tp_arrays)
+    SL_CLAMP_NONE = 0
+    SL_CLAMP_MAX = 1
+    SL_CLAMP_MIN = -1
+
     @staticmethod
     def calculate_sl_tp_with_atr(price: float, atr: float, direction: str = 'LONG') -> Dict[str, Any]:
         """
@@ -155,44 +187,25 @@ class TechnicalIndicators:
         Returns:
             Diccionario con niveles de precio, porcentajes y risk/reward
         """
-        # Paso 1: Calcular porcentaje SL base
-        sl_base_distance = atr * 2.0
-        porcentaje_sl_base = (sl_base_distance / price) * 100
+        levels = TechnicalIndicators.calculate_sl_tp_arrays(price, atr)
+        side = 'long' if direction == 'LONG' else 'short'
 
-        # Paso 2: Aplicar reglas de seguridad
-        limite_aplicado = None
-        if porcentaje_sl_base > 3.0:
-            porcentaje_sl_final = 3.0
+        clamp = int(levels['clamp'])
+        if clamp == TechnicalIndicators.SL_CLAMP_MAX:
             limite_aplicado = "MÁXIMO (3.0%)"
-        elif porcentaje_sl_base < 1.5:
-            porcentaje_sl_final = 1.5
+        elif clamp == TechnicalIndicators.SL_CLAMP_MIN:
             limite_aplicado = "MÍNIMO (1.5%)"
         else:
-            porcentaje_sl_final = porcentaje_sl_base
             limite_aplicado = None
 
-        # Paso 3: Calcular porcentajes de TPs con ratios fijos
-        porcentaje_tp1 = porcentaje_sl_final * 1.5
-        porcentaje_tp2 = porcentaje_sl_final * 2.25
-
-        # Paso 4: Convertir a precios concretos
-        if direction == 'LONG':
-            sl = price - (price * porcentaje_sl_final / 100)
-            tp1 = price + (price * porcentaje_tp1 / 100)
-            tp2 = price + (price * porcentaje_tp2 / 100)
-        else:  # SHORT
-            sl = price + (price * porcentaje_sl_final / 100)
-            tp1 = price - (price * porcentaje_tp1 / 100)
-            tp2 = price - (price * porcentaje_tp2 / 100)
-
         return {
-            'sl': sl,
-            'tp1': tp1,
-            'tp2': tp2,
-            'sl_pct': porcentaje_sl_final,
-            'tp1_pct': porcentaje_tp1,
-            'tp2_pct': porcentaje_tp2,
-            'sl_base_pct': porcentaje_sl_base,
+            'sl': float(levels[f'{side}_sl']),
+            'tp1': float(levels[f'{side}_tp1']),
+            'tp2': float(levels[f'{side}_tp2']),
+            'sl_pct': float(levels['sl_pct']),
+            'tp1_pct': float(levels['tp1_pct']),
+            'tp2_pct': float(levels['tp2_pct']),
+            'sl_base_pct': float(levels['sl_base_pct']),
             'limite_aplicado': limite_aplicado,
             'risk_reward_tp1': 1.5,
             'risk_reward_tp2': 2.25,
@@ -200,61 +213,149 @@ class TechnicalIndicators:
         }
 
     @staticmethod
-    def calculate_vwap(df: pd.DataFrame) -> pd.Series:
+    def calculate_sl_tp_arrays(price: Union[float, np.ndarray], atr: Union[float, np.ndarray],
+                               atr_multiplier: float = 2.0, min_sl_pct: float = 1.5,
+                               max_sl_pct: float = 3.0, tp1_ratio: float = 1.5,
+                               tp2_ratio: float = 2.25) -> Dict[str, np.ndarray]:
         """
-        Calcula VWAP (Volume Weighted Average Price) de sesión.
-        VWAP se reinicia al inicio de cada sesión (00:00 UTC) según estándar de Binance.
+        Versión vectorizada de calculate_sl_tp_with_atr: niveles de todas las
+        velas y de ambas direcciones a la vez (mismas operaciones, mismos valores).
 
         Args:
-            df: DataFrame con columnas 'high', 'low', 'close', 'volume', 'datetime'
+            price: Precio de cada vela (array o escalar)
+            atr: ATR de cada vela (misma forma que price)
+            atr_multiplier: Distancia del SL base en ATRs
+            min_sl_pct: Límite mínimo del SL (%)
+            max_sl_pct: Límite máximo del SL (%)
+            tp1_ratio: TP1 = SL x tp1_ratio (en %)
+            tp2_ratio: TP2 = SL x tp2_ratio (en %)
 
         Returns:
-            Series con valores VWAP
+            Diccionario de arrays: sl_base_pct, sl_pct, tp1_pct, tp2_pct,
+            clamp (int8: SL_CLAMP_NONE, SL_CLAMP_MAX o SL_CLAMP_MIN) y los precios
+            long_sl, long_tp1, long_tp2, short_sl, short_tp1, short_tp2
         """
-        from datetime import datetime, timezone
+        price = np.asarray(price, dtype=np.float64)
+        atr = np.asarray(atr, dtype=np.float64)
+
+        sl_base_pct = (atr * atr_multiplier / price) * 100
+        above = sl_base_pct > max_sl_pct
+        below = sl_base_pct < min_sl_pct
+        sl_pct = np.where(above, max_sl_pct, np.where(below, min_sl_pct, sl_base_pct))
+        clamp = np.where(above, TechnicalIndicators.SL_CLAMP_MAX,
+                         np.where(below, TechnicalIndicators.SL_CLAMP_MIN,
+                                  TechnicalIndicators.SL_CLAMP_NONE)).astype(np.int8)
+
+        tp1_pct = sl_pct * tp1_ratio
+        tp2_pct = sl_pct * tp2_ratio
+        sl_distance = price * sl_pct / 100
+        tp1_distance = price * tp1_pct / 100
+        tp2_distance = price * tp2_pct / 100
 
-        # Obtener inicio del día actual en UTC (00:00:00)
-        now_utc = datetime.now(timezone.utc)
-        start_of_day_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-        start_timestamp_ms = int(start_of_day_utc.timestamp() * 1000)
+        return {
+            'sl_base_pct': sl_base_pct,
+            'sl_pct': sl_pct,
+            'tp1_pct': tp1_pct,
+            'tp2_pct': tp2_pct,
+            'clamp': clamp,
+            'long_sl': price - sl_distance,
+            'long_tp1': price + tp1_distance,
+            'long_tp2': price + tp2_distance,
+            'short_sl': price + sl_distance,
+            'short_tp1': price - tp1_distance,
+            'short_tp2': price - tp2_distance
+        }
+
+    @staticmethod
+    def select_sl_tp(levels: Dict[str, np.ndarray], direction: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Niveles de la dirección de cada vela a partir de calculate_sl_tp_arrays.
+
+        Args:
+            levels: Resultado de calculate_sl_tp_arrays
+            direction: 1 (LONG) o -1 (SHORT) por vela (0 se trata como LONG)
+
+        Returns:
+            Diccionario de arrays: sl, tp1, tp2, sl_pct, clamp
+        """
+        is_long = np.asarray(direction) >= 0
+        return {
+            'sl': np.where(is_long, levels['long_sl'], levels['short_sl']),
+            'tp1': np.where(is_long, levels['long_tp1'], levels['short_tp1']),
+            'tp2': np.where(is_long, levels['long_tp2'], levels['short_tp2']),
+            'sl_pct': levels['sl_pct'],
+            'clamp': levels['clamp']
+        }
 
-        # Filtrar solo las velas desde 00:00 UTC de hoy
-        # Asumiendo que df tiene columna 'open_time' con timestamps en ms
+    @staticmethod
+    def _open_time_ms(df: pd.DataFrame) -> Optional[np.ndarray]:
+        """Apertura de cada vela en ms (columna 'open_time' o 'datetime' en UTC)"""
         if 'open_time' in df.columns:
-            df_today = df[df['open_time'] >= start_timestamp_ms].copy()
-        elif 'datetime' in df.columns:
-            # Si tiene datetime, convertir a timezone-aware si es naive
-            if df['datetime'].dt.tz is None:
-                # Es timezone-naive, convertir start_of_day a naive también
-                start_of_day_naive = start_of_day_utc.replace(tzinfo=None)
-                df_today = df[df['datetime'] >= start_of_day_naive].copy()
-            else:
-                # Es timezone-aware, usar como está
-                df_today = df[df['datetime'] >= start_of_day_utc].copy()
-        else:
-            # Si no hay columna de tiempo, usar todos los datos (fallback)
-            df_today = df.copy()
+            return df['open_time'].to_numpy(dtype=np.int64)
+        if 'datetime' in df.columns:
+            times = df['datetime']
+            if times.dt.tz is not None:
+                times = times.dt.tz_convert('UTC').dt.tz_localize(None)
+            return ((times - pd.Timestamp(0)) // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+        return None
+
+    @staticmethod
+    def _timestamp_ms(value: Union[int, pd.Timestamp]) -> int:
+        """Convierte ms, datetime o Timestamp (naive = UTC) a ms"""
+        if isinstance(value, (int, np.integer)):
+            return int(value)
+        timestamp = pd.Timestamp(value)
+        if timestamp.tz is None:
+            timestamp = timestamp.tz_localize('UTC')
+        return timestamp.value // 1_000_000
 
-        # Si no hay datos del día actual, retornar NaN
-        if len(df_today) == 0:
-            return pd.Series([float('nan')] * len(df), index=df.index)
+    @staticmethod
+    def calculate_vwap(df: pd.DataFrame) -> pd.Series:
+        """
+        Calcula VWAP (Volume Weighted Average Price) de sesión para toda la serie.
+        VWAP se reinicia al inicio de cada sesión (00:00 UTC) según estándar de Binance.
 
-        # Calcular VWAP solo para datos del día actual
-        typical_price = (df_today['high'] + df_today['low'] + df_today['close']) / 3
-        cumsum_tp_volume = (typical_price * df_today['volume']).cumsum()
-        cumsum_volume = df_today['volume'].cumsum()
+        Args:
+            df: DataFrame con columnas 'high', 'low', 'close', 'volume' y 'open_time' o 'datetime'
 
-        vwap_today = cumsum_tp_volume / cumsum_volume
+        Returns:
+            Series con valores VWAP (sin columna de tiempo acumula toda la serie)
+        """
+        vwap = session_vwap(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+            df['volume'].to_numpy(), TechnicalIndicators._open_time_ms(df)
+        )
+        return pd.Series(vwap, index=df.index)
 
-        # Crear serie completa con NaN para datos anteriores al día actual
-        vwap_full = pd.Series([float('nan')] * len(df), index=df.index)
-        vwap_full.loc[df_today.index] = vwap_today.values
+    @staticmethod
+    def calculate_anchored_vwap(df: pd.DataFrame,
+                                anchors: Union[int, pd.Timestamp, List[Union[int, pd.Timestamp]]]
+                                ) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Calcula VWAP anclados: acumulan desde la primera vela abierta en (o después de) cada ancla.
 
-        # Para las velas del día actual, forward fill desde la primera vela
-        # Para retornar el último valor válido
-        vwap_full = vwap_full.ffill()
+        Args:
+            df: DataFrame con columnas 'high', 'low', 'close', 'volume' y 'open_time' o 'datetime'
+            anchors: Instante de anclaje (ms o Timestamp, naive = UTC) o lista de instantes
 
-        return vwap_full
+        Returns:
+            Series (una ancla) o DataFrame con una columna por ancla; NaN antes del ancla
+        """
+        open_time = TechnicalIndicators._open_time_ms(df)
+        if open_time is None:
+            raise ValueError("El DataFrame necesita columna 'open_time' o 'datetime'")
+
+        single = not isinstance(anchors, (list, tuple, np.ndarray))
+        anchor_list = [anchors] if single else list(anchors)
+        anchor_ms = [TechnicalIndicators._timestamp_ms(a) for a in anchor_list]
+
+        values = anchored_vwap(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(),
+            df['volume'].to_numpy(), open_time, np.array(anchor_ms, dtype=np.int64)
+        )
+        if single:
+            return pd.Series(values[0], index=df.index)
+        return pd.DataFrame(values.T, index=df.index, columns=anchor_ms)
 
     @staticmethod
     def analyze_volume(df: pd.DataFrame, lookback: int = 5, use_closed_candle: bool = False) -> Dict[str, Any]:
@@ -269,15 +370,18 @@ class TechnicalIndicators:
         Returns:
             Diccionario con análisis de volumen
         """
+        # Volúmenes en float64 (también con DataFrames compactos en float32)
+        volume = df['volume'].astype(np.float64, copy=False)
+
         # Volumen de la vela actual (última, puede estar en progreso)
-        current_volume = df['volume'].iloc[-1]
+        current_volume = volume.iloc[-1]
 
         # Volumen de la vela anterior (penúltima, cerrada)
-        previous_volume = df['volume'].iloc[-2]
+        previous_volume = volume.iloc[-2]
 
         # Calcular Volume MA(20) - excluyendo la vela actual
         # Usamos las 20 velas anteriores a la vela actual (desde -21 hasta -1, excluyendo -1)
-        avg_volume_20 = df['volume'].iloc[-21:-1].mean() if len(df) >= 21 else df['volume'].iloc[:-1].mean()
+        avg_volume_20 = volume.iloc[-21:-1].mean() if len(df) >= 21 else volume.iloc[:-1].mean()
 
         # Calcular cambios porcentuales
         volume_change_current = ((current_volume - avg_volume_20) / avg_volume_20) * 100 if avg_volume_20 > 0 else 0
@@ -307,6 +411,28 @@ class TechnicalIndicators:
             'total_candles': len(recent_candles)
         }
 
+    @staticmethod
+    def analyze_volume_series(df: pd.DataFrame, lookback: int = 20) -> pd.DataFrame:
+        """
+        Versión vectorizada de analyze_volume para todas las velas: la fila i
+        equivale a analyze_volume(df.iloc[:i + 1], lookback) (la vela i como actual).
+
+        Args:
+            df: DataFrame con columnas 'volume', 'close', 'open'
+            lookback: Velas cerradas para contar alcistas/bajistas
+
+        Returns:
+            DataFrame con current, previous, avg_20, change_pct_current,
+            change_pct_previous, bullish_candles, bearish_candles, total_candles
+        """
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        series = volume_series(volume, df['open'].to_numpy(), df['close'].to_numpy(), lookback)
+        return pd.DataFrame({
+            'current': volume,
+            'previous': np.concatenate(([np.nan], volume[:-1])),
+            **series
+        }, index=df.index)
+
     @staticmethod
     def get_candle_type(df: pd.DataFrame, index: int = -1) -> str:
         """
@@ -378,6 +504,24 @@ class TechnicalIndicators:
             'bearish_count': bearish_count
         }
 
+    @staticmethod
+    def analyze_last_candles_series(df: pd.DataFrame, count: int = 3) -> pd.DataFrame:
+        """
+        Versión vectorizada de analyze_last_candles para todas las velas: la fila i
+        analiza las `count` velas cerradas anteriores a la vela i.
+
+        Args:
+            df: DataFrame con datos OHLCV
+            count: Número de velas a analizar (default 3)
+
+        Returns:
+            DataFrame con bullish_count, bearish_count, above_average, trend, volume_trend
+        """
+        series = candle_momentum_series(
+            df['open'].to_numpy(), df['close'].to_numpy(), df['volume'].to_numpy(), count
+        )
+        return pd.DataFrame(series, index=df.index)
+
     @staticmethod
     def calculate_all_indicators(df: pd.DataFrame, df_spot: pd.DataFrame = None) -> Dict[str, Any]:
         """
@@ -397,51 +541,154 @@ class TechnicalIndicators:
         if df_spot is not None and len(df_spot) < 50:
             raise ValueError("No hay suficientes datos SPOT para calcular indicadores")
 
+        # EMAs, RSI, Bollinger, VWAP y ATR usan FUTUROS; MACD usa SPOT si está disponible.
+        # Se calculan con el kernel NumPy (mismos resultados que calculate_ema, calculate_rsi, etc.)
+        open_time = TechnicalIndicators._open_time_ms(df)
+        series = compute_indicators(
+            df['close'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+            df['volume'].to_numpy(), open_time,
+            source_close=df_spot['close'].to_numpy() if df_spot is not None else None
+        )
+
+        # Volumen - Usa datos de SPOT si están disponibles, sino FUTUROS
+        source_df_volume = df_spot if df_spot is not None else df
+        volume_analysis = volume_summary(
+            source_df_volume['volume'].to_numpy(), source_df_volume['open'].to_numpy(),
+            source_df_volume['close'].to_numpy(), 20
+        )
+
         # Precio actual (última vela) - Usa datos de FUTUROS
-        current_price = df['close'].iloc[-1]
+        return latest_indicators(series, df['close'].iloc[-1], volume_analysis)
+
+    @staticmethod
+    def calculate_indicator_grid(df: pd.DataFrame,
+                                 ema_periods: Sequence[int] = (),
+                                 rsi_periods: Sequence[int] = (),
+                                 atr_periods: Sequence[int] = (),
+                                 bb_configs: Sequence[Tuple[int, float]] = (),
+                                 macd_configs: Sequence[Tuple[int, int, int]] = ()) -> Dict[str, np.ndarray]:
+        """
+        Calcula una grilla de períodos de cada indicador en una sola llamada
+        vectorizada (para barridos de parámetros sobre historiales largos).
+
+        Args:
+            df: DataFrame con columnas 'high', 'low', 'close' (sin NaN)
+            ema_periods: Períodos de EMA, ej: range(5, 201)
+            rsi_periods: Períodos de RSI
+            atr_periods: Períodos de ATR
+            bb_configs: Pares (período, desviaciones) de Bollinger, ej: [(20, 2.0), (20, 2.5)]
+            macd_configs: Tríos (rápida, lenta, señal) de MACD, ej: [(12, 26, 9)]
+
+        Returns:
+            Diccionario de matrices (configuraciones x tiempo), en el orden recibido:
+            'ema', 'rsi', 'atr', 'bb_upper', 'bb_middle', 'bb_lower',
+            'macd_line', 'macd_signal', 'macd_histogram' (solo las pedidas).
+            La fila i coincide con calculate_ema(df, ema_periods[i]), etc.
+        """
+        close = df['close'].to_numpy(dtype=np.float64)
+        result = {}
+
+        if len(ema_periods):
+            result['ema'] = ema_grid(close, ema_periods)
+        if len(rsi_periods):
+            result['rsi'] = rsi_grid(close, rsi_periods)
+        if len(atr_periods):
+            result['atr'] = atr_grid(df['high'].to_numpy(dtype=np.float64),
+                                     df['low'].to_numpy(dtype=np.float64), close, atr_periods)
+        if len(bb_configs):
+            bb = bollinger_grid(close, bb_configs)
+            result.update({f'bb_{name}': values for name, values in bb.items()})
+        if len(macd_configs):
+            macd = macd_grid(close, macd_configs)
+            result.update({
+                'macd_line': macd['macd'],
+                'macd_signal': macd['signal'],
+                'macd_histogram': macd['histogram']
+            })
+
+        return result
+
+    # Campos de cada panel (símbolos x tiempo)
+    PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'open_time')
 
-        # EMAs - Usa datos de FUTUROS
-        ema21 = TechnicalIndicators.calculate_ema(df, 21)
-        ema50 = TechnicalIndicators.calculate_ema(df, 50)
+    @staticmethod
+    def build_panel(frames: List[Union[pd.DataFrame, np.ndarray]]) -> Dict[str, np.ndarray]:
+        """
+        Apila velas de igual longitud en un panel: un array 2D (símbolos x tiempo) por campo.
+
+        Args:
+            frames: DataFrames OHLCV o arrays estructurados (KLINE_DTYPE), uno por
+                    símbolo y con la misma cantidad de velas. Los arrays estructurados
+                    se apilan de una vez (sin acceder columna por columna)
 
-        # RSI - Usa datos de FUTUROS
-        rsi = TechnicalIndicators.calculate_rsi(df, 14)
+        Returns:
+            Diccionario {campo: array 2D}
+        """
+        if isinstance(frames[0], np.ndarray):
+            stacked = np.stack(frames)
+            return {field: stacked[field] for field in TechnicalIndicators.PANEL_FIELDS
+                    if field in stacked.dtype.names}
+        return {field: np.stack([df[field].to_numpy() for df in frames])
+                for field in TechnicalIndicators.PANEL_FIELDS if field in frames[0].columns}
 
-        # Bollinger Bands - Usa datos de FUTUROS
-        bb = TechnicalIndicators.calculate_bollinger_bands(df, 20, 2.0)
+    @staticmethod
+    def calculate_panel_indicators(symbols: List[str], panel: Dict[str, np.ndarray],
+                                   spot_panel: Dict[str, np.ndarray] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Calcula los indicadores de muchos símbolos a la vez sobre paneles 2D
+        (símbolos x tiempo), con operaciones vectorizadas a lo largo del tiempo.
 
-        # VWAP - Usa datos de FUTUROS
-        vwap = TechnicalIndicators.calculate_vwap(df)
+        Args:
+            symbols: Símbolo de cada fila del panel
+            panel: {'open', 'high', 'low', 'close', 'volume', 'open_time'} de FUTUROS (2D)
+            spot_panel: Mismos campos de SPOT (opcional, para MACD y Volumen)
 
-        # ATR - Usa datos de FUTUROS
-        atr = TechnicalIndicators.calculate_atr(df, 14)
+        Returns:
+            {símbolo: diccionario igual al de calculate_all_indicators}
+        """
+        if panel['close'].shape[1] < 50:
+            raise ValueError("No hay suficientes datos para calcular indicadores")
 
-        # MACD - Usa datos de SPOT si están disponibles, sino FUTUROS
-        source_df_macd = df_spot if df_spot is not None else df
-        macd = TechnicalIndicators.calculate_macd(source_df_macd, 12, 26, 9)
+        if spot_panel is not None and spot_panel['close'].shape[1] < 50:
+            raise ValueError("No hay suficientes datos SPOT para calcular indicadores")
 
-        # Usar siempre la última vela (vela actual en progreso) para MACD en tiempo real
-        macd_index = -1
+        series = compute_indicators(
+            panel['close'], panel['high'], panel['low'], panel['volume'], panel.get('open_time'),
+            source_close=spot_panel['close'] if spot_panel is not None else None
+        )
 
         # Volumen - Usa datos de SPOT si están disponibles, sino FUTUROS
-        source_df_volume = df_spot if df_spot is not None else df
-        # Para volumen, si usamos SPOT, necesitamos usar penúltima vela (cerrada)
-        volume_analysis = TechnicalIndicators.analyze_volume(source_df_volume, 20, use_closed_candle=(df_spot is not None))
+        source_panel = spot_panel if spot_panel is not None else panel
+        volume_analysis = volume_summary_panel(
+            source_panel['volume'], source_panel['open'], source_panel['close'], 20
+        )
 
-        return {
-            'price': current_price,
-            'ema21': ema21.iloc[-1],
-            'ema50': ema50.iloc[-1],
-            'rsi': rsi.iloc[-1],
-            'bb_upper': bb['upper'].iloc[-1],
-            'bb_middle': bb['middle'].iloc[-1],
-            'bb_lower': bb['lower'].iloc[-1],
-            'macd_line': macd['macd'].iloc[macd_index],
-            'macd_signal': macd['signal'].iloc[macd_index],
-            'macd_histogram': macd['histogram'].iloc[macd_index],
-            'macd_histogram_prev': macd['histogram'].iloc[macd_index - 1] if len(macd['histogram']) >= abs(macd_index) + 1 else 0,
-            'macd_histogram_prev2': macd['histogram'].iloc[macd_index - 2] if len(macd['histogram']) >= abs(macd_index) + 2 else 0,
-            'vwap': vwap.iloc[-1],
-            'volume': volume_analysis,
-            'atr': atr.iloc[-1]
-        }
+        return {symbol: panel_latest_indicators(series, panel['close'], volume_analysis, row)
+                for row, symbol in enumerate(symbols)}
+
+    @staticmethod
+    def calculate_indicators_for_frames(frames: Dict[Any, tuple]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Calcula indicadores para muchos pares (df_futures, df_spot) agrupándolos en
+        paneles por longitud (y por disponibilidad de SPOT).
+
+        Args:
+            frames: {clave: (futuros, spot o None)} como DataFrames o arrays estructurados
+
+        Returns:
+            {clave: diccionario de calculate_all_indicators}; omite las claves con menos de 50 velas
+        """
+        groups: Dict[tuple, List[Any]] = {}
+        for key, (df_futures, df_spot) in frames.items():
+            if len(df_futures) < 50 or (df_spot is not None and len(df_spot) < 50):
+                continue
+            shape = (len(df_futures), len(df_spot) if df_spot is not None else None)
+            groups.setdefault(shape, []).append(key)
+
+        results = {}
+        for (_, spot_length), keys in groups.items():
+            panel = TechnicalIndicators.build_panel([frames[key][0] for key in keys])
+            spot_panel = (TechnicalIndicators.build_panel([frames[key][1] for key in keys])
+                          if spot_length is not None else None)
+            results.update(TechnicalIndicators.calculate_panel_indicators(keys, panel, spot_panel))
+        return results
@@ -0,0 +1,99 @@
+"""
+Resolución intravela de SL/TP con velas de un timeframe inferior (1m/5m).
+Cuando una vela del backtest toca el SL y un TP, las velas inferiores de ese
+intervalo se localizan con búsqueda binaria sobre open_time (O(log n)) y se
+recorren en orden para saber qué nivel se alcanzó primero. Solo se leen las
+velas inferiores de las velas ambiguas.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .kline_store import KlineStore
+
+
+class IntrabarSimulator:
+    """
+    Orden exacto de SL, TP1 y TP2 dentro de una vela usando velas inferiores.
+
+    Las velas inferiores pueden venir de KlineStore en modo memory-mapped:
+    solo open_time se copia en memoria (índice de búsqueda contiguo); high y
+    low se leen del archivo únicamente en los tramos consultados.
+    """
+
+    def __init__(self, klines: np.ndarray):
+        """
+        Args:
+            klines: Array estructurado (KLINE_DTYPE) del timeframe inferior,
+                    ordenado por open_time
+        """
+        self.open_time = np.ascontiguousarray(klines['open_time'], dtype=np.int64)
+        self.high = klines['high']
+        self.low = klines['low']
+        self.lookups = 0
+
+    @classmethod
+    def from_store(cls, store: KlineStore, market: str, symbol: str,
+                   interval: str = '1m') -> 'IntrabarSimulator':
+        """Simulador sobre la serie guardada de un (mercado, símbolo, intervalo)"""
+        return cls(store.load(market, symbol, interval))
+
+    def bar_range(self, open_time: int, close_time: int) -> slice:
+        """Velas inferiores con open_time en [open_time, close_time] (búsqueda binaria)"""
+        self.lookups += 1
+        start = int(np.searchsorted(self.open_time, open_time, side='left'))
+        stop = int(np.searchsorted(self.open_time, close_time, side='right'))
+        return slice(start, stop)
+
+    def resolve(self, open_time: int, close_time: int, side: int,
+                sl: float, tp1: float, tp2: float, tp1_done: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Recorre las velas inferiores de una vela que toca el SL y un TP.
+
+        Args:
+            open_time: Apertura de la vela ambigua (ms)
+            close_time: Cierre de la vela ambigua (ms)
+            side: 1 (LONG) o -1 (SHORT)
+            sl, tp1, tp2: Niveles de la operación (ej: calculate_sl_tp_with_atr)
+            tp1_done: Si TP1 ya se alcanzó en una vela anterior
+
+        Returns:
+            None si no hay velas inferiores que muestren el SL en ese intervalo;
+            si no, diccionario con:
+            - 'exit_reason': 'SL' o 'TP2'
+            - 'tp1_hit': si TP1 se alcanzó antes de la salida
+            - 'ambiguous': si el orden sigue sin conocerse (misma vela inferior)
+        """
+        window = self.bar_range(open_time, close_time)
+        high = np.asarray(self.high[window], dtype=np.float64)
+        low = np.asarray(self.low[window], dtype=np.float64)
+        count = len(high)
+
+        # LONG: SL con mínimos, TPs con máximos (al revés para SHORT)
+        adverse, favorable = (low, high) if side == 1 else (high, low)
+        sl_hits = side * (adverse - sl) <= 0
+        if not sl_hits.any():
+            # Velas inferiores ausentes o incompletas: no se puede resolver
+            return None
+        sl_index = int(sl_hits.argmax())
+
+        start = 0
+        if not tp1_done:
+            tp1_hits = side * (favorable[:sl_index + 1] - tp1) >= 0
+            tp1_index = int(tp1_hits.argmax()) if tp1_hits.any() else count
+            if tp1_index == sl_index:
+                return {'exit_reason': 'SL', 'tp1_hit': False, 'ambiguous': True}
+            tp1_done = tp1_index < sl_index
+            start = tp1_index
+
+        if tp1_done:
+            # TP2 puede alcanzarse en la misma vela inferior que TP1
+            tp2_hits = side * (favorable[start:sl_index + 1] - tp2) >= 0
+            tp2_index = start + int(tp2_hits.argmax()) if tp2_hits.any() else count
+            if tp2_index < sl_index:
+                return {'exit_reason': 'TP2', 'tp1_hit': True, 'ambiguous': False}
+            if tp2_index == sl_index:
+                return {'exit_reason': 'SL', 'tp1_hit': True, 'ambiguous': True}
+
+        return {'exit_reason': 'SL', 'tp1_hit': tp1_done, 'ambiguous': False}
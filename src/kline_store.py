@@ -0,0 +1,166 @@
+"""
+Almacén local de velas OHLCV en disco.
+Cada serie (mercado, símbolo, intervalo) se guarda como un array estructurado
+de NumPy (.npy) que se lee con memory-mapping, de modo que leer las últimas
+N velas no carga el historial completo en memoria.
+Las velas nuevas al final de la serie se escriben en el mismo archivo (solo
+las filas nuevas y la cabecera), sin reescribir el historial.
+"""
+
+import os
+import struct
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from .binance_client import KLINE_DTYPE
+
+
+class KlineStore:
+    """Almacén de velas en disco con escritura atómica y upsert por open_time"""
+
+    def __init__(self, base_dir: str = "datos"):
+        """
+        Inicializa el almacén.
+
+        Args:
+            base_dir: Directorio raíz donde guardar las series
+        """
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+
+    def path_for(self, market: str, symbol: str, interval: str) -> str:
+        """Ruta del archivo de una serie (ej: datos/futures/ETHUSDT/15m.npy)"""
+        return os.path.join(self.base_dir, market, symbol, f"{interval}.npy")
+
+    @staticmethod
+    def from_klines(klines: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Convierte la lista de diccionarios de BinanceClient a un array estructurado.
+
+        Args:
+            klines: Velas en el formato de BinanceClient.get_klines
+
+        Returns:
+            Array estructurado con dtype KLINE_DTYPE
+        """
+        names = KLINE_DTYPE.names
+        return np.array([tuple(k[name] for name in names) for k in klines], dtype=KLINE_DTYPE)
+
+    def load(self, market: str, symbol: str, interval: str) -> np.ndarray:
+        """
+        Abre la serie completa en modo memory-mapped (solo lectura).
+
+        Returns:
+            Array estructurado (vacío si la serie no existe)
+        """
+        path = self.path_for(market, symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=KLINE_DTYPE)
+        return np.load(path, mmap_mode='r')
+
+    def tail(self, market: str, symbol: str, interval: str, count: int) -> np.ndarray:
+        """
+        Devuelve una copia en memoria de las últimas `count` velas guardadas.
+        La copia libera el archivo para que pueda reemplazarse sin problemas.
+        """
+        with self._lock:
+            stored = self.load(market, symbol, interval)
+            result = np.array(stored[-count:]) if count > 0 else np.empty(0, dtype=KLINE_DTYPE)
+            del stored
+        return result
+
+    def upsert(self, market: str, symbol: str, interval: str, klines: np.ndarray,
+               replace: bool = False) -> int:
+        """
+        Inserta o actualiza velas por open_time. La vela en progreso se sobrescribe
+        con su versión más reciente.
+
+        Args:
+            market: 'futures' o 'spot'
+            symbol: Par de trading
+            interval: Timeframe
+            klines: Array estructurado con dtype KLINE_DTYPE
+            replace: Si True, descarta el historial guardado (p.ej. tras un hueco)
+
+        Returns:
+            Número total de velas guardadas en la serie
+        """
+        if len(klines) == 0:
+            return len(self.load(market, symbol, interval))
+
+        path = self.path_for(market, symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with self._lock:
+            stored = self.load(market, symbol, interval)
+            if replace or len(stored) == 0:
+                merged = np.array(klines, dtype=KLINE_DTYPE)
+            else:
+                # Conservar solo velas guardadas anteriores a la primera vela nueva;
+                # las nuevas sustituyen cualquier solapamiento (upsert)
+                first_new = klines['open_time'][0]
+                cut = int(np.searchsorted(stored['open_time'], first_new, side='left'))
+                at_tail = klines['open_time'][-1] >= stored['open_time'][-1]
+                if at_tail:
+                    del stored
+                    total = self._write_tail(path, cut, klines)
+                    if total is not None:
+                        return total
+                    stored = self.load(market, symbol, interval)
+                merged = np.concatenate([np.array(stored[:cut]), klines.astype(KLINE_DTYPE)])
+            del stored
+
+            # Escritura atómica: archivo temporal + reemplazo
+            tmp_path = f"{path}.tmp.npy"
+            np.save(tmp_path, merged)
+            os.replace(tmp_path, path)
+
+        return len(merged)
+
+    @staticmethod
+    def _write_tail(path: str, cut: int, klines: np.ndarray) -> Optional[int]:
+        """
+        Escribe en el archivo existente las velas desde la posición `cut`
+        (sobrescribe el solapamiento y añade el resto) y actualiza la forma en
+        la cabecera. Primero se escriben los datos y al final la cabecera: si el
+        proceso se interrumpe, la cabecera anterior sigue describiendo velas válidas.
+
+        Returns:
+            Número total de velas, o None si la cabecera no admite el cambio
+            (versión o formato inesperado): entonces se reescribe el archivo
+        """
+        with open(path, 'r+b') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+                length_format = '<H'
+            elif version == (2, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+                length_format = '<I'
+            else:
+                return None
+            if dtype != KLINE_DTYPE or fortran_order or len(shape) != 1:
+                return None
+
+            data_offset = f.tell()
+            total = cut + len(klines)
+            prefix = np.lib.format.magic(*version)
+            header_space = data_offset - len(prefix) - struct.calcsize(length_format)
+            header = repr({
+                'descr': np.lib.format.dtype_to_descr(KLINE_DTYPE),
+                'fortran_order': False,
+                'shape': (total,)
+            })
+            if len(header) + 1 > header_space:
+                return None
+            header = header.ljust(header_space - 1) + '\n'
+
+            f.seek(data_offset + cut * KLINE_DTYPE.itemsize)
+            f.write(np.ascontiguousarray(klines, dtype=KLINE_DTYPE).tobytes())
+            f.truncate()
+            f.flush()
+            f.seek(0)
+            f.write(prefix + struct.pack(length_format, header_space) + header.encode('latin1'))
+        return total
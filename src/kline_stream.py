@@ -0,0 +1,375 @@
+"""
+Consumo de velas en tiempo real vía WebSocket (<symbol>@kline_<interval>)
+para FUTUROS y SPOT, con reconexión automática, y servidor local de replay
+que reproduce mensajes grabados para pruebas y benchmarks sin conexión.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Tuple, Callable, Optional, Union, Awaitable
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import WebSocketException
+
+from .streaming_indicators import IncrementalIndicators
+
+
+logger = logging.getLogger(__name__)
+
+
+FUTURES_WS_URL = "wss://fstream.binance.com"
+SPOT_WS_URL = "wss://stream.binance.com:9443"
+
+
+class KlineStream:
+    """
+    Consumidor de streams de velas de Binance con reconexión y resuscripción.
+
+    Las velas que cierran mientras la conexión está caída no se reenvían al
+    reconectar: on_reconnect permite recuperarlas por REST (ver
+    StreamAnalysisFeed.backfill). El hook corre fuera del event loop (o se
+    espera si es una corrutina), así los demás mercados se siguen leyendo.
+    Un mensaje inválido o un error del callback se registran y se descartan
+    sin cortar la conexión.
+    """
+
+    def __init__(self, subscriptions: List[Tuple[str, str, str]],
+                 on_kline: Callable[[str, str, str, Dict[str, Any], bool], None],
+                 futures_url: str = None, spot_url: str = None,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 record_path: str = None,
+                 on_reconnect: Optional[Callable[[str], Union[None, Awaitable[None]]]] = None):
+        """
+        Inicializa el consumidor.
+
+        Args:
+            subscriptions: Lista de (mercado, símbolo, intervalo), mercado 'futures' o 'spot'
+            on_kline: Callback (mercado, símbolo, intervalo, vela, vela_cerrada)
+            futures_url: URL WebSocket de FUTUROS (default fstream.binance.com)
+            spot_url: URL WebSocket de SPOT (default stream.binance.com)
+            reconnect_delay: Espera inicial antes de reconectar (segundos)
+            max_reconnect_delay: Espera máxima entre reconexiones (backoff exponencial)
+            record_path: Si se indica, graba cada mensaje recibido (JSONL) para replay
+            on_reconnect: Callback (mercado) tras cada reconexión, antes del primer
+                          mensaje; sirve para rellenar por REST las velas perdidas.
+                          Una función normal se ejecuta en un hilo (puede bloquear);
+                          una corrutina se espera en el event loop
+        """
+        self.subscriptions = subscriptions
+        self.on_kline = on_kline
+        self.urls = {
+            'futures': (futures_url or FUTURES_WS_URL).rstrip('/'),
+            'spot': (spot_url or SPOT_WS_URL).rstrip('/')
+        }
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.record_path = record_path
+        self.on_reconnect = on_reconnect
+
+        self.messages_received = 0
+        self.reconnections = 0
+        self.message_errors = 0
+        self.last_error: Optional[str] = None
+        self._running = False
+        self._connections = {}
+
+    @staticmethod
+    def stream_name(symbol: str, interval: str) -> str:
+        """Nombre del stream en Binance (ej: ethusdt@kline_5m)"""
+        return f"{symbol.lower()}@kline_{interval}"
+
+    @staticmethod
+    def parse_kline_event(payload: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], bool]:
+        """
+        Convierte un evento 'kline' al formato de vela de BinanceClient.get_klines.
+
+        Args:
+            payload: Mensaje del stream (combinado {'stream', 'data'} o evento directo)
+
+        Returns:
+            Tupla (símbolo, intervalo, vela, vela_cerrada)
+        """
+        data = payload.get('data', payload)
+        k = data['k']
+        candle = {
+            'open_time': int(k['t']),
+            'open': float(k['o']),
+            'high': float(k['h']),
+            'low': float(k['l']),
+            'close': float(k['c']),
+            'volume': float(k['v']),
+            'close_time': int(k['T']),
+            'quote_volume': float(k['q']),
+            'trades': int(k['n']),
+            'taker_buy_base': float(k['V']),
+            'taker_buy_quote': float(k['Q'])
+        }
+        return k['s'], k['i'], candle, bool(k['x'])
+
+    def _streams_for(self, market: str) -> List[str]:
+        return [self.stream_name(symbol, interval)
+                for sub_market, symbol, interval in self.subscriptions if sub_market == market]
+
+    def _record(self, market: str, message: str):
+        with open(self.record_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'t': int(time.time() * 1000), 'market': market,
+                                'message': json.loads(message)}) + "\n")
+
+    def _handle_message(self, market: str, message: str):
+        """Procesa un mensaje; los errores se registran sin cortar la conexión"""
+        try:
+            if self.record_path:
+                self._record(market, message)
+            payload = json.loads(message)
+            if payload.get('data', payload).get('e') != 'kline':
+                return
+            symbol, interval, candle, closed = self.parse_kline_event(payload)
+            self.on_kline(market, symbol, interval, candle, closed)
+        except Exception as e:
+            self._report_error(market, e)
+
+    def _report_error(self, market: str, error: Exception):
+        self.message_errors += 1
+        self.last_error = f"{market}: {error!r}"
+        logger.warning("Error procesando mensaje de %s: %r", market, error)
+
+    async def _run_market(self, market: str, streams: List[str]):
+        """Mantiene la conexión de un mercado, reconectando con backoff exponencial"""
+        url = f"{self.urls[market]}/stream?streams={'/'.join(streams)}"
+        delay = self.reconnect_delay
+        connected_before = False
+
+        while self._running:
+            try:
+                # La suscripción va en la URL: reconectar equivale a resuscribir
+                async with connect(url) as websocket:
+                    self._connections[market] = websocket
+                    delay = self.reconnect_delay
+                    if connected_before and self.on_reconnect:
+                        try:
+                            # Fuera del event loop: una descarga REST bloqueante no
+                            # detiene la lectura de los demás mercados
+                            if asyncio.iscoroutinefunction(self.on_reconnect):
+                                await self.on_reconnect(market)
+                            else:
+                                await asyncio.to_thread(self.on_reconnect, market)
+                        except Exception as e:
+                            self._report_error(market, e)
+                    connected_before = True
+                    async for message in websocket:
+                        self.messages_received += 1
+                        self._handle_message(market, message)
+
+            # WebSocketException cubre el cierre y los handshakes rechazados (InvalidStatus, ...)
+            except (WebSocketException, OSError, asyncio.TimeoutError) as e:
+                self.last_error = f"{market}: {e!r}"
+            finally:
+                self._connections.pop(market, None)
+
+            if self._running:
+                self.reconnections += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self):
+        """Consume todos los streams hasta que se llame a stop()"""
+        self._running = True
+        tasks = [self._run_market(market, streams)
+                 for market, streams in ((m, self._streams_for(m)) for m in ('futures', 'spot'))
+                 if streams]
+        await asyncio.gather(*tasks)
+
+    async def stop(self):
+        """Detiene el consumo y cierra las conexiones abiertas"""
+        self._running = False
+        for websocket in list(self._connections.values()):
+            await websocket.close()
+
+
+class StreamAnalysisFeed:
+    """
+    Conecta KlineStream con IncrementalIndicators: confirma las velas cerradas
+    y emite indicadores provisionales en cada actualización de la vela en progreso.
+    MACD y Volumen usan SPOT cuando se suscribe ese mercado (igual que analyze_timeframe).
+    """
+
+    def __init__(self, on_update: Callable[[str, str, Dict[str, Any], bool], None],
+                 use_spot: bool = True):
+        """
+        Args:
+            on_update: Callback (símbolo, intervalo, indicadores, vela_cerrada)
+            use_spot: Si True, espera velas SPOT para MACD y Volumen
+        """
+        self.on_update = on_update
+        self.use_spot = use_spot
+        self.engines: Dict[Tuple[str, str], IncrementalIndicators] = {}
+        # Última vela recibida por (mercado, símbolo, intervalo)
+        self._current: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # Velas cerradas pendientes de emparejar FUTUROS/SPOT por open_time
+        self._closed: Dict[Tuple[str, str, str], Dict[int, Dict[str, Any]]] = {}
+        # open_time de la última vela confirmada por (símbolo, intervalo)
+        self._committed: Dict[Tuple[str, str], int] = {}
+        # Velas confirmadas sin pareja SPOT (mensaje SPOT perdido)
+        self.unpaired = 0
+        # backfill puede llegar desde el hilo de on_reconnect mientras el
+        # event loop entrega velas de otro mercado
+        self._lock = threading.RLock()
+
+    def prime(self, symbol: str, interval: str, df: pd.DataFrame, df_spot: pd.DataFrame = None):
+        """
+        Inicializa el motor de un símbolo con historial REST (la última vela,
+        en progreso, no se confirma).
+        """
+        self.engines[(symbol, interval)] = IncrementalIndicators.from_dataframe(
+            df, df_spot if self.use_spot else None
+        )
+        if len(df) > 1:
+            self._committed[(symbol, interval)] = int(df['open_time'].iloc[-2])
+
+    def backfill(self, market: str, symbol: str, interval: str, candles: List[Dict[str, Any]]):
+        """
+        Entrega velas REST (formato de get_klines) tras una reconexión. Las
+        velas ya confirmadas se ignoran y la última se trata como en progreso.
+        Se puede llamar desde el hilo de KlineStream.on_reconnect.
+        """
+        with self._lock:
+            for i, candle in enumerate(candles):
+                self.handle_kline(market, symbol, interval, candle, i < len(candles) - 1)
+
+    def handle_kline(self, market: str, symbol: str, interval: str,
+                     candle: Dict[str, Any], closed: bool):
+        """Callback para KlineStream"""
+        with self._lock:
+            self._handle_kline(market, symbol, interval, candle, closed)
+
+    def _handle_kline(self, market: str, symbol: str, interval: str,
+                      candle: Dict[str, Any], closed: bool):
+        key = (symbol, interval)
+        if closed and candle['open_time'] <= self._committed.get(key, -1):
+            # Vela ya confirmada (repetida por un relleno REST)
+            return
+        engine = self.engines.setdefault(key, IncrementalIndicators())
+        self._current[(market, symbol, interval)] = candle
+
+        if closed:
+            self._closed.setdefault((market, symbol, interval), {})[candle['open_time']] = candle
+            self._commit_closed(symbol, interval, engine)
+
+        futures_candle = self._current.get(('futures', symbol, interval))
+        spot_candle = self._current.get(('spot', symbol, interval)) if self.use_spot else None
+        if futures_candle is None or (self.use_spot and spot_candle is None):
+            return
+        if engine.count == 0:
+            return
+
+        indicators = engine.snapshot(futures_candle, spot_candle)
+        self.on_update(symbol, interval, indicators, closed)
+
+    def _commit_closed(self, symbol: str, interval: str, engine: IncrementalIndicators):
+        """
+        Confirma en orden las velas cerradas que ya tienen pareja FUTUROS/SPOT.
+        Si ya cerró una vela SPOT posterior, la pareja SPOT se perdió: la vela
+        se confirma solo con FUTUROS (MACD y Volumen de FUTUROS en esa vela).
+        """
+        futures_closed = self._closed.get(('futures', symbol, interval), {})
+        spot_closed = self._closed.get(('spot', symbol, interval), {})
+
+        for open_time in sorted(futures_closed):
+            spot_candle = None
+            if self.use_spot:
+                spot_candle = spot_closed.pop(open_time, None)
+                if spot_candle is None:
+                    if not any(t > open_time for t in spot_closed):
+                        break
+                    self.unpaired += 1
+            engine.add_candle(futures_closed.pop(open_time), spot_candle)
+            self._committed[(symbol, interval)] = open_time
+            if self.use_spot:
+                # Descartar velas SPOT anteriores que nunca tendrán pareja
+                for stale in [t for t in spot_closed if t < open_time]:
+                    del spot_closed[stale]
+
+
+class KlineReplayServer:
+    """
+    Servidor WebSocket local que reproduce mensajes grabados por KlineStream
+    (JSONL con 't', 'market', 'message') respetando los tiempos originales
+    divididos por `speed`. Un servidor sirve un mercado; los clientes reciben
+    solo los streams que pidieron en ?streams=.
+    """
+
+    def __init__(self, records: List[Dict[str, Any]], market: str = 'futures',
+                 speed: float = 1.0, host: str = '127.0.0.1', port: int = 0,
+                 drop_after: Optional[int] = None):
+        """
+        Args:
+            records: Mensajes grabados (ver load_recording)
+            market: Mercado que sirve este servidor ('futures' o 'spot')
+            speed: Factor de velocidad (2.0 = doble de rápido, 0 = sin esperas)
+            host: Interfaz de escucha
+            port: Puerto (0 = asignado por el sistema)
+            drop_after: Si se indica, corta la conexión tras N mensajes (prueba de reconexión)
+        """
+        self.records = [r for r in records if r.get('market', market) == market]
+        self.market = market
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.drop_after = drop_after
+        self.messages_sent = 0
+        # Posición compartida: tras una reconexión el replay continúa donde quedó
+        self._cursor = 0
+        self._server = None
+
+    @staticmethod
+    def load_recording(path: str) -> List[Dict[str, Any]]:
+        """Carga una grabación JSONL generada con KlineStream(record_path=...)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, websocket):
+        query = parse_qs(urlparse(websocket.request.path).query)
+        streams = set(query.get('streams', [''])[0].split('/'))
+        sent_in_connection = 0
+        previous_t = None
+
+        while self._cursor < len(self.records):
+            record = self.records[self._cursor]
+            message = record['message']
+            if previous_t is not None and self.speed > 0:
+                await asyncio.sleep(max(0, record['t'] - previous_t) / 1000 / self.speed)
+            previous_t = record['t']
+
+            if message.get('stream') in streams:
+                if self.drop_after is not None and sent_in_connection >= self.drop_after:
+                    # Simular caída: se cierra sin avanzar el cursor
+                    self.drop_after = None
+                    await websocket.close()
+                    return
+                await websocket.send(json.dumps(message))
+                sent_in_connection += 1
+                self.messages_sent += 1
+            self._cursor += 1
+
+        # Fin de la grabación: mantener la conexión abierta hasta que el cliente cierre
+        await websocket.wait_closed()
+
+    async def start(self):
+        """Inicia el servidor (port=0 asigna un puerto libre)"""
+        self._server = await serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Detiene el servidor"""
+        self._server.close()
+        await self._server.wait_closed()
@@ -0,0 +1,225 @@
+"""
+Optimización walk-forward de los parámetros de la estrategia en un pool de procesos.
+Cada trabajo (símbolo, fold, parámetros) se envía como una tupla pequeña: el
+worker abre la serie del KlineStore en modo memory-mapped (solo lectura) y
+toma únicamente su tramo, sin serializar DataFrames entre procesos. Como en
+analyze_timeframe, MACD y Volumen usan la serie SPOT guardada del símbolo.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtester import Backtester
+from .binance_client import BinanceClient
+from .evaluator import ConditionEvaluator
+from .indicators import TechnicalIndicators
+from .kline_store import KlineStore
+
+
+# Métricas de cada tramo que se guardan en la tabla de resultados
+_METRICS = ('trades', 'win_rate', 'total_pnl_pct', 'max_drawdown_pct', 'profit_factor')
+
+
+def _align_spot(klines: np.ndarray, spot: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Velas SPOT con los mismos open_time que `klines` (FUTUROS). Las velas sin
+    pareja SPOT se rellenan con la de FUTUROS; None si no coincide ninguna.
+    """
+    if len(spot) == 0 or len(klines) == 0:
+        return None
+    spot_open = np.asarray(spot['open_time'])
+    index = np.minimum(np.searchsorted(spot_open, klines['open_time']), len(spot_open) - 1)
+    matched = spot_open[index] == klines['open_time']
+    if not matched.any():
+        return None
+    aligned = klines.copy()
+    aligned[matched] = spot[index[matched]]
+    return aligned
+
+
+@lru_cache(maxsize=8)
+def _load_segment(base_dir: str, market: str, symbol: str, interval: str, start: int, stop: int,
+                  use_spot: bool = True) -> Tuple[pd.DataFrame, Optional[pd.DataFrame],
+                                                  np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Lee un tramo de la serie guardada y calcula sus condiciones y ATR.
+    Con market='futures' y use_spot, MACD y Volumen usan las velas SPOT
+    guardadas del mismo tramo (df_spot None si el símbolo no tiene SPOT).
+    Se memoriza por proceso: los trabajos de un mismo (símbolo, fold) con
+    distintos parámetros reutilizan el tramo ya evaluado.
+    """
+    store = KlineStore(base_dir)
+    stored = store.load(market, symbol, interval)
+    klines = np.array(stored[start:stop])
+    del stored
+
+    spot = None
+    if use_spot and market == 'futures':
+        stored = store.load('spot', symbol, interval)
+        spot = _align_spot(klines, stored)
+        del stored
+
+    df = BinanceClient.klines_to_dataframe(klines)
+    df_spot = BinanceClient.klines_to_dataframe(spot) if spot is not None else None
+    atr = TechnicalIndicators.calculate_atr(df, 14).to_numpy()
+    evaluation = ConditionEvaluator.evaluate_conditions_series(df, df_spot)
+    return df, df_spot, atr, evaluation
+
+
+def _run_job(job: Tuple) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo en el worker: backtest de entrenamiento y de prueba de
+    un fold con un conjunto de parámetros.
+    """
+    base_dir, market, symbol, interval, use_spot, fold, bounds, params = job
+    row = {'symbol': symbol, 'fold': fold, **params}
+
+    for phase, (load_start, trade_start, stop) in bounds.items():
+        df, df_spot, atr, evaluation = _load_segment(base_dir, market, symbol, interval,
+                                                     load_start, stop, use_spot)
+        summary = Backtester(**params).run(df, df_spot, atr=atr, start=trade_start - load_start,
+                                           evaluation=evaluation)['summary']
+        row.update({f'{phase}_{metric}': summary[metric] for metric in _METRICS})
+
+    return row
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward por símbolo: la historia se divide en folds consecutivos
+    (entrenamiento seguido de prueba); en cada fold se elige el conjunto de
+    parámetros con mejor resultado de entrenamiento y se mide fuera de muestra.
+    """
+
+    def __init__(self, store: Optional[KlineStore] = None, interval: str = '5m',
+                 market: str = 'futures', train_bars: int = 30 * 288, test_bars: int = 7 * 288,
+                 warmup_bars: int = 200, max_folds: Optional[int] = None,
+                 metric: str = 'total_pnl_pct', max_workers: Optional[int] = None,
+                 use_spot: bool = True):
+        """
+        Args:
+            store: Almacén con las velas (default: KlineStore en 'datos')
+            interval: Timeframe a optimizar
+            market: 'futures' o 'spot'
+            train_bars: Velas de entrenamiento por fold
+            test_bars: Velas de prueba por fold (y avance entre folds)
+            warmup_bars: Velas previas que solo calientan los indicadores
+            max_folds: Máximo de folds (los más recientes); None = todos
+            metric: Métrica de entrenamiento para elegir parámetros
+            max_workers: Procesos del pool (default: número de CPUs)
+            use_spot: Si True (y market='futures'), MACD y Volumen usan la serie
+                      SPOT guardada del símbolo; False = solo FUTUROS
+        """
+        self.store = store or KlineStore()
+        self.interval = interval
+        self.market = market
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.warmup_bars = warmup_bars
+        self.max_folds = max_folds
+        self.metric = metric
+        self.max_workers = max_workers
+        self.use_spot = use_spot
+
+    @staticmethod
+    def grid(**values: Iterable[Any]) -> List[Dict[str, Any]]:
+        """
+        Producto cartesiano de parámetros de Backtester.
+
+        Ejemplo: grid(min_conditions=[4, 5, 6], atr_multiplier=[1.5, 2.0])
+        """
+        names = list(values)
+        return [dict(zip(names, combination)) for combination in itertools.product(*values.values())]
+
+    def folds(self, length: int) -> List[Dict[str, Tuple[int, int, int]]]:
+        """
+        Tramos de cada fold para una serie de `length` velas.
+
+        Returns:
+            Lista de {'train': (carga, primera_operación, fin), 'test': (...)}
+        """
+        folds = []
+        start = 0
+        while start + self.train_bars + self.test_bars <= length:
+            train_start = start
+            test_start = start + self.train_bars
+            test_stop = test_start + self.test_bars
+            folds.append({
+                'train': (max(0, train_start - self.warmup_bars), train_start, test_start),
+                'test': (max(0, test_start - self.warmup_bars), test_start, test_stop)
+            })
+            start += self.test_bars
+        if self.max_folds is not None:
+            folds = folds[-self.max_folds:]
+        return folds
+
+    def jobs(self, symbols: List[str], param_sets: List[Dict[str, Any]]) -> List[Tuple]:
+        """Trabajos (símbolo, fold, parámetros) como tuplas pequeñas y serializables"""
+        jobs = []
+        for symbol in symbols:
+            length = len(self.store.load(self.market, symbol, self.interval))
+            for fold, bounds in enumerate(self.folds(length)):
+                for params in param_sets:
+                    jobs.append((self.store.base_dir, self.market, symbol, self.interval,
+                                 self.use_spot, fold, bounds, params))
+        return jobs
+
+    def run(self, symbols: List[str], param_sets: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+        """
+        Ejecuta todos los trabajos en el pool y combina los resultados.
+
+        Args:
+            symbols: Símbolos a optimizar (con velas en el almacén)
+            param_sets: Conjuntos de parámetros de Backtester (ver grid)
+
+        Returns:
+            Diccionario con:
+            - 'results': una fila por (símbolo, fold, parámetros) con métricas train_* y test_*
+            - 'selected': por (símbolo, fold), los parámetros con mejor entrenamiento y su prueba
+            - 'ranking': por (símbolo, parámetros), métricas de prueba agregadas y ordenadas
+
+        Raises:
+            ValueError: Si ningún símbolo tiene velas suficientes para un fold
+        """
+        jobs = self.jobs(symbols, param_sets)
+        if not jobs:
+            raise ValueError("No hay velas suficientes para ningún fold")
+
+        workers = self.max_workers or os.cpu_count() or 1
+        # Los trabajos de un mismo (símbolo, fold) van juntos al mismo worker
+        chunksize = max(1, len(param_sets))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(_run_job, jobs, chunksize=chunksize))
+
+        results = pd.DataFrame(rows)
+        return {
+            'results': results,
+            'selected': self.select(results),
+            'ranking': self.rank(results, list(param_sets[0]))
+        }
+
+    def select(self, results: pd.DataFrame) -> pd.DataFrame:
+        """Parámetros con mejor métrica de entrenamiento en cada (símbolo, fold)"""
+        best = results.groupby(['symbol', 'fold'])[f'train_{self.metric}'].idxmax()
+        return results.loc[best].reset_index(drop=True)
+
+    @staticmethod
+    def rank(results: pd.DataFrame, param_names: List[str]) -> pd.DataFrame:
+        """
+        Tabla ordenada por PnL fuera de muestra (suma de los folds de prueba).
+        """
+        ranking = results.groupby(['symbol'] + param_names, dropna=False).agg(
+            folds=('fold', 'count'),
+            test_trades=('test_trades', 'sum'),
+            test_pnl_pct=('test_total_pnl_pct', 'sum'),
+            test_win_rate=('test_win_rate', 'mean'),
+            test_max_drawdown_pct=('test_max_drawdown_pct', 'max'),
+            train_pnl_pct=('train_total_pnl_pct', 'sum')
+        ).reset_index()
+        return ranking.sort_values('test_pnl_pct', ascending=False).reset_index(drop=True)
@@ -0,0 +1,151 @@
+"""
+Planificador de solicitudes según los límites de peso (REQUEST_WEIGHT) de Binance.
+Usa un token bucket por host que se corrige con las cabeceras
+X-MBX-USED-WEIGHT-* de cada respuesta, de modo que un escaneo grande avanza
+tan rápido como permite el límite sin provocar bloqueos (429/418).
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Mapping, Optional
+
+
+# Límites de peso por minuto de cada host (por IP)
+HOST_WEIGHT_LIMITS = {
+    'fapi.binance.com': 2400,
+    'api.binance.com': 6000
+}
+
+DEFAULT_WEIGHT_LIMIT = 1200
+
+
+def endpoint_weight(path: str, params: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Peso conocido de cada endpoint utilizado.
+
+    Args:
+        path: Ruta del endpoint (ej: "/fapi/v1/klines")
+        params: Parámetros de la solicitud (el peso de klines depende de 'limit')
+
+    Returns:
+        Peso de la solicitud
+    """
+    params = params or {}
+
+    if path == "/fapi/v1/klines":
+        limit = int(params.get('limit', 500))
+        if limit < 100:
+            return 1
+        if limit < 500:
+            return 2
+        if limit <= 1000:
+            return 5
+        return 10
+
+    if path == "/api/v3/klines":
+        return 2
+
+    # ping, time, ticker/price con símbolo
+    return 1
+
+
+class WeightScheduler:
+    """
+    Token bucket de peso por minuto, seguro para hilos y para asyncio.
+    Cada solicitud reserva su peso; si no hay saldo, espera el tiempo necesario
+    para que se recargue (las reservas forman una cola FIFO implícita).
+    """
+
+    _registry: Dict[str, "WeightScheduler"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, limit_per_minute: int, safety_margin: float = 0.9,
+                 burst_fraction: float = 0.1, window_seconds: float = 60.0):
+        """
+        Args:
+            limit_per_minute: Peso máximo por ventana del host
+            safety_margin: Fracción del límite usada como ritmo sostenido
+            burst_fraction: Fracción del límite disponible como ráfaga inicial.
+                            Ráfaga + ritmo sostenido <= límite, así ninguna ventana
+                            fija de Binance puede superar el límite
+            window_seconds: Duración de la ventana (60s en Binance)
+        """
+        self.limit_per_minute = limit_per_minute
+        self.capacity = limit_per_minute * burst_fraction
+        self.refill_per_second = limit_per_minute * safety_margin / window_seconds
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self.used_weight = 0
+        self.total_wait = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_host(cls, host: str, limit_per_minute: Optional[int] = None) -> "WeightScheduler":
+        """
+        Devuelve el planificador compartido de un host (el límite es por IP,
+        así que todos los clientes del proceso comparten el mismo bucket).
+        """
+        with cls._registry_lock:
+            scheduler = cls._registry.get(host)
+            if scheduler is None:
+                limit = limit_per_minute or HOST_WEIGHT_LIMITS.get(host, DEFAULT_WEIGHT_LIMIT)
+                scheduler = cls(limit)
+                cls._registry[host] = scheduler
+            return scheduler
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+
+    def reserve(self, weight: int) -> float:
+        """
+        Reserva `weight` unidades y devuelve cuántos segundos debe esperar el llamador.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= weight
+            wait = max(0.0, self.blocked_until - now)
+            if self.tokens < 0:
+                wait = max(wait, -self.tokens / self.refill_per_second)
+            self.total_wait += wait
+            return wait
+
+    def acquire(self, weight: int):
+        """Espera (bloqueando el hilo) hasta poder enviar una solicitud de peso `weight`"""
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: int):
+        """Espera (sin bloquear el event loop) hasta poder enviar la solicitud"""
+        wait = self.reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Ajusta el saldo con el peso usado que informa Binance (X-MBX-USED-WEIGHT-1M),
+        que incluye solicitudes de otros procesos con la misma IP.
+        """
+        used = None
+        for name, value in headers.items():
+            if name.lower() == 'x-mbx-used-weight-1m':
+                used = int(value)
+                break
+        if used is None:
+            return
+
+        with self._lock:
+            self._refill(time.monotonic())
+            self.used_weight = used
+            # Saldo real de la ventana (incluye el peso usado por otros procesos)
+            self.tokens = min(self.tokens, self.limit_per_minute - used)
+
+    def penalize(self, retry_after: float):
+        """Bloquea nuevas solicitudes tras un 429/418 durante `retry_after` segundos"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
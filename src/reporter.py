@@ -444,13 +444,57 @@ Risk/Reward Ratios:
 
         return section
 
+    def generate_scan_report(self, table, intervals: List[str], errors: Dict[str, str],
+                             elapsed_seconds: float) -> str:
+        """
+        Genera reporte del escaneo multi-símbolo.
+
+        Args:
+            table: DataFrame ordenado de MarketScanner.rank
+            intervals: Timeframes analizados
+            errors: Errores por símbolo
+            elapsed_seconds: Duración total del escaneo
+
+        Returns:
+            String con el reporte formateado
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        report = f"""=== ESCANEO MULTI-SÍMBOLO FUTUROS ===
+Timestamp: {timestamp}
+Símbolos analizados: {len(table)} | Con error: {len(errors)} | Duración: {elapsed_seconds:.1f}s
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+RANKING (condiciones cumplidas X/7 por timeframe)
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+"""
+        header = f"{'#':>3} {'Símbolo':<14}" + "".join(f"{tf + ' L/S':>10}" for tf in intervals)
+        header += f"{'Total L/S':>12} {'Dirección':>10}"
+        report += header + "\n" + "-" * len(header) + "\n"
+
+        for position, row in enumerate(table.to_dict('records'), start=1):
+            line = f"{position:>3} {row['symbol']:<14}"
+            for tf in intervals:
+                counts = f"{row[tf + '_long']}/{row[tf + '_short']}"
+                line += f"{counts:>10}"
+            totals = f"{row['total_long']}/{row['total_short']}"
+            line += f"{totals:>12} {row['direction']:>10}"
+            report += line + "\n"
+
+        if errors:
+            report += "\nSímbolos con error:\n"
+            for symbol, message in errors.items():
+                report += f"  • {symbol}: {message}\n"
+
+        return report
+
     def save_report(self, report: str, report_type: str, update_number: int = None) -> str:
         """
         Guarda el reporte en un archivo.
 
         Args:
             report: Contenido del reporte
-            report_type: Tipo de reporte ("inicial", "actualizacion", "5min")
+            report_type: Tipo de reporte ("inicial", "actualizacion", "5min", "escaneo")
             update_number: Número de actualización (solo para tipo "actualizacion")
 
         Returns:
@@ -464,6 +508,8 @@ Risk/Reward Ratios:
             filename = f"actualizacion_{update_number}_{timestamp}.txt"
         elif report_type == "5min":
             filename = f"analisis_5min_{timestamp}.txt"
+        elif report_type == "escaneo":
+            filename = f"escaneo_{timestamp}.txt"
         else:
             filename = f"reporte_{timestamp}.txt"
 
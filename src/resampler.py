@@ -0,0 +1,278 @@
+"""
+Construcción local de timeframes superiores a partir de un único intervalo base.
+Las velas de 15m, 1h, 4h, etc. se agregan desde las velas base (ej: 1m o 5m)
+con los mismos límites que Binance (open_time múltiplo del intervalo desde la
+época Unix; 1w alineado al lunes), de modo que una sola descarga o un solo
+stream por mercado alimenta todos los timeframes del análisis.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from .binance_client import BinanceClient, KLINE_DTYPE
+
+
+# Campos que se suman al agregar velas base
+_SUM_FIELDS = ('volume', 'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote')
+
+
+class KlineResampler:
+    """
+    Agregador de velas base a timeframes superiores, con actualización incremental.
+
+    La agregación es exacta respecto a Binance: open de la primera vela base,
+    máximo de los high, mínimo de los low, close de la última vela base y suma de
+    volúmenes, trades y volúmenes taker (los volúmenes pueden diferir en el
+    último bit por la suma en coma flotante).
+    """
+
+    def __init__(self, base_interval: str = '5m',
+                 targets: Iterable[str] = ('15m', '1h', '4h'),
+                 max_candles: int = 1500):
+        """
+        Args:
+            base_interval: Intervalo de las velas recibidas (ej: '1m', '5m')
+            targets: Timeframes a construir (múltiplos del intervalo base)
+            max_candles: Velas que se conservan por timeframe
+
+        Raises:
+            ValueError: Si algún timeframe no se puede construir desde el intervalo base
+        """
+        self.base_interval = base_interval
+        self.targets = list(targets)
+        for target in self.targets:
+            self.ratio(base_interval, target)
+        self.max_candles = max_candles
+
+        self._candles: Dict[str, np.ndarray] = {
+            target: np.empty(0, dtype=KLINE_DTYPE) for target in self.targets
+        }
+        # Velas base de los buckets todavía abiertos (se reagregan en cada actualización)
+        self._pending = np.empty(0, dtype=KLINE_DTYPE)
+
+    @staticmethod
+    def ratio(base_interval: str, target_interval: str) -> int:
+        """
+        Velas base por vela del timeframe superior.
+
+        Raises:
+            ValueError: Si algún intervalo no tiene duración fija o los límites
+                        del timeframe superior no coinciden con velas base
+        """
+        base_ms = BinanceClient.INTERVAL_MS.get(base_interval)
+        target_ms = BinanceClient.INTERVAL_MS.get(target_interval)
+        if base_ms is None or target_ms is None:
+            raise ValueError(f"Intervalo sin duración fija: {base_interval} -> {target_interval}")
+
+        offset = BinanceClient.WEEK_OFFSET_MS if target_interval == '1w' else 0
+        if target_ms % base_ms or offset % base_ms:
+            raise ValueError(f"No se puede construir {target_interval} desde velas de {base_interval}")
+        return target_ms // base_ms
+
+    @classmethod
+    def can_resample(cls, base_interval: str, target_interval: str) -> bool:
+        """True si target_interval se puede construir desde base_interval"""
+        try:
+            cls.ratio(base_interval, target_interval)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def bucket_open_times(open_time: np.ndarray, target_interval: str) -> np.ndarray:
+        """open_time de la vela del timeframe superior que contiene cada vela base"""
+        target_ms = BinanceClient.INTERVAL_MS[target_interval]
+        offset = BinanceClient.WEEK_OFFSET_MS if target_interval == '1w' else 0
+        return (open_time - offset) // target_ms * target_ms + offset
+
+    @classmethod
+    def resample(cls, klines: np.ndarray, base_interval: str, target_interval: str,
+                 drop_partial_head: bool = True) -> np.ndarray:
+        """
+        Agrega velas base ordenadas por open_time al timeframe superior.
+
+        La última vela resultante está en progreso si la última vela base lo está
+        o si su bucket aún no terminó (igual que la vela en curso de Binance).
+
+        Args:
+            klines: Array estructurado (KLINE_DTYPE) de velas base contiguas
+            base_interval: Intervalo de klines
+            target_interval: Timeframe a construir
+            drop_partial_head: Descarta el primer bucket si no empieza en su
+                               límite (le faltan velas base anteriores)
+
+        Returns:
+            Array estructurado con dtype KLINE_DTYPE
+        """
+        cls.ratio(base_interval, target_interval)
+        if len(klines) == 0:
+            return np.empty(0, dtype=KLINE_DTYPE)
+
+        open_time = klines['open_time']
+        buckets = cls.bucket_open_times(open_time, target_interval)
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        if drop_partial_head and open_time[0] != buckets[0]:
+            starts = starts[1:]
+            if len(starts) == 0:
+                return np.empty(0, dtype=KLINE_DTYPE)
+            klines = klines[starts[0]:]
+            buckets = buckets[starts[0]:]
+            starts = starts - starts[0]
+        ends = np.concatenate((starts[1:], [len(klines)])) - 1
+
+        result = np.empty(len(starts), dtype=KLINE_DTYPE)
+        result['open_time'] = buckets[starts]
+        result['close_time'] = buckets[starts] + BinanceClient.INTERVAL_MS[target_interval] - 1
+        result['open'] = klines['open'][starts]
+        result['close'] = klines['close'][ends]
+        result['high'] = np.maximum.reduceat(klines['high'], starts)
+        result['low'] = np.minimum.reduceat(klines['low'], starts)
+        for field in _SUM_FIELDS:
+            result[field] = np.add.reduceat(klines[field], starts)
+        return result
+
+    def update(self, klines: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Incorpora velas base nuevas (o la versión más reciente de la vela en
+        progreso) y reagrega solo los buckets afectados de cada timeframe.
+
+        Args:
+            klines: Array estructurado de velas base ordenadas por open_time
+
+        Returns:
+            Diccionario {timeframe: velas actualizadas o añadidas}
+
+        Raises:
+            ValueError: Si las velas empiezan antes de la penúltima vela base
+                        recibida (un historial antiguo se agrega con resample)
+        """
+        if len(klines) == 0:
+            return {target: np.empty(0, dtype=KLINE_DTYPE) for target in self.targets}
+
+        first_new = klines['open_time'][0]
+        pending = self._pending
+        if len(pending) and first_new < pending['open_time'][0]:
+            raise ValueError("Velas base anteriores a los buckets abiertos; usar resample")
+        # Upsert por open_time: las velas nuevas sustituyen cualquier solapamiento
+        pending = self._join(pending[:np.searchsorted(pending['open_time'], first_new)], klines)
+
+        updated = {}
+        for target in self.targets:
+            candles = self._candles[target]
+            if len(candles) == 0:
+                fresh = self.resample(pending, self.base_interval, target)
+            else:
+                bucket_start = self.bucket_open_times(first_new, target)
+                segment = pending[np.searchsorted(pending['open_time'], bucket_start):]
+                fresh = self.resample(segment, self.base_interval, target, drop_partial_head=False)
+                # El bucket incompleto descartado al inicio no se reconstruye
+                fresh = fresh[np.searchsorted(fresh['open_time'], candles['open_time'][0]):]
+            if len(fresh):
+                position = np.searchsorted(candles['open_time'], fresh['open_time'][0])
+                if len(fresh) == 1 and position == len(candles) - 1:
+                    # Caso habitual: solo cambia la vela en progreso
+                    candles[-1] = fresh[0]
+                else:
+                    self._candles[target] = self._join(candles[:position], fresh)[-self.max_candles:]
+            updated[target] = fresh
+
+        # Conservar las velas base de los buckets abiertos y de los buckets de la
+        # vela base anterior (se puede reenviar desde la última vela cerrada)
+        previous_open = pending['open_time'][max(0, len(pending) - 2)]
+        keep_from = min(self.bucket_open_times(previous_open, target) for target in self.targets)
+        self._pending = pending[np.searchsorted(pending['open_time'], keep_from):]
+        return updated
+
+    @staticmethod
+    def _join(head: np.ndarray, tail: np.ndarray) -> np.ndarray:
+        """Concatena dos arrays de velas (más rápido que np.concatenate con dtype estructurado)"""
+        result = np.empty(len(head) + len(tail), dtype=KLINE_DTYPE)
+        result[:len(head)] = head
+        result[len(head):] = tail
+        return result
+
+    def update_candle(self, candle: Dict[str, Any],
+                      closed: bool = False) -> Dict[str, Tuple[Dict[str, Any], bool]]:
+        """
+        Incorpora una vela base en el formato de BinanceClient.get_klines
+        (ej: evento de KlineStream).
+
+        Args:
+            candle: Vela base
+            closed: Si la vela base está cerrada
+
+        Returns:
+            Diccionario {timeframe: (vela en formato get_klines, vela_cerrada)}.
+            La vela del timeframe superior está cerrada cuando se cierra la
+            última vela base de su bucket.
+        """
+        row = np.array([tuple(candle[name] for name in KLINE_DTYPE.names)], dtype=KLINE_DTYPE)
+        result = {}
+        for target, fresh in self.update(row).items():
+            if len(fresh) == 0:
+                continue
+            last = fresh[-1]
+            target_candle = {name: last[name].item() for name in KLINE_DTYPE.names}
+            result[target] = (target_candle, bool(closed and candle['close_time'] == last['close_time']))
+        return result
+
+    def candles(self, target: str, count: Optional[int] = None) -> np.ndarray:
+        """Últimas `count` velas construidas de un timeframe (todas si count es None)"""
+        candles = self._candles[target]
+        return candles if count is None else candles[-count:]
+
+
+class ResamplingFeed:
+    """
+    Adaptador para KlineStream: recibe solo el intervalo base de cada
+    (mercado, símbolo) y reenvía al callback la vela base y las velas
+    construidas de cada timeframe superior, con el mismo formato de evento.
+
+    Ejemplo: KlineStream([('futures', 'ETHUSDT', '1m'), ('spot', 'ETHUSDT', '1m')],
+                         ResamplingFeed(feed.handle_kline, '1m', ['5m', '15m', '1h', '4h']).handle_kline)
+    """
+
+    def __init__(self, on_kline: Callable[[str, str, str, Dict[str, Any], bool], None],
+                 base_interval: str = '1m', targets: Iterable[str] = ('5m', '15m', '1h', '4h')):
+        """
+        Args:
+            on_kline: Callback (mercado, símbolo, intervalo, vela, vela_cerrada)
+            base_interval: Intervalo suscrito en el stream
+            targets: Timeframes a construir
+        """
+        self.on_kline = on_kline
+        self.base_interval = base_interval
+        self.targets = list(targets)
+        for target in self.targets:
+            KlineResampler.ratio(base_interval, target)
+        self.resamplers: Dict[Tuple[str, str], KlineResampler] = {}
+
+    def prime(self, market: str, symbol: str, klines: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Inicializa un (mercado, símbolo) con historial REST de velas base.
+
+        Returns:
+            Diccionario {timeframe: velas construidas}
+        """
+        resampler = KlineResampler(self.base_interval, self.targets)
+        self.resamplers[(market, symbol)] = resampler
+        resampler.update(klines)
+        return {target: resampler.candles(target) for target in self.targets}
+
+    def handle_kline(self, market: str, symbol: str, interval: str,
+                     candle: Dict[str, Any], closed: bool):
+        """Callback para KlineStream"""
+        self.on_kline(market, symbol, interval, candle, closed)
+        if interval != self.base_interval:
+            return
+
+        resampler = self.resamplers.get((market, symbol))
+        if resampler is None:
+            resampler = self.resamplers[(market, symbol)] = KlineResampler(self.base_interval, self.targets)
+        for target, (target_candle, target_closed) in resampler.update_candle(candle, closed).items():
+            self.on_kline(market, symbol, target, target_candle, target_closed)
+
+    def candles(self, market: str, symbol: str, target: str, count: Optional[int] = None) -> np.ndarray:
+        """Velas construidas de un (mercado, símbolo, timeframe)"""
+        return self.resamplers[(market, symbol)].candles(target, count)
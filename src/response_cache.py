@@ -0,0 +1,112 @@
+"""
+Caché de respuestas de corta duración con deduplicación de solicitudes en vuelo.
+Si varios hilos piden la misma URL y parámetros a la vez, solo uno envía la
+solicitud y el resto recibe su respuesta; las repeticiones dentro del TTL se
+sirven localmente.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """Caché TTL segura para hilos, con contadores de aciertos y fallos"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Máximo de respuestas guardadas (se descartan las más antiguas)
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        # key -> (expira_en, valor)
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(base_url: str, path: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Clave de una solicitud GET (independiente del orden de los parámetros)"""
+        return base_url, path, tuple(sorted((params or {}).items()))
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], Any],
+                     expires_at: Callable[[Any], Optional[float]]) -> Any:
+        """
+        Devuelve la respuesta en caché o la obtiene con `fetch` (una sola vez por clave).
+
+        Args:
+            key: Clave de la solicitud (ver make_key)
+            fetch: Función que realiza la solicitud
+            expires_at: Recibe la respuesta y devuelve hasta cuándo es válida
+                        (time.time()); None para no guardarla (ej: errores HTTP)
+
+        Returns:
+            Respuesta (compartida entre todos los que pidieron la misma clave)
+        """
+        leader = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.time():
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            pending = self._in_flight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                pending = Future()
+                self._in_flight[key] = pending
+                leader = True
+
+        if not leader:
+            return pending.result()
+
+        try:
+            value = fetch()
+            expiry = expires_at(value)
+        except BaseException as e:
+            # Siempre liberar la clave y resolver el Future: si no, los que
+            # esperan esta solicitud quedarían bloqueados para siempre
+            with self._lock:
+                del self._in_flight[key]
+            pending.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            if expiry is not None and expiry > time.time():
+                if len(self._entries) >= self.max_entries:
+                    self._evict()
+                self._entries[key] = (expiry, value)
+        pending.set_result(value)
+        return value
+
+    def _evict(self):
+        """Descarta entradas caducadas o, si no hay, la más antigua"""
+        now = time.time()
+        expired = [key for key, (expiry, _) in self._entries.items() if expiry <= now]
+        for key in expired:
+            del self._entries[key]
+        if not expired:
+            del self._entries[next(iter(self._entries))]
+
+    def clear(self):
+        """Vacía la caché (no afecta a las solicitudes en vuelo)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso de la caché"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': len(self._entries)
+        }
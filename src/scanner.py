@@ -0,0 +1,180 @@
+"""
+Escáner multi-símbolo.
+Descarga FUTUROS y SPOT de muchos símbolos desde un único event loop
+(AsyncBinanceClient) con paralelismo acotado, analiza cada timeframe y
+devuelve una tabla ordenada de condiciones LONG/SHORT cumplidas.
+"""
+
+import asyncio
+from typing import List, Dict, Any, Tuple, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .async_binance_client import AsyncBinanceClient
+from .binance_client import BinanceClient, InvalidSymbolError
+from .indicators import TechnicalIndicators
+
+
+class MarketScanner:
+    """Escáner concurrente de símbolos con paralelismo acotado"""
+
+    def __init__(self, max_concurrency: int = 40, base_url: str = None, spot_url: str = None):
+        """
+        Inicializa el escáner.
+
+        Args:
+            max_concurrency: Máximo de solicitudes HTTP simultáneas
+            base_url: URL base de FUTUROS (para pruebas con servidor local)
+            spot_url: URL base de SPOT (para pruebas con servidor local)
+        """
+        self.max_concurrency = max_concurrency
+        self.base_url = base_url
+        self.spot_url = spot_url
+
+    async def _fetch_one(self, client: AsyncBinanceClient, semaphore: asyncio.Semaphore,
+                         symbol: str, interval: str, limit: int,
+                         use_spot: bool) -> np.ndarray:
+        async with semaphore:
+            return await client.get_klines_array(symbol, interval, limit, use_spot=use_spot)
+
+    async def fetch_all(self, symbols: List[str], intervals: List[str],
+                        limit: int = 50) -> Tuple[Dict[Tuple[str, str], Tuple[pd.DataFrame, Optional[pd.DataFrame]]],
+                                                  Dict[str, str]]:
+        """
+        Descarga FUTUROS y SPOT de todos los (símbolo, intervalo) en paralelo.
+
+        Args:
+            symbols: Lista de pares (ej: ['ETHUSDT', 'BTCUSDT'])
+            intervals: Timeframes (ej: ['4h', '1h', '15m'])
+            limit: Velas por solicitud
+
+        Returns:
+            Tupla (datos, errores): datos {(símbolo, intervalo): (df_futures, df_spot)};
+            df_spot es None si el par no existe en SPOT. errores {símbolo: mensaje}.
+        """
+        arrays, errors = await self.fetch_all_arrays(symbols, intervals, limit)
+        return {key: self._to_dataframes(pair) for key, pair in arrays.items()}, errors
+
+    @staticmethod
+    def _to_dataframes(pair: Tuple[np.ndarray, Optional[np.ndarray]]) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        futures, spot = pair
+        return (BinanceClient.klines_to_dataframe(futures),
+                BinanceClient.klines_to_dataframe(spot) if spot is not None else None)
+
+    async def fetch_all_arrays(self, symbols: List[str], intervals: List[str],
+                               limit: int = 50) -> Tuple[Dict[Tuple[str, str], Tuple[np.ndarray, Optional[np.ndarray]]],
+                                                         Dict[str, str]]:
+        """
+        Igual que fetch_all, pero entrega las velas como arrays estructurados (KLINE_DTYPE).
+
+        Args:
+            symbols: Lista de pares (ej: ['ETHUSDT', 'BTCUSDT'])
+            intervals: Timeframes (ej: ['4h', '1h', '15m'])
+            limit: Velas por solicitud
+
+        Returns:
+            Tupla (datos, errores): datos {(símbolo, intervalo): (futuros, spot)};
+            spot es None si el par no existe en SPOT o no tiene velas. Cualquier
+            otro fallo (FUTUROS o SPOT) se registra en errores {símbolo: mensaje}.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        jobs = [(symbol, interval, use_spot)
+                for symbol in symbols for interval in intervals for use_spot in (False, True)]
+
+        async with AsyncBinanceClient(self.base_url, self.spot_url, pool_size=self.max_concurrency) as client:
+            results = await asyncio.gather(
+                *(self._fetch_one(client, semaphore, symbol, interval, limit, use_spot)
+                  for symbol, interval, use_spot in jobs),
+                return_exceptions=True
+            )
+
+        frames = dict(zip(jobs, results))
+        data = {}
+        errors = {}
+        for symbol in symbols:
+            for interval in intervals:
+                futures = frames[(symbol, interval, False)]
+                spot = frames[(symbol, interval, True)]
+                if isinstance(futures, Exception):
+                    errors[symbol] = str(futures)
+                    continue
+                # Sin datos SPOT (par inexistente o vacío): MACD y Volumen usan FUTUROS
+                if isinstance(spot, InvalidSymbolError):
+                    spot = None
+                elif isinstance(spot, Exception):
+                    errors[symbol] = f"SPOT: {spot}"
+                    continue
+                elif len(spot) == 0:
+                    spot = None
+                data[(symbol, interval)] = (futures, spot)
+
+        return data, errors
+
+    def scan(self, symbols: List[str], intervals: List[str],
+             analyze: Callable[[str, pd.DataFrame, Optional[pd.DataFrame], Optional[Dict[str, Any]]],
+                               Dict[str, Any]],
+             limit: int = 50) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """
+        Ejecuta el escaneo completo.
+
+        Args:
+            symbols: Lista de pares a escanear
+            intervals: Timeframes a analizar
+            analyze: Función (intervalo, df_futures, df_spot, indicadores) -> resultado de
+                     analyze_timeframe. Los indicadores llegan ya calculados por panel
+                     (None si el símbolo no entró en ningún panel)
+            limit: Velas por solicitud
+
+        Returns:
+            Tupla (tabla ordenada, errores por símbolo)
+        """
+        arrays, errors = asyncio.run(self.fetch_all_arrays(symbols, intervals, limit))
+
+        # Indicadores de todos los símbolos a la vez (paneles símbolos x tiempo por timeframe)
+        indicators = TechnicalIndicators.calculate_indicators_for_frames(arrays)
+
+        results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (symbol, interval), pair in arrays.items():
+            if symbol in errors:
+                continue
+            try:
+                df_futures, df_spot = self._to_dataframes(pair)
+                analysis = analyze(interval, df_futures, df_spot, indicators.get((symbol, interval)))
+            except Exception as e:
+                errors[symbol] = str(e)
+                continue
+            results.setdefault(symbol, {})[interval] = analysis['evaluations']
+
+        complete = {symbol: tfs for symbol, tfs in results.items()
+                    if symbol not in errors and len(tfs) == len(intervals)}
+        return self.rank(complete, intervals), errors
+
+    @staticmethod
+    def rank(results: Dict[str, Dict[str, Dict[str, Any]]], intervals: List[str]) -> pd.DataFrame:
+        """
+        Construye la tabla ordenada de long_count/short_count por timeframe.
+
+        Args:
+            results: {símbolo: {intervalo: evaluations}}
+            intervals: Orden de columnas de timeframes
+
+        Returns:
+            DataFrame ordenado por la mejor dirección (total de condiciones cumplidas)
+        """
+        rows = []
+        for symbol, timeframes in results.items():
+            row = {'symbol': symbol}
+            for interval in intervals:
+                row[f'{interval}_long'] = timeframes[interval]['long_count']
+                row[f'{interval}_short'] = timeframes[interval]['short_count']
+            row['total_long'] = sum(row[f'{interval}_long'] for interval in intervals)
+            row['total_short'] = sum(row[f'{interval}_short'] for interval in intervals)
+            row['direction'] = 'LONG' if row['total_long'] >= row['total_short'] else 'SHORT'
+            row['score'] = max(row['total_long'], row['total_short'])
+            rows.append(row)
+
+        columns = (['symbol'] + [f'{i}_{d}' for i in intervals for d in ('long', 'short')]
+                   + ['total_long', 'total_short', 'direction', 'score'])
+        table = pd.DataFrame(rows, columns=columns)
+        return table.sort_values(['score', 'symbol'], ascending=[False, True]).reset_index(drop=True)
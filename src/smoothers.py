@@ -0,0 +1,323 @@
+"""
+Suavizados recursivos (EMA y Wilder) usados por los indicadores.
+Si numba está instalado, las recurrencias se compilan (JIT) y se recorren en
+un solo bucle sin arrays temporales; si no, se usa la versión NumPy por bloques.
+Ambas versiones coinciden con Series.ewm(alpha=..., adjust=False).mean().
+
+Todas las funciones operan sobre el último eje: aceptan una serie (tiempo,) o
+un panel (símbolos, tiempo) y suavizan cada fila de forma independiente.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba es opcional
+    njit = None
+
+
+# Crecimiento máximo de los pesos d^-k dentro de un bloque de ewm_numpy() (acota el error de redondeo)
+_MAX_BLOCK_GROWTH = 1e3
+
+# Backend activo: 'numba' si está disponible, sino 'numpy'
+BACKEND = 'numba' if njit is not None else 'numpy'
+
+
+def ewm_numpy(values: np.ndarray, alpha: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Media exponencial y[t] = (1 - alpha) * y[t-1] + alpha * x[t], con y[0] = x[0].
+
+    La recurrencia se resuelve por bloques: dentro de cada bloque con una suma
+    acumulada ponderada y entre bloques propagando solo el último valor
+    (vectorizado sobre todas las filas de un panel).
+
+    Args:
+        values: Serie (tiempo,) o panel (símbolos, tiempo), sin NaN
+        alpha: Factor de suavizado (0 < alpha <= 1)
+        out: Array de salida preasignado (opcional)
+
+    Returns:
+        Array con la media exponencial (misma forma que values)
+    """
+    x = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty(x.shape)
+    n = x.shape[-1] if x.ndim else 0
+    if x.size == 0:
+        return out
+
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[...] = x
+        return out
+
+    rows = x.reshape(-1, n)
+    block = int(np.log(_MAX_BLOCK_GROWTH) / -np.log(decay)) if decay < 1.0 else n
+    block = max(1, min(block, n))
+    blocks = -(-n // block)
+
+    # powers[j] = d^(j+1), growth[j] = d^-(j+1)
+    powers = decay ** np.arange(1, block + 1)
+    growth = 1.0 / powers
+
+    padded = np.zeros((len(rows), blocks * block))
+    padded[:, :n] = rows
+    padded = padded.reshape(len(rows), blocks, block)
+
+    # Respuesta de cada bloque partiendo de 0
+    local = np.cumsum(padded * growth, axis=2)
+    local *= powers
+    local *= alpha
+
+    # Valor previo a cada bloque (la semilla y[-1] = x[0] hace que y[0] = x[0])
+    carry = np.empty((len(rows), blocks))
+    decay_block = powers[-1]
+    if len(rows) == 1:
+        # Una sola serie: recurrencia con escalares (evita operaciones NumPy por bloque)
+        previous = float(rows[0, 0])
+        last = local[0, :, -1].tolist()
+        for b in range(blocks):
+            carry[0, b] = previous
+            previous = last[b] + decay_block * previous
+    else:
+        previous = rows[:, 0].copy()
+        last = local[:, :, -1]
+        for b in range(blocks):
+            carry[:, b] = previous
+            previous = last[:, b] + decay_block * previous
+
+    local += carry[:, :, None] * powers
+    out[...] = local.reshape(len(rows), -1)[:, :n].reshape(x.shape)
+    return out
+
+
+def rsi_numpy(close: np.ndarray, period: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """RSI de Wilder (la primera ganancia/pérdida es 0, el primer valor es NaN)"""
+    close = np.asarray(close, dtype=np.float64)
+    if out is None:
+        out = np.empty(close.shape)
+    if close.size == 0:
+        return out
+
+    delta = np.empty(close.shape)
+    delta[..., 0] = 0.0
+    np.subtract(close[..., 1:], close[..., :-1], out=delta[..., 1:])
+    avg_gain = ewm_numpy(np.maximum(delta, 0.0), 1 / period)
+    avg_loss = ewm_numpy(np.maximum(-delta, 0.0, out=delta), 1 / period, out=delta)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        np.divide(avg_gain, avg_loss, out=out)
+        out += 1.0
+        np.divide(100.0, out, out=out)
+        np.subtract(100.0, out, out=out)
+    return out
+
+
+def true_range_numpy(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """True Range; la primera vela solo tiene high - low"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    true_range = np.subtract(high, low, out=out)
+    if true_range.shape[-1] > 1:
+        previous_close = close[..., :-1]
+        tail = true_range[..., 1:]
+        np.maximum(tail, np.abs(high[..., 1:] - previous_close), out=tail)
+        np.maximum(tail, np.abs(low[..., 1:] - previous_close), out=tail)
+    return true_range
+
+
+def atr_numpy(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int,
+              out: Optional[np.ndarray] = None) -> np.ndarray:
+    """ATR de Wilder (EMA con alpha = 1/período del True Range)"""
+    true_range = true_range_numpy(high, low, close)
+    return ewm_numpy(true_range, 1 / period, out=out if out is not None else true_range)
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _ewm_loop(x, alpha, out):
+        n = len(x)
+        if n == 0:
+            return out
+        value = x[0]
+        out[0] = value
+        for i in range(1, n):
+            value += alpha * (x[i] - value)
+            out[i] = value
+        return out
+
+    @njit(cache=True)
+    def _rsi_loop(close, period, out):
+        n = len(close)
+        if n == 0:
+            return out
+        alpha = 1.0 / period
+        avg_gain = 0.0
+        avg_loss = 0.0
+        out[0] = np.nan
+        for i in range(1, n):
+            delta = close[i] - close[i - 1]
+            gain = delta if delta > 0.0 else 0.0
+            loss = -delta if delta < 0.0 else 0.0
+            avg_gain += alpha * (gain - avg_gain)
+            avg_loss += alpha * (loss - avg_loss)
+            if avg_loss == 0.0:
+                out[i] = 100.0 if avg_gain > 0.0 else np.nan
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return out
+
+    @njit(cache=True)
+    def _atr_loop(high, low, close, period, out):
+        n = len(close)
+        if n == 0:
+            return out
+        alpha = 1.0 / period
+        value = high[0] - low[0]
+        out[0] = value
+        for i in range(1, n):
+            true_range = high[i] - low[i]
+            up = abs(high[i] - close[i - 1])
+            down = abs(low[i] - close[i - 1])
+            if up > true_range:
+                true_range = up
+            if down > true_range:
+                true_range = down
+            value += alpha * (true_range - value)
+            out[i] = value
+        return out
+
+    @njit(cache=True)
+    def _ewm_rows(x, alpha, out):
+        for row in range(x.shape[0]):
+            _ewm_loop(x[row], alpha, out[row])
+        return out
+
+    @njit(cache=True)
+    def _ewm_alpha_rows(x, alphas, out):
+        for row in range(out.shape[0]):
+            _ewm_loop(x[row], alphas[row], out[row])
+        return out
+
+    @njit(cache=True)
+    def _rsi_rows(close, period, out):
+        for row in range(close.shape[0]):
+            _rsi_loop(close[row], period, out[row])
+        return out
+
+    @njit(cache=True)
+    def _atr_rows(high, low, close, period, out):
+        for row in range(close.shape[0]):
+            _atr_loop(high[row], low[row], close[row], period, out[row])
+        return out
+
+
+def _as_rows(values) -> np.ndarray:
+    """Vista contigua (filas, tiempo) de una serie o panel"""
+    x = np.ascontiguousarray(values, dtype=np.float64)
+    return x.reshape(-1, x.shape[-1]) if x.ndim else x.reshape(1, 1)
+
+
+def _output(out: Optional[np.ndarray], shape: tuple) -> tuple:
+    """Array de salida contiguo y su vista (filas, tiempo)"""
+    target = out if out is not None and out.flags.c_contiguous else np.empty(shape)
+    return target, target.reshape(-1, shape[-1])
+
+
+def _finish(out: Optional[np.ndarray], target: np.ndarray) -> np.ndarray:
+    if out is not None and out is not target:
+        out[...] = target
+        return out
+    return target
+
+
+def ewm(values: np.ndarray, alpha: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Media exponencial con adjust=False (y[0] = x[0]) con el backend activo.
+
+    Args:
+        values: Serie (tiempo,) o panel (símbolos, tiempo), sin NaN
+        alpha: Factor de suavizado (EMA: 2 / (período + 1), Wilder: 1 / período)
+        out: Array de salida preasignado (opcional)
+
+    Returns:
+        Array con la media exponencial
+    """
+    if BACKEND != 'numba':
+        return ewm_numpy(values, alpha, out)
+    x = _as_rows(values)
+    shape = np.shape(values)
+    target, rows = _output(out, shape)
+    _ewm_rows(x, float(alpha), rows)
+    return _finish(out, target)
+
+
+def ewm_multi(values: np.ndarray, alphas, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Media exponencial de cada fila con su propio alpha (barridos de períodos).
+
+    Args:
+        values: Serie (tiempo,) compartida por todas las filas, o matriz (len(alphas), tiempo)
+        alphas: Factor de suavizado de cada fila
+        out: Array de salida preasignado (opcional)
+
+    Returns:
+        Matriz (len(alphas), tiempo)
+    """
+    alphas = np.asarray(alphas, dtype=np.float64).ravel()
+    x = np.asarray(values, dtype=np.float64)
+    shape = (len(alphas), x.shape[-1])
+    # Sin copiar la serie: todas las filas apuntan a los mismos datos
+    x = np.broadcast_to(x, shape)
+    if BACKEND != 'numba':
+        if out is None:
+            out = np.empty(shape)
+        for row, alpha in enumerate(alphas):
+            ewm_numpy(x[row], alpha, out=out[row])
+        return out
+    target, rows = _output(out, shape)
+    _ewm_alpha_rows(x, alphas, rows)
+    return _finish(out, target)
+
+
+def wilder_rsi(close: np.ndarray, period: int = 14, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    RSI de Wilder con el backend activo (mismo resultado que TechnicalIndicators.calculate_rsi).
+    """
+    if BACKEND != 'numba':
+        return rsi_numpy(close, period, out)
+    target, rows = _output(out, np.shape(close))
+    _rsi_rows(_as_rows(close), int(period), rows)
+    return _finish(out, target)
+
+
+def wilder_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    ATR de Wilder con el backend activo (mismo resultado que TechnicalIndicators.calculate_atr).
+    """
+    if BACKEND != 'numba':
+        return atr_numpy(high, low, close, period, out)
+    target, rows = _output(out, np.shape(close))
+    _atr_rows(_as_rows(high), _as_rows(low), _as_rows(close), int(period), rows)
+    return _finish(out, target)
+
+
+def set_backend(name: str):
+    """
+    Selecciona el backend ('numba' o 'numpy'), por ejemplo para comparar resultados.
+
+    Raises:
+        ValueError: Si el backend no existe o numba no está instalado
+    """
+    global BACKEND
+    if name not in ('numba', 'numpy'):
+        raise ValueError(f"Backend desconocido: {name}")
+    if name == 'numba' and njit is None:
+        raise ValueError("numba no está instalado")
+    BACKEND = name
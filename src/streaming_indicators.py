@@ -0,0 +1,262 @@
+"""
+Motor incremental (streaming) de indicadores técnicos.
+Avanza EMA 21/50, RSI de Wilder, ATR, MACD, Bollinger, VWAP y volumen con una
+sola vela nueva a partir de un estado pequeño, sin recalcular toda la ventana.
+Produce el mismo diccionario que TechnicalIndicators.calculate_all_indicators.
+"""
+
+import math
+from collections import deque
+from typing import Dict, Any, Optional, Mapping
+
+import numpy as np
+import pandas as pd
+
+
+MS_PER_DAY = 86_400_000
+
+
+class IncrementalIndicators:
+    """
+    Motor de indicadores con estado. Las velas cerradas se confirman con
+    add_candle(); la vela en progreso se evalúa con snapshot() sin modificar
+    el estado confirmado.
+
+    Partiendo de la misma ventana de velas, los valores coinciden con los de
+    calculate_all_indicators (mismas semillas: EMA inicia en el primer cierre,
+    RSI/ATR de Wilder con alpha = 1/período).
+    """
+
+    def __init__(self, ema_fast: int = 21, ema_slow: int = 50, rsi_period: int = 14,
+                 bb_period: int = 20, bb_std: float = 2.0, atr_period: int = 14,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 volume_lookback: int = 20):
+        """
+        Inicializa el motor con los mismos períodos por defecto que calculate_all_indicators.
+        """
+        self.alpha_ema_fast = 2 / (ema_fast + 1)
+        self.alpha_ema_slow = 2 / (ema_slow + 1)
+        self.alpha_rsi = 1 / rsi_period
+        self.alpha_atr = 1 / atr_period
+        self.alpha_macd_fast = 2 / (macd_fast + 1)
+        self.alpha_macd_slow = 2 / (macd_slow + 1)
+        self.alpha_macd_signal = 2 / (macd_signal + 1)
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.volume_lookback = volume_lookback
+
+        # Estado confirmado - datos de FUTUROS
+        self.count = 0
+        self.prev_close = None
+        self.ema21 = None
+        self.ema50 = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self.atr = None
+        self.closes = deque(maxlen=bb_period)
+        self.vwap_day = None
+        self.vwap_pv = 0.0
+        self.vwap_volume = 0.0
+
+        # Estado confirmado - fuente de MACD y Volumen (SPOT si se entrega, sino FUTUROS)
+        self.source_count = 0
+        self.macd_ema_fast = None
+        self.macd_ema_slow = None
+        self.macd_signal = None
+        self.histograms = deque(maxlen=2)
+        # Volumen y dirección de las últimas velas cerradas (para Volume MA20 y conteos)
+        self.volumes = deque(maxlen=max(volume_lookback, 20))
+        self.bullish = deque(maxlen=max(volume_lookback, 20))
+
+    @staticmethod
+    def _ema(previous: Optional[float], value: float, alpha: float) -> float:
+        """Paso de EMA con adjust=False; la primera observación es la semilla"""
+        if previous is None:
+            return value
+        return previous + alpha * (value - previous)
+
+    def _step_futures(self, high: float, low: float, close: float,
+                      volume: float, open_time: int) -> Dict[str, Any]:
+        """Calcula el siguiente estado de FUTUROS sin modificar el actual"""
+        if self.prev_close is None:
+            gain = loss = 0.0
+            true_range = high - low
+        else:
+            delta = close - self.prev_close
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        # VWAP de sesión: se reinicia en cada día UTC
+        day = open_time // MS_PER_DAY
+        typical_price = (high + low + close) / 3
+        if day == self.vwap_day:
+            vwap_pv = self.vwap_pv + typical_price * volume
+            vwap_volume = self.vwap_volume + volume
+        else:
+            vwap_pv = typical_price * volume
+            vwap_volume = volume
+
+        return {
+            'prev_close': close,
+            'ema21': self._ema(self.ema21, close, self.alpha_ema_fast),
+            'ema50': self._ema(self.ema50, close, self.alpha_ema_slow),
+            'avg_gain': self._ema(self.avg_gain, gain, self.alpha_rsi),
+            'avg_loss': self._ema(self.avg_loss, loss, self.alpha_rsi),
+            'atr': self._ema(self.atr, true_range, self.alpha_atr),
+            'vwap_day': day,
+            'vwap_pv': vwap_pv,
+            'vwap_volume': vwap_volume
+        }
+
+    def _step_source(self, close: float) -> Dict[str, Any]:
+        """Calcula el siguiente estado de MACD sin modificar el actual"""
+        macd_ema_fast = self._ema(self.macd_ema_fast, close, self.alpha_macd_fast)
+        macd_ema_slow = self._ema(self.macd_ema_slow, close, self.alpha_macd_slow)
+        macd_line = macd_ema_fast - macd_ema_slow
+        macd_signal = self._ema(self.macd_signal, macd_line, self.alpha_macd_signal)
+
+        return {
+            'macd_ema_fast': macd_ema_fast,
+            'macd_ema_slow': macd_ema_slow,
+            'macd_line': macd_line,
+            'macd_signal': macd_signal,
+            'histogram': macd_line - macd_signal
+        }
+
+    def add_candle(self, candle: Mapping[str, Any], spot_candle: Optional[Mapping[str, Any]] = None):
+        """
+        Confirma una vela cerrada en el estado.
+
+        Args:
+            candle: Vela de FUTUROS con 'open', 'high', 'low', 'close', 'volume', 'open_time'
+            spot_candle: Vela SPOT opcional (para MACD y Volumen)
+        """
+        futures = self._step_futures(float(candle['high']), float(candle['low']), float(candle['close']),
+                                     float(candle['volume']), int(candle['open_time']))
+        for key, value in futures.items():
+            setattr(self, key, value)
+        self.closes.append(float(candle['close']))
+        self.count += 1
+
+        source_candle = spot_candle if spot_candle is not None else candle
+        source = self._step_source(float(source_candle['close']))
+        self.macd_ema_fast = source['macd_ema_fast']
+        self.macd_ema_slow = source['macd_ema_slow']
+        self.macd_signal = source['macd_signal']
+        self.histograms.append(source['histogram'])
+        self.volumes.append(float(source_candle['volume']))
+        self.bullish.append(float(source_candle['close']) > float(source_candle['open']))
+        self.source_count += 1
+
+    def warm_up(self, df: pd.DataFrame, df_spot: Optional[pd.DataFrame] = None):
+        """
+        Confirma todas las velas de un DataFrame (deben ser velas cerradas).
+
+        Args:
+            df: DataFrame de FUTUROS con columnas OHLCV y 'open_time'
+            df_spot: DataFrame SPOT opcional alineado con df
+        """
+        columns = ['open', 'high', 'low', 'close', 'volume', 'open_time']
+        futures_rows = df[columns].to_dict('records')
+        spot_rows = df_spot[columns].to_dict('records') if df_spot is not None else [None] * len(futures_rows)
+
+        for candle, spot_candle in zip(futures_rows, spot_rows):
+            self.add_candle(candle, spot_candle)
+
+    def _volume_analysis(self, current_volume: float) -> Dict[str, Any]:
+        """Mismo resultado que TechnicalIndicators.analyze_volume con la vela actual en progreso"""
+        volumes = list(self.volumes)
+        previous_volume = volumes[-1] if volumes else float('nan')
+
+        last_20 = volumes[-20:]
+        avg_volume_20 = sum(last_20) / len(last_20) if last_20 else float('nan')
+
+        volume_change_current = ((current_volume - avg_volume_20) / avg_volume_20) * 100 if avg_volume_20 > 0 else 0
+        volume_change_previous = ((previous_volume - avg_volume_20) / avg_volume_20) * 100 if avg_volume_20 > 0 else 0
+
+        recent = list(self.bullish)[-self.volume_lookback:]
+        bullish_count = sum(recent)
+
+        return {
+            'current': current_volume,
+            'previous': previous_volume,
+            'avg_20': avg_volume_20,
+            'change_pct_current': volume_change_current,
+            'change_pct_previous': volume_change_previous,
+            'bullish_candles': bullish_count,
+            'bearish_candles': len(recent) - bullish_count,
+            'total_candles': len(recent)
+        }
+
+    def snapshot(self, candle: Mapping[str, Any], spot_candle: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Calcula los indicadores provisionales con la vela en progreso,
+        sin modificar el estado confirmado.
+
+        Args:
+            candle: Vela de FUTUROS en progreso
+            spot_candle: Vela SPOT en progreso (opcional)
+
+        Returns:
+            Diccionario con el mismo formato que calculate_all_indicators
+        """
+        close = float(candle['close'])
+        futures = self._step_futures(float(candle['high']), float(candle['low']), close,
+                                     float(candle['volume']), int(candle['open_time']))
+
+        source_candle = spot_candle if spot_candle is not None else candle
+        source = self._step_source(float(source_candle['close']))
+
+        # RSI (división con semántica de NumPy: avg_loss = 0 -> RSI 100)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(futures['avg_gain']) / np.float64(futures['avg_loss'])
+            rsi = float(100 - (100 / (1 + rs)))
+
+        # Bollinger sobre los últimos bb_period cierres (incluye la vela en progreso)
+        window = list(self.closes)[-(self.bb_period - 1):] + [close] if self.bb_period > 1 else [close]
+        if len(window) >= self.bb_period:
+            mean = sum(window) / len(window)
+            std = math.sqrt(sum((x - mean) ** 2 for x in window) / (len(window) - 1))
+            bb_upper, bb_middle, bb_lower = mean + std * self.bb_std, mean, mean - std * self.bb_std
+        else:
+            bb_upper = bb_middle = bb_lower = float('nan')
+
+        histograms = list(self.histograms)
+        histogram_prev = histograms[-1] if len(histograms) >= 1 else 0
+        histogram_prev2 = histograms[-2] if len(histograms) >= 2 else 0
+
+        return {
+            'price': close,
+            'ema21': futures['ema21'],
+            'ema50': futures['ema50'],
+            'rsi': rsi,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'macd_line': source['macd_line'],
+            'macd_signal': source['macd_signal'],
+            'macd_histogram': source['histogram'],
+            'macd_histogram_prev': histogram_prev,
+            'macd_histogram_prev2': histogram_prev2,
+            'vwap': futures['vwap_pv'] / futures['vwap_volume'] if futures['vwap_volume'] else float('nan'),
+            'volume': self._volume_analysis(float(source_candle['volume'])),
+            'atr': futures['atr']
+        }
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, df_spot: Optional[pd.DataFrame] = None,
+                       **params) -> "IncrementalIndicators":
+        """
+        Crea un motor confirmando todas las velas excepto la última (en progreso).
+
+        Args:
+            df: DataFrame de FUTUROS (la última vela se considera en progreso)
+            df_spot: DataFrame SPOT opcional
+
+        Returns:
+            Motor listo para llamar a snapshot() con la última vela
+        """
+        engine = cls(**params)
+        engine.warm_up(df.iloc[:-1], df_spot.iloc[:-1] if df_spot is not None else None)
+        return engine
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script para probar AsyncBinanceClient contra un servidor HTTP local
+que imita los endpoints públicos de Binance (sin conexión a internet).
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from src.async_binance_client import AsyncBinanceClient
+
+
+def build_klines(limit: int, start_ms: int = 1762000000000, step_ms: int = 300000) -> list:
+    """Genera velas con el mismo formato que devuelve Binance (strings para precios)"""
+    klines = []
+    for i in range(limit):
+        open_time = start_ms + i * step_ms
+        price = 3800 + i
+        klines.append([
+            open_time, f"{price:.2f}", f"{price + 5:.2f}", f"{price - 5:.2f}", f"{price + 1:.2f}",
+            "100.5", open_time + step_ms - 1, "380000.0", 1200, "50.2", "190000.0", "0"
+        ])
+    return klines
+
+
+def create_stand_in_app(delay: float, stats: dict) -> web.Application:
+    """Servidor local con /fapi/v1/klines, /api/v3/klines, /fapi/v1/ticker/price y /fapi/v1/ping"""
+
+    async def klines(request):
+        stats['requests'] += 1
+        await asyncio.sleep(delay)
+        return web.json_response(build_klines(int(request.query.get('limit', 200))))
+
+    async def price(request):
+        stats['requests'] += 1
+        return web.json_response({'symbol': request.query['symbol'], 'price': '3850.25'})
+
+    async def ping(request):
+        stats['requests'] += 1
+        return web.json_response({})
+
+    @web.middleware
+    async def count_connections(request, handler):
+        # Cada conexión TCP nueva tiene un transporte distinto
+        stats['connections'].add(id(request.transport))
+        return await handler(request)
+
+    app = web.Application(middlewares=[count_connections])
+    app.router.add_get('/fapi/v1/klines', klines)
+    app.router.add_get('/api/v3/klines', klines)
+    app.router.add_get('/fapi/v1/ticker/price', price)
+    app.router.add_get('/fapi/v1/ping', ping)
+    return app
+
+
+async def run():
+    print("=== TEST DE CLIENTE ASÍNCRONO (servidor local) ===\n")
+
+    delay = 0.2
+    stats = {'requests': 0, 'connections': set()}
+    runner = web.AppRunner(create_stand_in_app(delay, stats))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    symbols = [f"SYM{i}USDT" for i in range(40)]
+
+    try:
+        async with AsyncBinanceClient(base_url=base_url, spot_url=base_url, pool_size=100) as client:
+            print(f"1. Ping: {await client.test_connection()}")
+            print(f"2. Precio actual: {await client.get_current_price('ETHUSDT')}")
+
+            print(f"\n3. Descargando FUTUROS + SPOT de {len(symbols)} símbolos en paralelo...")
+            start = time.perf_counter()
+            tasks = []
+            for symbol in symbols:
+                tasks.append(client.get_klines(symbol, '5m', 50))
+                tasks.append(client.get_klines_spot(symbol, '5m', 50))
+            results = await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+
+            print(f"   Solicitudes: {len(results)} en {elapsed:.2f}s (latencia simulada {delay}s c/u)")
+            print(f"   Velas por respuesta: {len(results[0])}, última cierre: {results[0][-1]['close']}")
+
+            assert all(len(r) == 50 for r in results)
+            assert elapsed < delay * 5, "Las solicitudes no se ejecutaron en paralelo"
+
+            klines_array = await client.get_klines_array('ETHUSDT', '5m', 50, use_spot=True)
+            assert klines_array['close'][-1] == results[1][-1]['close']
+            print(f"   Formato columnar: {len(klines_array)} velas, dtype {klines_array.dtype.names[:5]}...")
+
+            print("\n4. Segunda ronda (debe reutilizar conexiones keep-alive)...")
+            connections_before = len(stats['connections'])
+            await asyncio.gather(*(client.get_klines(s, '1h', 10) for s in symbols))
+            print(f"   Conexiones abiertas: antes {connections_before}, después {len(stats['connections'])}")
+            assert len(stats['connections']) == connections_before
+
+        print(f"\n✅ OK - {stats['requests']} solicitudes atendidas por el servidor local")
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
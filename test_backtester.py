@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script para verificar el backtester: niveles SL/TP iguales a
+calculate_sl_tp_with_atr, operaciones iguales a una simulación vela a vela
+en Python y velocidad sobre 3 años de velas de 5m.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src.backtester import Backtester, MIN_CANDLES
+from src.indicators import TechnicalIndicators
+from test_streaming_indicators import build_dataframe
+
+
+def reference_trades(backtester: Backtester, df) -> list:
+    """Simulación vela a vela (lenta) con las mismas reglas"""
+    high, low, close = df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+    atr = TechnicalIndicators.calculate_atr(df, 14).to_numpy()
+    direction = backtester.signals(df)
+
+    trades = []
+    i = MIN_CANDLES - 1
+    while i < len(df) - 1:
+        if direction[i] == 0:
+            i += 1
+            continue
+        side = 'LONG' if direction[i] == 1 else 'SHORT'
+        levels = TechnicalIndicators.calculate_sl_tp_with_atr(close[i], atr[i], side)
+        sign = 1 if side == 'LONG' else -1
+        tp1_done = False
+        exit_index, exit_price = len(df) - 1, close[-1]
+        for j in range(i + 1, len(df)):
+            adverse = low[j] if side == 'LONG' else high[j]
+            favorable = high[j] if side == 'LONG' else low[j]
+            if sign * (adverse - levels['sl']) <= 0:
+                exit_index, exit_price = j, levels['sl']
+                break
+            if not tp1_done and sign * (favorable - levels['tp1']) >= 0:
+                tp1_done = True
+            if tp1_done and sign * (favorable - levels['tp2']) >= 0:
+                exit_index, exit_price = j, levels['tp2']
+                break
+        if tp1_done:
+            pnl = sign * (0.7 * (levels['tp1'] - close[i]) + 0.3 * (exit_price - close[i])) / close[i] * 100
+        else:
+            pnl = sign * (exit_price - close[i]) / close[i] * 100
+        trades.append((i, side, exit_index, pnl))
+        i = exit_index + 1
+    return trades
+
+
+def main():
+    print("=== TEST DEL BACKTESTER ===\n")
+    backtester = Backtester()
+
+    print("1. Niveles vs calculate_sl_tp_with_atr (incluye límites 1.5% - 3.0%)...")
+    price = np.array([100.0, 100.0, 100.0, 2500.0])
+    atr = np.array([0.3, 1.0, 4.0, 20.0])
+    for side, sign in (('LONG', 1), ('SHORT', -1)):
+        levels = backtester.levels(price, atr, np.full(len(price), sign))
+        for i in range(len(price)):
+            expected = TechnicalIndicators.calculate_sl_tp_with_atr(price[i], atr[i], side)
+            for key in ('sl', 'tp1', 'tp2', 'sl_pct'):
+                assert abs(levels[key][i] - expected[key]) < 1e-9, (side, i, key)
+    print("   OK")
+
+    print("\n2. Operaciones vs simulación vela a vela (20.000 velas)...")
+    df = build_dataframe(20_000, seed=8)
+    result = backtester.run(df)
+    trades = result['trades']
+    expected = reference_trades(backtester, df)
+    assert len(trades) == len(expected)
+    for row, (entry, side, exit_index, pnl) in zip(trades.itertuples(), expected):
+        assert (row.entry_index, row.direction, row.exit_index) == (entry, side, exit_index)
+        assert abs(row.pnl_pct - pnl) < 1e-9
+    summary = result['summary']
+    print(f"   {summary['trades']} operaciones idénticas | win rate {summary['win_rate']:.1f}% | "
+          f"PnL {summary['total_pnl_pct']:.2f}% | drawdown {summary['max_drawdown_pct']:.2f}%")
+
+    print("\n3. Velocidad (3 años de velas de 5m)...")
+    long_df = build_dataframe(3 * 365 * 288, seed=2)
+    start = time.perf_counter()
+    summary = backtester.run(long_df)['summary']
+    elapsed = time.perf_counter() - start
+    print(f"   {len(long_df)} velas en {elapsed:.2f} s | {summary['trades']} operaciones "
+          f"({summary['ambiguous_trades']} ambiguas)")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
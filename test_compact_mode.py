@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script para verificar el modo compacto (float32, sin columna datetime):
+memoria por vela y error de los indicadores frente a los DataFrames float64,
+dentro de las tolerancias documentadas en BinanceClient.klines_to_dataframe.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import numpy as np
+
+from src.binance_client import BinanceClient
+from src.indicators import TechnicalIndicators
+from test_indicator_kernel import to_klines_array
+from test_streaming_indicators import build_dataframe
+
+
+# Tolerancias documentadas (error absoluto)
+PRICE_TOLERANCE = 1e-6   # x precio (EMA, Bollinger, VWAP, ATR, MACD)
+RSI_TOLERANCE = 0.01     # puntos de RSI
+VOLUME_TOLERANCE = 1e-3  # puntos porcentuales de volumen vs MA
+
+
+def max_error(expected, actual) -> float:
+    expected = np.asarray(expected, dtype=np.float64)
+    actual = np.asarray(actual, dtype=np.float64)
+    assert np.array_equal(np.isnan(expected), np.isnan(actual))
+    return float(np.nanmax(np.abs(expected - actual)))
+
+
+def main():
+    print("=== TEST DEL MODO COMPACTO (float32) ===\n")
+
+    klines = to_klines_array(build_dataframe(100_000, seed=21))
+    full = BinanceClient.klines_to_dataframe(klines)
+    compact = BinanceClient.klines_to_dataframe(klines, compact=True)
+    price = float(full['close'].abs().max())
+
+    full_bytes = full.memory_usage(index=False).sum() / len(full)
+    compact_bytes = compact.memory_usage(index=False).sum() / len(compact)
+    print(f"1. Memoria por vela: float64 {full_bytes:.0f} bytes | compacto {compact_bytes:.0f} bytes")
+    assert compact_bytes < full_bytes * 0.6
+
+    print("\n2. datetime bajo demanda...")
+    assert 'datetime' not in compact.columns
+    assert BinanceClient.candle_datetimes(compact).equals(full['datetime'])
+    print("   OK")
+
+    print("\n3. Error de las series completas frente a float64...")
+    bb_full = TechnicalIndicators.calculate_bollinger_bands(full)
+    bb_compact = TechnicalIndicators.calculate_bollinger_bands(compact)
+    price_level = {
+        'ema21': max_error(TechnicalIndicators.calculate_ema(full, 21), TechnicalIndicators.calculate_ema(compact, 21)),
+        'bb_upper': max_error(bb_full['upper'], bb_compact['upper']),
+        'bb_lower': max_error(bb_full['lower'], bb_compact['lower']),
+        'vwap': max_error(TechnicalIndicators.calculate_vwap(full), TechnicalIndicators.calculate_vwap(compact)),
+        'atr': max_error(TechnicalIndicators.calculate_atr(full), TechnicalIndicators.calculate_atr(compact)),
+        'macd': max_error(TechnicalIndicators.calculate_macd(full)['histogram'],
+                          TechnicalIndicators.calculate_macd(compact)['histogram'])
+    }
+    for name, error in price_level.items():
+        print(f"   {name:9s} {error / price:.1e} x precio")
+        assert error < PRICE_TOLERANCE * price, name
+
+    rsi_error = max_error(TechnicalIndicators.calculate_rsi(full), TechnicalIndicators.calculate_rsi(compact))
+    print(f"   rsi       {rsi_error:.1e} puntos")
+    assert rsi_error < RSI_TOLERANCE
+
+    volume_full = TechnicalIndicators.analyze_volume_series(full)
+    volume_compact = TechnicalIndicators.analyze_volume_series(compact)
+    volume_error = max_error(volume_full['change_pct_current'], volume_compact['change_pct_current'])
+    print(f"   volumen   {volume_error:.1e} puntos porcentuales")
+    assert volume_error < VOLUME_TOLERANCE
+    assert (volume_full['bullish_candles'] == volume_compact['bullish_candles']).all()
+
+    print("\n4. calculate_all_indicators con DataFrames compactos (50 velas)...")
+    expected = TechnicalIndicators.calculate_all_indicators(full.iloc[-50:], full.iloc[-50:])
+    actual = TechnicalIndicators.calculate_all_indicators(compact.iloc[-50:], compact.iloc[-50:])
+    for key, value in expected.items():
+        if key == 'volume':
+            continue
+        assert isinstance(actual[key], np.float64), key
+        tolerance = RSI_TOLERANCE if key == 'rsi' else PRICE_TOLERANCE * price
+        assert abs(value - actual[key]) < tolerance, key
+    assert actual['volume']['bullish_candles'] == expected['volume']['bullish_candles']
+    print("   OK (resultados en float64)")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
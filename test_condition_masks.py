@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Script para verificar las máscaras de bits de condiciones: codificación y
+decodificación, detect_changes por XOR (con estados nuevos y en el formato
+anterior de listas) y tamaño del historial codificado.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import itertools
+import time
+
+import numpy as np
+
+from src.evaluator import ConditionEvaluator
+from test_streaming_indicators import build_dataframe
+
+
+def legacy_changes(old_state: dict, new_state: dict) -> dict:
+    """Comparación original elemento a elemento (listas de 7 booleanos)"""
+    result = {'long': [], 'short': []}
+    for side in ('long', 'short'):
+        old, new = old_state[f'{side}_conditions'], new_state[f'{side}_conditions']
+        for i in range(7):
+            if old[i] != new[i]:
+                result[side].append({'index': i, 'old': old[i], 'new': new[i]})
+    return result
+
+
+def main():
+    print("=== TEST DE MÁSCARAS DE CONDICIONES ===\n")
+    evaluator = ConditionEvaluator()
+
+    print("1. Codificación de las 128 combinaciones...")
+    combinations = [list(c) for c in itertools.product([False, True], repeat=7)]
+    for conditions in combinations:
+        assert evaluator.decode_conditions(evaluator.encode_conditions(conditions)) == conditions
+    print("   OK")
+
+    print("\n2. detect_changes por XOR vs comparación elemento a elemento...")
+    rng = np.random.default_rng(3)
+    for _ in range(500):
+        old_long, old_short, new_long, new_short = (combinations[i] for i in rng.integers(0, 128, 4))
+        old_legacy = {'long_count': sum(old_long), 'short_count': sum(old_short),
+                      'long_conditions': old_long, 'short_conditions': old_short}
+        new_legacy = {'long_count': sum(new_long), 'short_count': sum(new_short),
+                      'long_conditions': new_long, 'short_conditions': new_short}
+        new_state = {'long_count': sum(new_long), 'short_count': sum(new_short),
+                     'long_mask': evaluator.encode_conditions(new_long),
+                     'short_mask': evaluator.encode_conditions(new_short)}
+        expected = legacy_changes(old_legacy, new_legacy)
+        # Estado anterior guardado como listas (estado.json antiguo) y como máscaras
+        old_mask_state = {'long_count': sum(old_long), 'short_count': sum(old_short),
+                          'long_mask': evaluator.encode_conditions(old_long),
+                          'short_mask': evaluator.encode_conditions(old_short)}
+        for old_state in (old_legacy, old_mask_state):
+            changes = evaluator.detect_changes(old_state, new_state, "1h")
+            assert changes['condition_changes'] == expected
+            assert changes['has_changes'] == bool(expected['long'] or expected['short']
+                                                  or sum(old_long) != sum(new_long)
+                                                  or sum(old_short) != sum(new_short))
+    print("   OK (500 pares de estados)")
+
+    print("\n3. Historial de condiciones como un entero por vela...")
+    df = build_dataframe(1_000_000, seed=6)
+    evaluation = evaluator.evaluate_conditions_series(df)
+    start = time.perf_counter()
+    masks = evaluator.encode_condition_series(evaluation)
+    encode_ms = (time.perf_counter() - start) * 1000
+    decoded = evaluator.decode_condition_series(masks)
+    for key in ('long_conditions', 'short_conditions', 'long_count', 'short_count'):
+        assert np.array_equal(decoded[key], evaluation[key]), key
+    bool_mb = (evaluation['long_conditions'].nbytes + evaluation['short_conditions'].nbytes) / 1e6
+    print(f"   {len(masks)} velas: {masks.nbytes / 1e6:.1f} MB (uint16) vs {bool_mb:.1f} MB (matrices bool) "
+          f"| codificación {encode_ms:.0f} ms")
+    assert masks.dtype == np.uint16
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la evaluación vectorizada de las 7 condiciones LONG/SHORT
+(ConditionEvaluator.evaluate_conditions_series) contra la evaluación escalar
+vela a vela, y medir su velocidad. Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src.evaluator import ConditionEvaluator
+from src.indicators import TechnicalIndicators
+from test_streaming_indicators import build_dataframe
+
+
+def scalar_conditions(df, df_spot, index: int) -> tuple:
+    """Evaluación original con la vela `index` como vela actual"""
+    window = df.iloc[:index + 1]
+    window_spot = df_spot.iloc[:index + 1] if df_spot is not None else None
+    indicators = TechnicalIndicators.calculate_all_indicators(window, window_spot)
+    long_conditions, long_count, _ = ConditionEvaluator.evaluate_long_conditions(indicators, window)
+    short_conditions, short_count, _ = ConditionEvaluator.evaluate_short_conditions(indicators, window)
+    return long_conditions, long_count, short_conditions, short_count
+
+
+def main():
+    print("=== TEST DE CONDICIONES POR SERIE ===\n")
+
+    df = build_dataframe(400, seed=17)
+    df_spot = build_dataframe(400, seed=18)
+
+    for step, label, spot in (("1a", "FUTUROS + SPOT", df_spot), ("1b", "solo FUTUROS", None)):
+        print(f"{step}. Vela a vela vs evaluación escalar ({label})...")
+        result = ConditionEvaluator.evaluate_conditions_series(df, spot)
+        assert result['long_conditions'].shape == (len(df), 7)
+
+        for index in range(49, len(df)):
+            long_conditions, long_count, short_conditions, short_count = scalar_conditions(df, spot, index)
+            assert list(result['long_conditions'][index]) == long_conditions, index
+            assert list(result['short_conditions'][index]) == short_conditions, index
+            assert result['long_count'][index] == long_count and result['short_count'][index] == short_count
+
+        per_condition = result['long_conditions'][49:].sum(axis=0) + result['short_conditions'][49:].sum(axis=0)
+        print(f"   {len(df) - 49} velas idénticas | condiciones cumplidas por columna: {per_condition.tolist()}")
+
+    print("\n2. Velocidad (100.000 velas)...")
+    long_df = build_dataframe(100_000, seed=5)
+    start = time.perf_counter()
+    result = ConditionEvaluator.evaluate_conditions_series(long_df)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    signals = int(np.count_nonzero(result['long_count'] >= 5) + np.count_nonzero(result['short_count'] >= 5))
+    print(f"   {elapsed_ms:.0f} ms | velas con señal (>= 5 condiciones): {signals}")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la descarga en paralelo de TradingAnalysis.fetch_timeframes
+con un cliente simulado: mismo resultado por timeframe y mercado que la
+descarga secuencial, solicitudes realmente simultáneas y propagación del
+error de una solicitud fallida (sin dejar el almacén a medias).
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analisis_tecnico import TradingAnalysis
+from src.binance_client import BinanceClient
+from src.kline_store import KlineStore
+from test_indicator_kernel import to_klines_array
+from test_streaming_indicators import build_dataframe
+
+
+INTERVALS = ['4h', '1h', '15m']
+
+
+class StubClient:
+    """Cliente simulado: /klines por (intervalo, mercado) con latencia y fallos configurables"""
+
+    candle_bounds = BinanceClient.candle_bounds
+
+    def __init__(self, series: dict, delay: float = 0.0, fail: set = ()):
+        self.series = series
+        self.delay = delay
+        self.fail = set(fail)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def server_now_ms(self) -> int:
+        return int(time.time() * 1000)
+
+    def get_klines_array(self, symbol, interval, limit=200, start_time=None, use_spot=False):
+        with self._lock:
+            self.calls.append((interval, use_spot, start_time))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if (interval, use_spot) in self.fail:
+                raise ConnectionError(f"Error de conexión simulado ({interval}, spot={use_spot})")
+            series = self.series[(interval, use_spot)]
+            if start_time is None:
+                return np.array(series[-limit:])
+            start = np.searchsorted(series['open_time'], start_time)
+            return np.array(series[start:start + limit])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def build_series() -> dict:
+    series = {}
+    for seed, interval in enumerate(INTERVALS):
+        for use_spot in (False, True):
+            df = build_dataframe(300, interval_ms=BinanceClient.INTERVAL_MS[interval], seed=10 * seed + use_spot)
+            series[(interval, use_spot)] = to_klines_array(df)
+    return series
+
+
+def make_analysis(base_dir: str, client: StubClient) -> TradingAnalysis:
+    analysis = TradingAnalysis()
+    analysis.store = KlineStore(base_dir)
+    analysis.client = client
+    return analysis
+
+
+def main():
+    print("=== TEST DE DESCARGA EN PARALELO DE TIMEFRAMES ===\n")
+    series = build_series()
+
+    print("1. Paralelo vs secuencial (por timeframe y mercado)...")
+    with tempfile.TemporaryDirectory() as parallel_dir, tempfile.TemporaryDirectory() as sequential_dir:
+        client = StubClient(series, delay=0.1)
+        start = time.perf_counter()
+        frames = make_analysis(parallel_dir, client).fetch_timeframes(INTERVALS, 50)
+        parallel_s = time.perf_counter() - start
+
+        sequential = make_analysis(sequential_dir, StubClient(series, delay=0.1))
+        start = time.perf_counter()
+        expected = {
+            interval: tuple(sequential.get_klines_dataframe(interval, 50, use_spot) for use_spot in (False, True))
+            for interval in INTERVALS
+        }
+        sequential_s = time.perf_counter() - start
+
+        assert list(frames) == INTERVALS
+        for interval in INTERVALS:
+            for df, df_expected in zip(frames[interval], expected[interval]):
+                pd.testing.assert_frame_equal(df, df_expected)
+            assert not frames[interval][0].equals(frames[interval][1])
+        assert sorted(c[:2] for c in client.calls) == sorted((i, s) for i in INTERVALS for s in (False, True))
+        assert client.max_active == len(client.calls)
+        print(f"   OK ({len(client.calls)} solicitudes simultáneas: {parallel_s:.2f}s vs {sequential_s:.2f}s secuencial)")
+
+    print("\n2. Una solicitud fallida propaga su error...")
+    with tempfile.TemporaryDirectory() as base_dir:
+        client = StubClient(series, delay=0.05, fail={('1h', True)})
+        analysis = make_analysis(base_dir, client)
+        try:
+            analysis.fetch_timeframes(INTERVALS, 50)
+            raise AssertionError("fetch_timeframes debería fallar")
+        except ConnectionError as e:
+            assert "1h, spot=True" in str(e)
+            print(f"   ConnectionError: {e}")
+        # Las demás solicitudes terminaron y guardaron sus velas
+        assert len(client.calls) == 6
+        for interval in INTERVALS:
+            for use_spot in (False, True):
+                market = 'spot' if use_spot else 'futures'
+                stored = len(analysis.store.load(market, analysis.symbol, interval))
+                assert stored == (0 if (interval, use_spot) == ('1h', True) else 50)
+
+        # Al recuperarse la conexión, solo falta la solicitud que falló
+        client.fail.clear()
+        client.calls.clear()
+        frames = analysis.fetch_timeframes(INTERVALS, 50)
+        assert all(len(df) == 50 for pair in frames.values() for df in pair)
+        full = [call[:2] for call in client.calls if call[2] is None]
+        assert full == [('1h', True)] and len(client.calls) == 6
+        print("   OK (reintento: 5 solicitudes incrementales + la que falló)")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la memoización de indicadores (IndicatorCache): mismos
+valores que calculate_all_indicators, aciertos mientras la vela sigue en
+progreso, recálculo al cerrar una vela y descarte LRU por memoria.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+from src.indicators import TechnicalIndicators
+from src.indicator_cache import IndicatorCache
+from test_streaming_indicators import build_dataframe, max_difference
+
+
+def main():
+    print("=== TEST DE LA CACHÉ DE INDICADORES ===\n")
+
+    history = build_dataframe(51)
+    history_spot = build_dataframe(51, seed=11)
+    df, df_spot = history.iloc[:50].copy(), history_spot.iloc[:50].copy()
+    cache = IndicatorCache()
+
+    print("1. Paridad con calculate_all_indicators (FUTUROS + SPOT y solo FUTUROS)...")
+    worst = max(
+        max_difference(TechnicalIndicators.calculate_all_indicators(df, df_spot),
+                       cache.calculate_all_indicators("ETHUSDT", "5m", df, df_spot)),
+        max_difference(TechnicalIndicators.calculate_all_indicators(df),
+                       cache.calculate_all_indicators("ETHUSDT", "5m", df))
+    )
+    print(f"   Diferencia relativa máxima: {worst:.2e}")
+    assert worst < 1e-9
+
+    print("\n2. La vela en progreso cambia: solo se recalculan sus valores...")
+    df.loc[df.index[-1], ['close', 'high', 'volume']] += [5.0, 6.0, 40.0]
+    worst = max_difference(TechnicalIndicators.calculate_all_indicators(df, df_spot),
+                           cache.calculate_all_indicators("ETHUSDT", "5m", df, df_spot))
+    print(f"   {cache.stats()} | diferencia {worst:.2e}")
+    assert cache.hits == 1 and cache.misses == 2 and worst < 1e-9
+
+    print("\n3. Cierra una vela nueva: la clave cambia...")
+    df, df_spot = history.iloc[1:].copy(), history_spot.iloc[1:].copy()
+    cache.calculate_all_indicators("ETHUSDT", "5m", df, df_spot)
+    cache.calculate_all_indicators("BTCUSDT", "5m", df, df_spot)
+    print(f"   {cache.stats()}")
+    assert cache.hits == 1 and cache.misses == 4
+
+    print("\n4. Presupuesto de memoria (LRU)...")
+    per_entry = cache.bytes // len(cache._entries)
+    small = IndicatorCache(max_bytes=per_entry * 3)
+    for symbol in ("A", "B", "C", "D"):
+        small.calculate_all_indicators(symbol, "5m", df)
+    small.calculate_all_indicators("B", "5m", df)
+    small.calculate_all_indicators("E", "5m", df)
+    symbols = [key[1] for key in small._entries]
+    print(f"   {small.stats()} | en caché: {symbols}")
+    assert small.bytes <= small.max_bytes and "A" not in symbols and "B" in symbols
+
+    print("\n5. Velocidad (misma vela cerrada, vela en progreso actualizada)...")
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        TechnicalIndicators.calculate_all_indicators(df, df_spot)
+    full_ms = (time.perf_counter() - start) / runs * 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        cache.calculate_all_indicators("ETHUSDT", "5m", df, df_spot)
+    cached_ms = (time.perf_counter() - start) / runs * 1000
+    print(f"   calculate_all_indicators {full_ms:.2f} ms | caché {cached_ms:.2f} ms")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la grilla de períodos (calculate_indicator_grid): cada
+fila coincide con calculate_ema / calculate_rsi / ... del período
+correspondiente, y medir su velocidad frente a una llamada por período.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src import smoothers
+from src.indicators import TechnicalIndicators
+from test_streaming_indicators import build_dataframe
+
+
+EMA_PERIODS = list(range(5, 205))
+RSI_PERIODS = list(range(5, 31))
+ATR_PERIODS = list(range(5, 31))
+BB_CONFIGS = [(period, std) for period in (10, 20, 30) for std in (1.5, 2.0, 2.5)]
+MACD_CONFIGS = [(fast, slow, signal) for fast in (8, 12) for slow in (21, 26) for signal in (7, 9)]
+
+
+def per_period(df) -> dict:
+    """Cálculo de referencia: una llamada de TechnicalIndicators por período"""
+    bb = [TechnicalIndicators.calculate_bollinger_bands(df, p, s) for p, s in BB_CONFIGS]
+    macd = [TechnicalIndicators.calculate_macd(df, f, s, g) for f, s, g in MACD_CONFIGS]
+    return {
+        'ema': np.array([TechnicalIndicators.calculate_ema(df, p).to_numpy() for p in EMA_PERIODS]),
+        'rsi': np.array([TechnicalIndicators.calculate_rsi(df, p).to_numpy() for p in RSI_PERIODS]),
+        'atr': np.array([TechnicalIndicators.calculate_atr(df, p).to_numpy() for p in ATR_PERIODS]),
+        'bb_upper': np.array([b['upper'].to_numpy() for b in bb]),
+        'bb_middle': np.array([b['middle'].to_numpy() for b in bb]),
+        'bb_lower': np.array([b['lower'].to_numpy() for b in bb]),
+        'macd_line': np.array([m['macd'].to_numpy() for m in macd]),
+        'macd_signal': np.array([m['signal'].to_numpy() for m in macd]),
+        'macd_histogram': np.array([m['histogram'].to_numpy() for m in macd])
+    }
+
+
+def grid(df) -> dict:
+    return TechnicalIndicators.calculate_indicator_grid(
+        df, ema_periods=EMA_PERIODS, rsi_periods=RSI_PERIODS, atr_periods=ATR_PERIODS,
+        bb_configs=BB_CONFIGS, macd_configs=MACD_CONFIGS
+    )
+
+
+def max_relative_difference(expected: dict, actual: dict) -> float:
+    worst = 0.0
+    for name, reference in expected.items():
+        assert actual[name].shape == reference.shape, name
+        valid = ~np.isnan(reference)
+        assert np.array_equal(valid, ~np.isnan(actual[name])), name
+        diff = np.abs(actual[name][valid] - reference[valid]) / np.maximum(1.0, np.abs(reference[valid]))
+        worst = max(worst, float(diff.max()))
+    return worst
+
+
+def main():
+    print("=== TEST DE LA GRILLA DE PERÍODOS ===\n")
+
+    df = build_dataframe(100_000, seed=3)
+    configs = len(EMA_PERIODS) + len(RSI_PERIODS) + len(ATR_PERIODS) + len(BB_CONFIGS) + len(MACD_CONFIGS)
+    print(f"{configs} configuraciones x {len(df)} velas (backend {smoothers.BACKEND})\n")
+
+    start = time.perf_counter()
+    expected = per_period(df)
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    grid(df.iloc[:100])  # compilación JIT
+    start = time.perf_counter()
+    result = grid(df)
+    grid_ms = (time.perf_counter() - start) * 1000
+
+    worst = max_relative_difference(expected, result)
+    print(f"Diferencia relativa máxima: {worst:.2e}")
+    print(f"Una llamada por período: {loop_ms:.0f} ms | grilla: {grid_ms:.0f} ms ({loop_ms / grid_ms:.1f}x)")
+    assert worst < 1e-9
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
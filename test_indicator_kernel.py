@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Script para verificar que el kernel NumPy (calculate_all_indicators) da los
+mismos valores que los cálculos con pandas (calculate_ema, calculate_rsi, ...),
+y para medir su velocidad. Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src.binance_client import KLINE_DTYPE
+from src.indicators import TechnicalIndicators
+from src.indicator_kernel import compute_indicators
+from test_streaming_indicators import build_dataframe, max_difference
+
+
+def pandas_indicators(df, df_spot=None) -> dict:
+    """Cálculo de referencia con las funciones pandas de TechnicalIndicators"""
+    macd_source = df_spot if df_spot is not None else df
+    ema21 = TechnicalIndicators.calculate_ema(df, 21)
+    ema50 = TechnicalIndicators.calculate_ema(df, 50)
+    rsi = TechnicalIndicators.calculate_rsi(df, 14)
+    bb = TechnicalIndicators.calculate_bollinger_bands(df, 20, 2.0)
+    vwap = TechnicalIndicators.calculate_vwap(df)
+    atr = TechnicalIndicators.calculate_atr(df, 14)
+    macd = TechnicalIndicators.calculate_macd(macd_source, 12, 26, 9)
+    volume = TechnicalIndicators.analyze_volume(macd_source, 20, use_closed_candle=(df_spot is not None))
+
+    return {
+        'price': df['close'].iloc[-1],
+        'ema21': ema21.iloc[-1],
+        'ema50': ema50.iloc[-1],
+        'rsi': rsi.iloc[-1],
+        'bb_upper': bb['upper'].iloc[-1],
+        'bb_middle': bb['middle'].iloc[-1],
+        'bb_lower': bb['lower'].iloc[-1],
+        'macd_line': macd['macd'].iloc[-1],
+        'macd_signal': macd['signal'].iloc[-1],
+        'macd_histogram': macd['histogram'].iloc[-1],
+        'macd_histogram_prev': macd['histogram'].iloc[-2],
+        'macd_histogram_prev2': macd['histogram'].iloc[-3],
+        'vwap': vwap.iloc[-1],
+        'volume': volume,
+        'atr': atr.iloc[-1]
+    }
+
+
+def to_klines_array(df) -> np.ndarray:
+    """Convierte un DataFrame sintético al array estructurado que entrega BinanceClient"""
+    klines = np.zeros(len(df), dtype=KLINE_DTYPE)
+    for field in ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time'):
+        klines[field] = df[field].to_numpy()
+    return klines
+
+
+def series_difference(df) -> float:
+    """Mayor diferencia relativa entre las series completas del kernel y de pandas"""
+    series = compute_indicators(df['close'].to_numpy(), df['high'].to_numpy(),
+                                df['low'].to_numpy(), df['volume'].to_numpy())
+    bb = TechnicalIndicators.calculate_bollinger_bands(df, 20, 2.0)
+    macd = TechnicalIndicators.calculate_macd(df, 12, 26, 9)
+    expected = {
+        'ema21': TechnicalIndicators.calculate_ema(df, 21),
+        'ema50': TechnicalIndicators.calculate_ema(df, 50),
+        'rsi': TechnicalIndicators.calculate_rsi(df, 14),
+        'bb_upper': bb['upper'],
+        'bb_lower': bb['lower'],
+        'atr': TechnicalIndicators.calculate_atr(df, 14),
+        'macd_line': macd['macd'],
+        'macd_signal': macd['signal']
+    }
+
+    worst = 0.0
+    for name, reference in expected.items():
+        reference = reference.to_numpy()
+        valid = ~np.isnan(reference)
+        assert np.array_equal(valid, ~np.isnan(series[name])), name
+        diff = np.abs(series[name][valid] - reference[valid]) / np.maximum(1.0, np.abs(reference[valid]))
+        worst = max(worst, float(diff.max()))
+    return worst
+
+
+def main():
+    print("=== TEST DEL KERNEL DE INDICADORES ===\n")
+
+    df = build_dataframe(50)
+    df_spot = build_dataframe(50, seed=11)
+
+    print("1. Paridad con pandas (50 velas, FUTUROS + SPOT y solo FUTUROS)...")
+    worst = max(
+        max_difference(pandas_indicators(df, df_spot), TechnicalIndicators.calculate_all_indicators(df, df_spot)),
+        max_difference(pandas_indicators(df), TechnicalIndicators.calculate_all_indicators(df))
+    )
+    print(f"   Diferencia relativa máxima: {worst:.2e}")
+    assert worst < 1e-9
+
+    print("\n2. Paridad de las series completas (200.000 velas)...")
+    long_df = build_dataframe(200_000, seed=5)
+    worst_series = series_difference(long_df)
+    print(f"   Diferencia relativa máxima: {worst_series:.2e}")
+    assert worst_series < 1e-9
+
+    print("\n3. VWAP de sesión y anclado (historial completo) vs groupby de pandas...")
+    history = build_dataframe(5000, seed=9)
+    day = history['open_time'] // 86_400_000
+    pv = (history['high'] + history['low'] + history['close']) / 3 * history['volume']
+    expected_vwap = pv.groupby(day).cumsum() / history['volume'].groupby(day).cumsum()
+    vwap = TechnicalIndicators.calculate_vwap(history)
+    anchor = int(history['open_time'].iloc[1234])
+    anchored = TechnicalIndicators.calculate_anchored_vwap(history, anchor)
+    expected_anchored = pv.iloc[1234:].cumsum() / history['volume'].iloc[1234:].cumsum()
+    worst_vwap = max(float(((vwap - expected_vwap).abs() / expected_vwap).max()),
+                     float(((anchored.iloc[1234:] - expected_anchored).abs() / expected_anchored).max()))
+    print(f"   Sesiones: {day.nunique()} | diferencia relativa máxima: {worst_vwap:.2e}")
+    assert not vwap.isna().any() and anchored.iloc[:1234].isna().all()
+    assert worst_vwap < 1e-9
+
+    print("\n4. Panel de 300 símbolos (FUTUROS + SPOT y solo FUTUROS) vs cálculo por DataFrame...")
+    frames = {f"SYM{i}": (build_dataframe(50, seed=100 + i), build_dataframe(50, seed=900 + i) if i % 4 else None)
+              for i in range(300)}
+    # El escáner arma los paneles directamente con los arrays estructurados de la API
+    arrays = {key: tuple(to_klines_array(df) if df is not None else None for df in pair)
+              for key, pair in frames.items()}
+    start = time.perf_counter()
+    panel_results = TechnicalIndicators.calculate_indicators_for_frames(arrays)
+    panel_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    single_results = {key: TechnicalIndicators.calculate_all_indicators(df_f, df_s)
+                      for key, (df_f, df_s) in frames.items()}
+    single_ms = (time.perf_counter() - start) * 1000
+    worst_panel = max(max_difference(single_results[key], panel_results[key]) for key in frames)
+    print(f"   Diferencia relativa máxima: {worst_panel:.2e}")
+    print(f"   Panel {panel_ms:.0f} ms | por DataFrame {single_ms:.0f} ms ({single_ms / panel_ms:.1f}x)")
+    assert worst_panel < 1e-9
+
+    print("\n5. Velocidad...")
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        pandas_indicators(df, df_spot)
+    pandas_ms = (time.perf_counter() - start) / runs * 1000
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        TechnicalIndicators.calculate_all_indicators(df, df_spot)
+    kernel_ms = (time.perf_counter() - start) / runs * 1000
+    print(f"   50 velas: pandas {pandas_ms:.2f} ms | kernel {kernel_ms:.2f} ms ({pandas_ms / kernel_ms:.1f}x)")
+
+    arrays = [long_df[c].to_numpy() for c in ('close', 'high', 'low', 'volume', 'open_time')]
+    start = time.perf_counter()
+    compute_indicators(*arrays)
+    print(f"   200.000 velas (series completas): kernel {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la resolución intravela de SL/TP: casos construidos a
+mano, backtest de 4h con velas de 1m (solo en velas ambiguas) comparado con
+una simulación minuto a minuto, y búsqueda binaria sobre un historial
+memory-mapped de KlineStore.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from src.backtester import Backtester
+from src.binance_client import BinanceClient, KLINE_DTYPE
+from src.intrabar import IntrabarSimulator
+from src.kline_store import KlineStore
+from src.resampler import KlineResampler
+from test_resampler import base_klines
+
+
+def minutes(open_time: int, highs: list, lows: list) -> np.ndarray:
+    """Velas de 1m consecutivas desde open_time"""
+    klines = np.zeros(len(highs), dtype=KLINE_DTYPE)
+    klines['open_time'] = open_time + 60_000 * np.arange(len(highs))
+    klines['close_time'] = klines['open_time'] + 59_999
+    klines['high'] = highs
+    klines['low'] = lows
+    return klines
+
+
+def minute_outcome(klines: np.ndarray, entry_close_time: int, side: int,
+                   sl: float, tp1: float, tp2: float) -> tuple:
+    """Simulación minuto a minuto (lenta) desde el cierre de la vela de entrada"""
+    tp1_done = False
+    for i in range(np.searchsorted(klines['open_time'], entry_close_time + 1), len(klines)):
+        adverse = klines['low'][i] if side == 1 else klines['high'][i]
+        favorable = klines['high'][i] if side == 1 else klines['low'][i]
+        sl_touch = side * (adverse - sl) <= 0
+        if not tp1_done and side * (favorable - tp1) >= 0:
+            if sl_touch:
+                return 'SL', False, True, i
+            tp1_done = True
+        if tp1_done and side * (favorable - tp2) >= 0:
+            return ('SL', True, True, i) if sl_touch else ('TP2', True, False, i)
+        if sl_touch:
+            return 'SL', tp1_done, False, i
+    return 'FIN', tp1_done, False, len(klines) - 1
+
+
+def main():
+    print("=== TEST DE RESOLUCIÓN INTRAVELA ===\n")
+    hour = 1_700_000_000_000 // 3_600_000 * 3_600_000
+
+    print("1. Casos construidos (LONG, SL 98, TP1 103, TP2 104.5)...")
+    cases = [
+        # (máximos, mínimos, tp1_previo, esperado)
+        ([101, 103.5, 101, 100], [99.5, 100, 99, 97.5], False, ('SL', True, False)),
+        ([101, 100, 104, 100], [99.5, 97.5, 99, 99], False, ('SL', False, False)),
+        ([103.2, 104.6, 101, 100], [99, 101, 99, 97], False, ('TP2', True, False)),
+        ([100, 103.5, 100, 100], [99, 97.5, 99, 99], False, ('SL', False, True)),
+        ([104.6, 100, 100, 100], [99, 99, 97, 99], True, ('TP2', True, False)),
+        ([100, 100, 104.6, 100], [99, 97, 99, 99], True, ('SL', True, False)),
+    ]
+    for highs, lows, tp1_done, expected in cases:
+        simulator = IntrabarSimulator(minutes(hour, highs, lows))
+        result = simulator.resolve(hour, hour + 3_599_999, 1, 98.0, 103.0, 104.5, tp1_done)
+        assert (result['exit_reason'], result['tp1_hit'], result['ambiguous']) == expected, (highs, lows)
+    # SHORT (espejo del primer caso) y vela sin datos inferiores
+    short = IntrabarSimulator(minutes(hour, [100.5, 100, 101, 102.5], [99, 97, 98, 99]))
+    assert short.resolve(hour, hour + 3_599_999, -1, 102.0, 97.0, 95.5)['tp1_hit']
+    assert short.resolve(hour + 3_600_000, hour + 7_199_999, -1, 102.0, 97.0, 95.5) is None
+    print("   OK")
+
+    print("\n2. Backtest de 4h con velas de 1m vs simulación minuto a minuto...")
+    one_minute = base_klines(240 * 1440, seed=21)
+    # Transformación monótona (conserva el orden high/low) con más volatilidad y
+    # precios positivos, para que haya velas de 4h que toquen SL y TP a la vez
+    for field in ('open', 'high', 'low', 'close'):
+        one_minute[field] = 3800 * np.exp(2 * (one_minute[field] - 3800) / 3800)
+    four_hour = KlineResampler.resample(one_minute, '1m', '4h')
+    one_minute = one_minute[np.searchsorted(one_minute['open_time'], four_hour['open_time'][0]):]
+    df = BinanceClient.klines_to_dataframe(four_hour)
+    backtester = Backtester()
+
+    plain = backtester.run(df)['summary']
+    simulator = IntrabarSimulator(one_minute)
+    start = time.perf_counter()
+    result = backtester.run(df, intrabar=simulator)
+    elapsed = (time.perf_counter() - start) * 1000
+    trades, summary = result['trades'], result['summary']
+    assert summary['intrabar_trades'] == simulator.lookups
+    assert summary['ambiguous_trades'] < plain['ambiguous_trades'] or plain['ambiguous_trades'] == 0
+
+    checked = 0
+    for trade in trades.itertuples():
+        if trade.exit_reason == 'FIN':
+            continue
+        side = 1 if trade.direction == 'LONG' else -1
+        reason, tp1_hit, ambiguous, minute = minute_outcome(
+            one_minute, int(four_hour['close_time'][trade.entry_index]), side, trade.sl, trade.tp1, trade.tp2
+        )
+        assert (trade.exit_reason, trade.tp1_hit, trade.ambiguous) == (reason, tp1_hit, ambiguous)
+        assert four_hour['open_time'][trade.exit_index] <= one_minute['open_time'][minute] \
+            <= four_hour['close_time'][trade.exit_index]
+        checked += 1
+    print(f"   {checked} operaciones iguales a la simulación de 1m | {elapsed:.0f} ms")
+    print(f"   ambiguas: {plain['ambiguous_trades']} sin velas inferiores -> {summary['ambiguous_trades']} "
+          f"({summary['intrabar_trades']} resueltas con 1m) | PnL {plain['total_pnl_pct']:.2f}% -> "
+          f"{summary['total_pnl_pct']:.2f}%")
+
+    print("\n3. Búsqueda binaria sobre 3 años de 1m (KlineStore memory-mapped)...")
+    with tempfile.TemporaryDirectory() as base_dir:
+        store = KlineStore(base_dir)
+        history = base_klines(3 * 365 * 1440, seed=3)
+        store.upsert('futures', 'ETHUSDT', '1m', history)
+        simulator = IntrabarSimulator.from_store(store, 'futures', 'ETHUSDT', '1m')
+        rng = np.random.default_rng(0)
+        bars = rng.integers(0, len(history) // 60 - 1, 10_000) * 60
+        start = time.perf_counter()
+        for bar in bars:
+            window = simulator.bar_range(int(history['open_time'][bar]), int(history['open_time'][bar]) + 3_599_999)
+            assert window.stop - window.start == 60
+        elapsed = (time.perf_counter() - start) / len(bars) * 1e6
+        print(f"   {len(history)} velas de 1m | {elapsed:.1f} µs por búsqueda")
+        del simulator
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
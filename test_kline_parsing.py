@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script para verificar BinanceClient.parse_klines_array frente al camino de
+diccionarios (json.loads + parse_klines): mismos valores en respuestas
+válidas, y ValueError en lista vacía / JSON de error / filas truncadas igual
+que get_klines.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import json
+import time
+
+import numpy as np
+
+from src.binance_client import BinanceClient, KLINE_DTYPE
+
+
+def build_response(count: int, seed: int = 0) -> str:
+    """Texto JSON con el formato de /klines (precios con decimales variables, como Binance)"""
+    rng = np.random.default_rng(seed)
+    rows = []
+    open_time = 1762000000000
+    for i in range(count):
+        price = 3800 * np.exp(rng.normal(0, 0.002, 4).cumsum())
+        rows.append([
+            open_time + i * 300_000, f"{price[0]:.8f}", f"{price.max():.2f}", f"{price.min():.4f}",
+            f"{price[3]:.2f}", f"{rng.uniform(0, 1e5):.3f}", open_time + i * 300_000 + 299_999,
+            f"{rng.uniform(0, 1e8):.8f}", int(rng.integers(0, 50_000)), f"{rng.uniform(0, 5e4):.3f}",
+            f"{rng.uniform(0, 5e7):.5f}", "0"
+        ])
+    return json.dumps(rows, separators=(',', ':'))
+
+
+def dict_path(text: str) -> list:
+    """Camino de get_klines: json.loads + validación + parse_klines"""
+    data = json.loads(text)
+    if not isinstance(data, list) or len(data) == 0:
+        raise ValueError("Respuesta de API inválida o vacía")
+    return BinanceClient.parse_klines(data)
+
+
+def raises(function, text: str, error=ValueError) -> bool:
+    try:
+        function(text)
+    except error:
+        return True
+    return False
+
+
+def main():
+    print("=== TEST DE PARSEO DE VELAS A ARRAYS ===\n")
+
+    print("1. Respuestas válidas: mismos valores que parse_klines...")
+    for count in (1, 2, 500, 1500):
+        text = build_response(count, seed=count)
+        klines = BinanceClient.parse_klines_array(text)
+        expected = dict_path(text)
+        assert klines.dtype == KLINE_DTYPE and len(klines) == count
+        for name in KLINE_DTYPE.names:
+            assert np.array_equal(klines[name], np.array([k[name] for k in expected], dtype=KLINE_DTYPE[name])), name
+    # Espacios y saltos de línea alrededor del cuerpo (json.dumps por defecto)
+    spaced = json.dumps(json.loads(build_response(3)), indent=1)
+    assert np.array_equal(BinanceClient.parse_klines_array(spaced), BinanceClient.parse_klines_array(build_response(3)))
+    print("   OK")
+
+    print("\n2. Lista vacía, JSON de error y filas truncadas...")
+    assert len(BinanceClient.parse_klines_array("[]")) == 0
+    assert len(BinanceClient.parse_klines_array(" [ ] ")) == 0
+    assert raises(dict_path, "[]")
+
+    full = build_response(3)
+    rows = json.loads(full)
+    invalid = {
+        'JSON de error': '{"code":-1121,"msg":"Invalid symbol."}',
+        'texto vacío': '',
+        'fila truncada': json.dumps([rows[0], rows[1][:8], rows[2]]),
+        'respuesta cortada': full[:len(full) // 2],
+        'respuesta cortada en una fila': full[:-2],
+        'valor no numérico': full.replace(f'"{rows[1][1]}"', '"abc"', 1)
+    }
+    for label, text in invalid.items():
+        assert raises(BinanceClient.parse_klines_array, text), label
+        # El camino de diccionarios también falla (IndexError en filas truncadas)
+        assert raises(dict_path, text, Exception), label
+        print(f"   ValueError: {label}")
+    print("   OK")
+
+    print("\n3. Velocidad (1500 velas)...")
+    text = build_response(1500)
+    start = time.perf_counter()
+    for _ in range(50):
+        BinanceClient.parse_klines_array(text)
+    array_ms = (time.perf_counter() - start) / 50 * 1000
+    start = time.perf_counter()
+    for _ in range(50):
+        dict_path(text)
+    dict_ms = (time.perf_counter() - start) / 50 * 1000
+    print(f"   parse_klines_array {array_ms:.2f} ms vs json.loads + parse_klines {dict_ms:.2f} ms")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Script para probar KlineStream + StreamAnalysisFeed contra el servidor local
+de replay (sin conexión a internet). Incluye una caída de conexión para
+verificar la reconexión y mide mensajes por segundo; mensajes inválidos,
+errores del callback, handshakes rechazados y relleno REST tras reconectar.
+"""
+
+import asyncio
+import time
+from http import HTTPStatus
+
+import numpy as np
+from websockets.asyncio.server import serve
+
+from src.kline_stream import KlineStream, KlineReplayServer, StreamAnalysisFeed
+
+
+def build_recording(candles: int, updates_per_candle: int, interval_ms: int = 300_000) -> list:
+    """Genera una grabación sintética de FUTUROS y SPOT para ETHUSDT 5m"""
+    rng = np.random.default_rng(3)
+    records = []
+    start = 1762000000000
+    price = 3800.0
+    t = start
+
+    for c in range(candles):
+        open_time = start + c * interval_ms
+        open_price = price
+        high = low = price
+        volume = 0.0
+        for u in range(updates_per_candle):
+            price += rng.normal(0, 2)
+            high, low = max(high, price), min(low, price)
+            volume += rng.uniform(1, 10)
+            closed = u == updates_per_candle - 1
+            t += interval_ms // updates_per_candle
+            for market, offset in (('futures', 0.0), ('spot', -0.5)):
+                records.append({'t': t, 'market': market, 'message': {
+                    'stream': 'ethusdt@kline_5m',
+                    'data': {'e': 'kline', 'E': t, 's': 'ETHUSDT', 'k': {
+                        't': open_time, 'T': open_time + interval_ms - 1, 's': 'ETHUSDT', 'i': '5m',
+                        'o': f"{open_price + offset:.2f}", 'c': f"{price + offset:.2f}",
+                        'h': f"{high + offset:.2f}", 'l': f"{low + offset:.2f}",
+                        'v': f"{volume:.3f}", 'n': u + 1, 'x': closed,
+                        'q': f"{volume * price:.2f}", 'V': f"{volume / 2:.3f}", 'Q': f"{volume * price / 2:.2f}"
+                    }}
+                }})
+    return records
+
+
+async def run():
+    print("=== TEST DE STREAM DE VELAS (replay local) ===\n")
+
+    candles, updates = 120, 10
+    records = build_recording(candles, updates)
+
+    futures_server = KlineReplayServer(records, market='futures', speed=0, drop_after=200)
+    spot_server = KlineReplayServer(records, market='spot', speed=0)
+    await futures_server.start()
+    await spot_server.start()
+
+    results = {'updates': 0, 'closed': 0, 'last': None}
+    expected_messages = len(records)
+
+    def on_update(symbol, interval, indicators, closed):
+        results['updates'] += 1
+        results['closed'] += int(closed)
+        results['last'] = indicators
+
+    feed = StreamAnalysisFeed(on_update)
+    stream = KlineStream([('futures', 'ETHUSDT', '5m'), ('spot', 'ETHUSDT', '5m')], feed.handle_kline,
+                         futures_url=futures_server.url, spot_url=spot_server.url, reconnect_delay=0.05)
+
+    async def stop_when_done():
+        while stream.messages_received < expected_messages:
+            await asyncio.sleep(0.01)
+        await stream.stop()
+
+    start = time.perf_counter()
+    await asyncio.gather(stream.run(), stop_when_done())
+    elapsed = time.perf_counter() - start
+
+    await futures_server.stop()
+    await spot_server.stop()
+
+    engine = feed.engines[('ETHUSDT', '5m')]
+    print(f"1. Mensajes recibidos: {stream.messages_received}/{expected_messages}")
+    print(f"2. Reconexiones: {stream.reconnections}")
+    print(f"3. Velas confirmadas en el motor: {engine.count}")
+    print(f"4. Actualizaciones emitidas: {results['updates']}")
+    print(f"5. Rendimiento: {stream.messages_received / elapsed:,.0f} mensajes/s")
+    print(f"   Último RSI: {results['last']['rsi']:.2f}, EMA21: {results['last']['ema21']:.2f}")
+
+    assert stream.messages_received == expected_messages
+    assert stream.reconnections >= 1
+    assert engine.count == candles
+
+
+
+def closed_candles(records: list, market: str) -> list:
+    """Velas cerradas de una grabación en formato de get_klines (como las daría REST)"""
+    candles = []
+    for record in records:
+        if record['market'] == market and record['message']['data']['k']['x']:
+            candles.append(KlineStream.parse_kline_event(record['message'])[2])
+    return candles
+
+
+async def run_faults():
+    print("\n6. Mensajes inválidos y errores del callback (no cortan la conexión)...")
+    records = build_recording(20, 4)
+    broken = {'t': records[10]['t'], 'market': 'futures',
+              'message': {'stream': 'ethusdt@kline_5m', 'data': {'e': 'kline', 'k': {'t': 1}}}}
+    records.insert(10, broken)
+    server = KlineReplayServer(records, market='futures', speed=0, drop_after=30)
+    await server.start()
+    received = []
+    reconnected = []
+
+    def on_kline(market, symbol, interval, candle, closed):
+        received.append(candle['open_time'])
+        if len(received) == 5:
+            raise RuntimeError("fallo del callback")
+
+    stream = KlineStream([('futures', 'ETHUSDT', '5m')], on_kline, futures_url=server.url,
+                         reconnect_delay=0.01, on_reconnect=reconnected.append)
+
+    async def stop_when_done():
+        while stream.messages_received < server.messages_sent or server._cursor < len(server.records):
+            await asyncio.sleep(0.01)
+        await stream.stop()
+
+    await asyncio.gather(stream.run(), stop_when_done())
+    await server.stop()
+    assert stream.message_errors == 2
+    assert len(received) == 80
+    assert reconnected == ['futures']
+    print(f"   OK ({stream.message_errors} errores registrados, último: {stream.last_error[:40]}...)")
+
+    print("\n7. Handshake rechazado (InvalidStatus): se reintenta sin detener run()...")
+
+    def reject(connection, request):
+        return connection.respond(HTTPStatus.FORBIDDEN, "rechazado\n")
+
+    rejecting = await serve(lambda websocket: None, '127.0.0.1', 0, process_request=reject)
+    port = rejecting.sockets[0].getsockname()[1]
+    stream = KlineStream([('futures', 'ETHUSDT', '5m')], lambda *args: None,
+                         futures_url=f"ws://127.0.0.1:{port}", reconnect_delay=0.01, max_reconnect_delay=0.02)
+
+    async def stop_after_retries():
+        while stream.reconnections < 3:
+            await asyncio.sleep(0.01)
+        await stream.stop()
+
+    await asyncio.wait_for(asyncio.gather(stream.run(), stop_after_retries()), timeout=5)
+    rejecting.close()
+    await rejecting.wait_closed()
+    assert 'InvalidStatus' in stream.last_error
+    print(f"   OK ({stream.reconnections} reintentos)")
+
+    print("\n8. on_reconnect bloqueante (REST) no detiene la lectura del otro mercado...")
+    records = build_recording(40, 5)
+    futures_server = KlineReplayServer(records, market='futures', speed=0, drop_after=20)
+    # SPOT a ~5 ms por mensaje: sigue llegando mientras el hook de FUTUROS bloquea
+    spot_server = KlineReplayServer(records, market='spot', speed=12_000)
+    await futures_server.start()
+    await spot_server.start()
+    counts = {'spot': 0, 'during_hook': None}
+
+    def on_kline(market, symbol, interval, candle, closed):
+        counts[market] = counts.get(market, 0) + 1
+
+    def blocking_backfill(market):
+        before = counts['spot']
+        time.sleep(0.3)
+        counts['during_hook'] = counts['spot'] - before
+
+    stream = KlineStream([('futures', 'ETHUSDT', '5m'), ('spot', 'ETHUSDT', '5m')], on_kline,
+                         futures_url=futures_server.url, spot_url=spot_server.url,
+                         reconnect_delay=0.01, on_reconnect=blocking_backfill)
+
+    async def stop_when_done():
+        while stream.messages_received < len(records):
+            await asyncio.sleep(0.01)
+        await stream.stop()
+
+    await asyncio.wait_for(asyncio.gather(stream.run(), stop_when_done()), timeout=10)
+    await futures_server.stop()
+    await spot_server.stop()
+    assert counts['during_hook'] > 10, counts
+    print(f"   OK ({counts['during_hook']} mensajes SPOT leídos durante el hook de 0.3 s)")
+
+
+def check_backfill():
+    print("\n9. Velas perdidas durante una caída: relleno REST con StreamAnalysisFeed.backfill...")
+    records = build_recording(40, 3)
+    futures = closed_candles(records, 'futures')
+    spot = closed_candles(records, 'spot')
+
+    reference = StreamAnalysisFeed(lambda *args: None)
+    for f, s in zip(futures, spot):
+        reference.handle_kline('spot', 'ETHUSDT', '5m', s, True)
+        reference.handle_kline('futures', 'ETHUSDT', '5m', f, True)
+
+    feed = StreamAnalysisFeed(lambda *args: None)
+    for i, (f, s) in enumerate(zip(futures, spot)):
+        feed.handle_kline('spot', 'ETHUSDT', '5m', s, True)
+        # FUTUROS caído entre las velas 20 y 24
+        if not 20 <= i < 25:
+            feed.handle_kline('futures', 'ETHUSDT', '5m', f, True)
+        if i == 24:
+            # Reconexión: REST devuelve historial ya confirmado + velas perdidas + vela en progreso
+            feed.backfill('futures', 'ETHUSDT', '5m', futures[10:26])
+    engine, expected = feed.engines[('ETHUSDT', '5m')], reference.engines[('ETHUSDT', '5m')]
+    assert engine.count == expected.count == len(futures)
+    for attr in ('ema21', 'ema50', 'avg_gain', 'atr', 'macd_signal'):
+        assert getattr(engine, attr) == getattr(expected, attr), attr
+    print(f"   OK ({engine.count} velas, mismo estado que sin caída)")
+
+    print("\n10. Vela SPOT cerrada perdida: no bloquea las siguientes velas...")
+    feed = StreamAnalysisFeed(lambda *args: None)
+    for i, (f, s) in enumerate(zip(futures, spot)):
+        feed.handle_kline('futures', 'ETHUSDT', '5m', f, True)
+        if i != 15:
+            feed.handle_kline('spot', 'ETHUSDT', '5m', s, True)
+    engine = feed.engines[('ETHUSDT', '5m')]
+    assert engine.count == len(futures) and feed.unpaired == 1
+    assert not feed._closed[('futures', 'ETHUSDT', '5m')] and not feed._closed[('spot', 'ETHUSDT', '5m')]
+    print(f"   OK ({engine.count} velas confirmadas, {feed.unpaired} solo con FUTUROS)")
+    print("\n✅ OK")
+
+
+def main():
+    asyncio.run(run())
+    asyncio.run(run_faults())
+    check_backfill()
+
+
+if __name__ == "__main__":
+    main()
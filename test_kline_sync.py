@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la sincronización incremental del almacén de velas
+(TradingAnalysis.sync_klines + KlineStore.upsert) con un cliente simulado:
+primera descarga, solapamiento con la vela en progreso, límite
+de 1000 velas por solicitud en SPOT, hueco demasiado grande y paginación
+de historiales mayores que una solicitud; escritura en el mismo archivo
+al añadir velas al final.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from analisis_tecnico import TradingAnalysis
+from src.binance_client import BinanceClient
+from src.kline_store import KlineStore
+from test_indicator_kernel import to_klines_array
+from test_streaming_indicators import build_dataframe
+
+
+INTERVAL_MS = 5 * 60_000
+
+
+class StubClient:
+    """Cliente simulado: sirve /klines desde series fijas hasta la hora `now_ms`"""
+
+    candle_bounds = BinanceClient.candle_bounds
+
+    def __init__(self, series: dict, now_ms: int):
+        self.series = series
+        self.now_ms = now_ms
+        self.calls = []
+
+    def server_now_ms(self) -> int:
+        return self.now_ms
+
+    def get_klines_array(self, symbol, interval, limit=200, start_time=None, use_spot=False):
+        self.calls.append((use_spot, limit, start_time))
+        max_page = BinanceClient.MAX_KLINES_SPOT if use_spot else BinanceClient.MAX_KLINES
+        if limit > max_page:
+            raise ValueError(f"limit {limit} > {max_page} (Binance rechaza la solicitud)")
+        series = self.series[use_spot]
+        visible = series[series['open_time'] <= self.now_ms]
+        if start_time is None:
+            return np.array(visible[-limit:])
+        start = np.searchsorted(visible['open_time'], start_time)
+        return np.array(visible[start:start + limit])
+
+    def advance(self, candles: int):
+        self.now_ms += candles * INTERVAL_MS
+        self.calls.clear()
+
+
+def assert_current(klines: np.ndarray, client: StubClient, use_spot: bool, limit: int):
+    """Las velas devueltas son las últimas `limit` del servidor, contiguas y actuales"""
+    series = client.series[use_spot]
+    expected = series[series['open_time'] <= client.now_ms][-limit:]
+    assert len(klines) == limit
+    assert np.array_equal(klines['open_time'], expected['open_time'])
+    assert np.array_equal(klines['close'], expected['close'])
+
+
+def main():
+    print("=== TEST DE SINCRONIZACIÓN INCREMENTAL DE VELAS ===\n")
+    total = 20_000
+    series = {use_spot: to_klines_array(build_dataframe(total, seed=seed))
+              for use_spot, seed in ((False, 1), (True, 2))}
+    start_now = int(series[False]['open_time'][total - 8000]) + 60_000
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        analysis = TradingAnalysis()
+        analysis.store = KlineStore(base_dir)
+        client = StubClient(series, start_now)
+        analysis.client = client
+
+        print("1. Primera sincronización (descarga completa)...")
+        for use_spot in (False, True):
+            klines = analysis.sync_klines('5m', 50, use_spot)
+            assert_current(klines, client, use_spot, 50)
+        assert [limit for _, limit, _ in client.calls] == [50, 50]
+        print("   OK")
+
+        print("\n2. Solapamiento: la vela en progreso se actualiza y se añaden las nuevas...")
+        # La vela guardada en progreso cambia en el servidor antes de cerrar
+        last_open = int(analysis.store.load('futures', 'ETHUSDT', '5m')['open_time'][-1])
+        index = int(np.searchsorted(series[False]['open_time'], last_open))
+        series[False]['close'][index] += 1.0
+        client.advance(3)
+        klines = analysis.sync_klines('5m', 50, False)
+        assert_current(klines, client, False, 50)
+        assert client.calls == [(False, 5, last_open)]
+        stored = analysis.store.load('futures', 'ETHUSDT', '5m')
+        assert np.all(np.diff(stored['open_time']) == INTERVAL_MS)
+        print(f"   OK (una solicitud de {client.calls[0][1]} velas desde la última guardada)")
+
+        print("\n3. FUTUROS 1498 velas atrasado (una solicitud de 1500)...")
+        client.advance(1498)
+        klines = analysis.sync_klines('5m', 50, False)
+        assert_current(klines, client, False, 50)
+        assert [limit for _, limit, _ in client.calls] == [1500]
+        stored = analysis.store.load('futures', 'ETHUSDT', '5m')
+        assert len(stored) == 50 + 3 + 1498 and np.all(np.diff(stored['open_time']) == INTERVAL_MS)
+        print(f"   OK ({len(stored)} velas contiguas guardadas)")
+
+        print("\n4. SPOT: límite de 1000 velas por solicitud...")
+        analysis.sync_klines('5m', 50, True)
+        client.advance(900)
+        klines = analysis.sync_klines('5m', 50, True)
+        assert_current(klines, client, True, 50)
+        assert max(limit for _, limit, _ in client.calls) <= BinanceClient.MAX_KLINES_SPOT
+        client.advance(1200)
+        klines = analysis.sync_klines('5m', 50, True)
+        # 1200 velas atrasado (entre 1000 y 1500): nunca una solicitud > 1000
+        # ni una cola que quede en el pasado
+        assert_current(klines, client, True, 50)
+        assert max(limit for _, limit, _ in client.calls) <= BinanceClient.MAX_KLINES_SPOT
+        print("   OK")
+
+        print("\n5. Hueco demasiado grande: se reemplaza el historial...")
+        client.advance(2500)
+        klines = analysis.sync_klines('5m', 50, False)
+        assert_current(klines, client, False, 50)
+        stored = analysis.store.load('futures', 'ETHUSDT', '5m')
+        assert len(stored) == 50 and np.all(np.diff(stored['open_time']) == INTERVAL_MS)
+        del stored
+        print("   OK")
+
+        print("\n6. Historial mayor que una solicitud (paginación desde startTime)...")
+        klines = analysis.sync_klines('5m', 3200, True)
+        assert_current(klines, client, True, 3200)
+        assert all(limit <= BinanceClient.MAX_KLINES_SPOT for _, limit, _ in client.calls)
+        print("   OK")
+
+    print("\n7. KlineStore.upsert: añadir al final sin reescribir el historial...")
+    with tempfile.TemporaryDirectory() as base_dir:
+        store = KlineStore(base_dir)
+        history = to_klines_array(build_dataframe(3 * 365 * 288, seed=5))
+        store.upsert('futures', 'ETHUSDT', '5m', history[:-10])
+        path = store.path_for('futures', 'ETHUSDT', '5m')
+        inode = os.stat(path).st_ino
+
+        # Solapamiento con la vela en progreso + velas nuevas (cola del archivo)
+        update = history[-12:-5].copy()
+        update['close'][0] += 1.0
+        start = time.perf_counter()
+        total = store.upsert('futures', 'ETHUSDT', '5m', update)
+        append_ms = (time.perf_counter() - start) * 1000
+        expected = np.concatenate([history[:-12], update])
+        assert total == len(expected) and os.stat(path).st_ino == inode
+        assert np.array_equal(np.load(path), expected)
+        assert np.array_equal(store.tail('futures', 'ETHUSDT', '5m', 7), update)
+
+        # La vela en progreso sin velas nuevas (misma longitud)
+        update = history[-6:-5].copy()
+        update['high'] += 2.0
+        store.upsert('futures', 'ETHUSDT', '5m', update)
+        expected[-1] = update[0]
+        assert np.array_equal(np.load(path, mmap_mode='r'), expected)
+        assert os.stat(path).st_ino == inode
+
+        # Solapamiento que no llega al final: se reescribe el archivo (las
+        # velas guardadas posteriores a las nuevas se descartan, como antes)
+        start = time.perf_counter()
+        np.save(os.path.join(base_dir, 'completo.npy'), expected)
+        rewrite_ms = (time.perf_counter() - start) * 1000
+        middle = history[1000:1003].copy()
+        store.upsert('futures', 'ETHUSDT', '5m', middle)
+        assert np.array_equal(np.load(path), np.concatenate([history[:1000], middle]))
+        print(f"   {len(history)} velas: añadir al final {append_ms:.2f} ms vs reescritura completa {rewrite_ms:.1f} ms")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Script para verificar el optimizador walk-forward: guarda velas sintéticas en
+un KlineStore temporal, reparte los trabajos (símbolo, fold, parámetros) en un
+pool de procesos y compara un resultado con el backtest directo del mismo tramo,
+con y sin velas SPOT (MACD y Volumen).
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from src.backtester import Backtester
+from src.binance_client import BinanceClient
+from src.kline_store import KlineStore
+from src.optimizer import WalkForwardOptimizer
+from test_indicator_kernel import to_klines_array
+from test_streaming_indicators import build_dataframe
+
+
+def main():
+    print("=== TEST DEL OPTIMIZADOR WALK-FORWARD ===\n")
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        store = KlineStore(base_dir)
+        symbols = ["AAAUSDT", "BBBUSDT"]
+        for seed, symbol in enumerate(symbols):
+            store.upsert('futures', symbol, '5m', to_klines_array(build_dataframe(60 * 288, seed=seed)))
+        # SPOT solo para BBBUSDT, empezando más tarde y con un hueco de velas
+        futures_b = store.load('futures', 'BBBUSDT', '5m')
+        spot_b = to_klines_array(build_dataframe(60 * 288, seed=7))
+        spot_b['open_time'] = futures_b['open_time']
+        spot_b['close_time'] = futures_b['close_time']
+        spot_b = np.concatenate([spot_b[288:30 * 288], spot_b[30 * 288 + 50:]])
+        store.upsert('spot', 'BBBUSDT', '5m', spot_b)
+
+        optimizer = WalkForwardOptimizer(store, train_bars=20 * 288, test_bars=10 * 288, max_workers=2)
+        param_sets = optimizer.grid(min_conditions=[4, 5, 6], atr_multiplier=[1.5, 2.0], tp2_ratio=[2.25, 3.0])
+        folds = len(optimizer.folds(60 * 288))
+        print(f"1. {len(symbols)} símbolos x {folds} folds x {len(param_sets)} parámetros...")
+
+        start = time.perf_counter()
+        result = optimizer.run(symbols, param_sets)
+        elapsed = time.perf_counter() - start
+        results = result['results']
+        print(f"   {len(results)} trabajos en {elapsed:.1f} s")
+        assert len(results) == len(symbols) * folds * len(param_sets)
+
+        print("\n2. Un trabajo vs backtest directo del mismo tramo...")
+        row = results.iloc[7]
+        params = {name: row[name].item() for name in param_sets[0]}
+        load_start, trade_start, stop = optimizer.folds(60 * 288)[row['fold']]['test']
+        df = BinanceClient.klines_to_dataframe(store.load('futures', row['symbol'], '5m')[load_start:stop])
+        summary = Backtester(**params).run(df, start=trade_start - load_start)['summary']
+        print(f"   {row['symbol']} fold {row['fold']} {params}: PnL {summary['total_pnl_pct']:.2f}%")
+        assert summary['trades'] == row['test_trades']
+        assert abs(summary['total_pnl_pct'] - row['test_total_pnl_pct']) < 1e-9
+
+        print("\n3. BBBUSDT con SPOT (relleno con FUTUROS donde falta) vs backtest directo...")
+        row = results[(results['symbol'] == 'BBBUSDT') & (results['fold'] == 1)].iloc[-1]
+        params = {name: row[name].item() for name in param_sets[0]}
+        load_start, trade_start, stop = optimizer.folds(60 * 288)[row['fold']]['test']
+        futures = np.array(store.load('futures', 'BBBUSDT', '5m')[load_start:stop])
+        spot = futures.copy()
+        for i, open_time in enumerate(futures['open_time']):
+            match = np.flatnonzero(spot_b['open_time'] == open_time)
+            if len(match):
+                spot[i] = spot_b[match[0]]
+        df = BinanceClient.klines_to_dataframe(futures)
+        backtester = Backtester(**params)
+        summary = backtester.run(df, BinanceClient.klines_to_dataframe(spot),
+                                 start=trade_start - load_start)['summary']
+        futures_only = backtester.run(df, start=trade_start - load_start)['summary']
+        print(f"   fold {row['fold']}: PnL {summary['total_pnl_pct']:.2f}% "
+              f"(solo FUTUROS {futures_only['total_pnl_pct']:.2f}%)")
+        assert summary['trades'] == row['test_trades']
+        assert abs(summary['total_pnl_pct'] - row['test_total_pnl_pct']) < 1e-9
+
+        futures_optimizer = WalkForwardOptimizer(store, train_bars=20 * 288, test_bars=10 * 288,
+                                                 max_workers=2, use_spot=False)
+        futures_row = futures_optimizer.run(['BBBUSDT'], [params])['results'].iloc[1]
+        assert futures_row['test_trades'] == futures_only['trades']
+        assert abs(futures_row['test_total_pnl_pct'] - futures_only['total_pnl_pct']) < 1e-9
+        print("   OK (use_spot=False = solo FUTUROS)")
+
+        print("\n4. Parámetros elegidos por fold (mejor entrenamiento)...")
+        selected = result['selected']
+        assert len(selected) == len(symbols) * folds
+        print(selected[['symbol', 'fold', *param_sets[0], 'train_total_pnl_pct', 'test_total_pnl_pct']]
+              .to_string(index=False))
+
+        print("\n5. Ranking (PnL fuera de muestra)...")
+        print(result['ranking'].head(5).to_string(index=False))
+
+        print("\n6. Parámetros con None (max_bars=None = sin límite) en el ranking...")
+        none_sets = optimizer.grid(min_conditions=[5], max_bars=[None, 100])
+        ranking = optimizer.run(['AAAUSDT'], none_sets)['ranking']
+        assert len(ranking) == 2 and ranking['max_bars'].isna().sum() == 1
+        assert (ranking['folds'] == folds).all()
+        print(ranking[['symbol', 'min_conditions', 'max_bars', 'folds', 'test_pnl_pct']].to_string(index=False))
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
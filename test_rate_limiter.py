@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Script para probar el planificador de peso (WeightScheduler) contra un servidor
+local que aplica un límite por ventana fija como Binance y devuelve
+X-MBX-USED-WEIGHT-1M. Usa ventanas de 1 segundo para que la prueba sea rápida.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from src.async_binance_client import AsyncBinanceClient
+from src.rate_limiter import WeightScheduler
+from test_async_client import build_klines
+
+
+def create_limited_app(limit: int, window: float, stats: dict) -> web.Application:
+    """Servidor que responde 429 si el peso de la ventana actual supera `limit`"""
+
+    async def klines(request):
+        window_id = int(time.monotonic() // window)
+        if window_id != stats['window']:
+            stats['window'], stats['used'] = window_id, 0
+        stats['used'] += 1  # limit < 100 -> peso 1
+        stats['max_used'] = max(stats['max_used'], stats['used'])
+        headers = {'X-MBX-USED-WEIGHT-1M': str(stats['used'])}
+        if stats['used'] > limit:
+            stats['rejected'] += 1
+            return web.json_response({'code': -1003}, status=429, headers={**headers, 'Retry-After': '1'})
+        stats['served'] += 1
+        return web.json_response(build_klines(int(request.query['limit'])), headers=headers)
+
+    app = web.Application()
+    app.router.add_get('/fapi/v1/klines', klines)
+    return app
+
+
+def measure_threads(limit: int, window: float, requests: int, threads: int) -> int:
+    """Peso máximo enviado en una ventana fija por varios hilos que comparten el planificador"""
+    scheduler = WeightScheduler(limit, window_seconds=window)
+    sent_at = []
+
+    def worker(_):
+        scheduler.acquire(1)
+        sent_at.append(time.monotonic())
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(requests)))
+
+    windows = {}
+    for t in sent_at:
+        windows[int(t // window)] = windows.get(int(t // window), 0) + 1
+    return max(windows.values())
+
+
+async def run():
+    print("=== TEST DE PLANIFICADOR DE PESO ===\n")
+
+    limit, window = 60, 1.0
+
+    print("1. Hilos compartiendo un planificador (sin HTTP)...")
+    max_window = measure_threads(limit, window, requests=200, threads=16)
+    print(f"   Peso máximo en una ventana: {max_window} (límite {limit})")
+    assert max_window <= limit
+
+    print("\n2. Cliente asíncrono contra servidor con límite...")
+    stats = {'window': None, 'used': 0, 'max_used': 0, 'served': 0, 'rejected': 0}
+    runner = web.AppRunner(create_limited_app(limit, window, stats))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    try:
+        async with AsyncBinanceClient(base_url=base_url, spot_url=base_url, pool_size=50) as client:
+            client.schedulers[client.base_url] = WeightScheduler(limit, window_seconds=window)
+
+            total = 200
+            start = time.perf_counter()
+            await asyncio.gather(*(client.get_klines(f"SYM{i}USDT", '5m', 50) for i in range(total)))
+            elapsed = time.perf_counter() - start
+
+        ideal = (total - limit * 0.1) / (limit * 0.9 / window)
+        print(f"   Atendidas: {stats['served']} | rechazadas (429): {stats['rejected']}")
+        print(f"   Peso máximo por ventana en el servidor: {stats['max_used']}")
+        print(f"   Duración: {elapsed:.2f}s (mínimo teórico ~{ideal:.2f}s)")
+        assert stats['rejected'] == 0
+    finally:
+        await runner.cleanup()
+
+    print("\n✅ OK")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la construcción local de timeframes superiores: velas
+agregadas vs pandas (límites desde la época Unix) y vs candle_bounds (1w),
+actualización incremental vela a vela igual a la agregación completa y
+fetch_timeframes con una sola sincronización del intervalo base por mercado.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from analisis_tecnico import TradingAnalysis
+from src.binance_client import BinanceClient, KLINE_DTYPE
+from src.resampler import KlineResampler, ResamplingFeed
+from test_indicator_kernel import to_klines_array
+from test_streaming_indicators import build_dataframe
+
+
+def base_klines(count: int, seed: int) -> np.ndarray:
+    """Velas de 1m sintéticas con trades y volúmenes taker"""
+    klines = to_klines_array(build_dataframe(count, interval_ms=60_000, seed=seed))
+    rng = np.random.default_rng(seed)
+    klines['trades'] = rng.integers(10, 500, count)
+    klines['quote_volume'] = klines['volume'] * klines['close']
+    klines['taker_buy_base'] = klines['volume'] * rng.uniform(0.2, 0.8, count)
+    klines['taker_buy_quote'] = klines['taker_buy_base'] * klines['close']
+    return klines
+
+
+def pandas_reference(klines: np.ndarray, rule: str) -> pd.DataFrame:
+    """Agregación con pandas.resample (buckets desde la época, etiqueta izquierda)"""
+    df = pd.DataFrame(klines)
+    df.index = pd.to_datetime(df['open_time'], unit='ms')
+    return df.resample(rule, origin='epoch', label='left', closed='left').agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum',
+        'quote_volume': 'sum', 'trades': 'sum', 'taker_buy_base': 'sum', 'taker_buy_quote': 'sum'
+    })
+
+
+def assert_same(actual: np.ndarray, expected: np.ndarray):
+    assert np.array_equal(actual['open_time'], expected['open_time'])
+    assert np.array_equal(actual['close_time'], expected['close_time'])
+    for field in KLINE_DTYPE.names:
+        assert np.allclose(actual[field], expected[field], rtol=1e-12, atol=0), field
+
+
+def main():
+    print("=== TEST DEL RESAMPLER DE TIMEFRAMES ===\n")
+    klines = base_klines(30 * 1440 + 437, seed=4)
+
+    print("1. Agregación vs pandas.resample (1m -> 5m, 15m, 1h, 4h)...")
+    for target, rule in (('5m', '5min'), ('15m', '15min'), ('1h', '1h'), ('4h', '4h')):
+        start = time.perf_counter()
+        candles = KlineResampler.resample(klines, '1m', target)
+        elapsed = (time.perf_counter() - start) * 1000
+        expected = pandas_reference(klines, rule)
+        # El primer bucket de pandas puede estar incompleto (se descarta)
+        expected = expected[expected.index >= pd.to_datetime(candles['open_time'][0], unit='ms')]
+        assert len(candles) == len(expected)
+        assert np.array_equal(candles['open_time'], expected.index.to_numpy().astype('datetime64[ms]').astype(np.int64))
+        for field in expected.columns:
+            assert np.allclose(candles[field], expected[field].to_numpy(), rtol=1e-12, atol=0), field
+        print(f"   {target}: {len(candles)} velas en {elapsed:.1f} ms")
+
+    print("\n2. Límites de Binance (candle_bounds) incluida la semana (lunes)...")
+    for target in ('4h', '1d', '1w'):
+        candles = KlineResampler.resample(klines, '1m', target)
+        for candle in candles:
+            assert BinanceClient.candle_bounds(target, int(candle['open_time'])) == \
+                (candle['open_time'], candle['close_time'])
+        first_bounds = BinanceClient.candle_bounds(target, int(klines['open_time'][0]))
+        assert candles['open_time'][0] >= first_bounds[0]
+    weekly = KlineResampler.resample(klines, '1m', '1w')
+    assert pd.to_datetime(weekly['open_time'], unit='ms').dayofweek.tolist() == [0] * len(weekly)
+    print("   OK")
+
+    print("\n3. Intervalos no compatibles...")
+    for base, target in (('5m', '3m'), ('3m', '5m'), ('1h', '1M'), ('3d', '1w')):
+        assert not KlineResampler.can_resample(base, target)
+        try:
+            KlineResampler(base, [target])
+            raise AssertionError("Debería fallar")
+        except ValueError:
+            pass
+    print("   OK")
+
+    print("\n4. Actualización incremental (vela en progreso + cierre) vs agregación completa...")
+    targets = ['5m', '15m', '1h', '4h']
+    seed_count = 3 * 1440 + 17
+    resampler = KlineResampler('1m', targets)
+    resampler.update(klines[:seed_count])
+    rng = np.random.default_rng(1)
+    start = time.perf_counter()
+    updates = 0
+    for i in range(seed_count, seed_count + 2000):
+        final = klines[i]
+        # Dos versiones en progreso de la vela antes de la definitiva
+        for fraction in (0.3, 0.7):
+            partial = final.copy()
+            partial['close'] = final['open'] + (final['close'] - final['open']) * fraction
+            partial['high'] = max(partial['open'], partial['close'])
+            partial['low'] = min(partial['open'], partial['close'])
+            partial['volume'] = final['volume'] * fraction
+            resampler.update(np.array([partial]))
+            updates += 1
+        resampler.update(klines[i:i + 1] if rng.random() < 0.9 else klines[i - 1:i + 1])
+        updates += 1
+    elapsed = (time.perf_counter() - start) / updates * 1e6
+    stop = seed_count + 2000
+    for target in targets:
+        expected = KlineResampler.resample(klines[:stop], '1m', target)
+        assert_same(resampler.candles(target), expected[-len(resampler.candles(target)):])
+    print(f"   {updates} actualizaciones | {elapsed:.0f} µs por actualización | idénticas")
+
+    print("\n5. ResamplingFeed: un stream de 1m alimenta todos los timeframes...")
+    events = []
+    feed = ResamplingFeed(lambda *event: events.append(event), '1m', ['15m', '1h'])
+    feed.prime('futures', 'ETHUSDT', klines[:seed_count])
+    for i in range(seed_count, seed_count + 240):
+        candle = {name: klines[i][name].item() for name in KLINE_DTYPE.names}
+        feed.handle_kline('futures', 'ETHUSDT', '1m', candle, True)
+    closed = {interval: [c['open_time'] for _, _, iv, c, done in events if iv == interval and done]
+              for interval in ('1m', '15m', '1h')}
+    assert len(closed['1m']) == 240
+    # 240 minutos consecutivos contienen exactamente 16 cierres de 15m y 4 de 1h
+    assert len(closed['15m']) == 16 and len(closed['1h']) == 4
+    expected_1h = KlineResampler.resample(klines[:seed_count + 240], '1m', '1h')
+    built = feed.candles('futures', 'ETHUSDT', '1h')
+    assert_same(built, expected_1h[-len(built):])
+    print(f"   velas cerradas emitidas: 1m={len(closed['1m'])}, 15m={len(closed['15m'])}, 1h={len(closed['1h'])}")
+
+    print("\n6. fetch_timeframes con base_interval (sin conexión)...")
+    markets = {False: base_klines(10 * 1440, seed=5), True: base_klines(10 * 1440, seed=6)}
+    five_minutes = {use_spot: KlineResampler.resample(k, '1m', '5m') for use_spot, k in markets.items()}
+    calls = []
+
+    def fake_sync(interval, limit, use_spot=False):
+        calls.append((interval, limit, use_spot))
+        return five_minutes[use_spot][-limit:]
+
+    analysis = TradingAnalysis(base_interval='5m')
+    analysis.sync_klines = fake_sync
+    frames = analysis.fetch_timeframes(['4h', '1h', '15m', '5m'], limit=50)
+    assert sorted(calls) == [('5m', 2400, False), ('5m', 2400, True)]
+    for interval, (df_futures, df_spot) in frames.items():
+        assert len(df_futures) == len(df_spot) == 50
+        expected = KlineResampler.resample(five_minutes[False], '5m', interval)[-50:]
+        assert np.array_equal(df_futures['open_time'].to_numpy(), expected['open_time'])
+        assert np.allclose(df_futures['close'].to_numpy(), expected['close'], rtol=0, atol=0)
+    print(f"   {len(frames)} timeframes x 2 mercados con {len(calls)} sincronizaciones de 5m")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la caché de respuestas de BinanceClient (_send con
+cache_ttl): caducidad por TTL y por cierre de vela, clave independiente del
+orden de los parámetros, deduplicación de solicitudes simultáneas idénticas
+y errores que no se guardan. _send_uncached se sustituye por un stub que
+cuenta las solicitudes (sin conexión a internet).
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.binance_client import BinanceClient
+from src.response_cache import ResponseCache
+
+
+class StubResponse:
+    def __init__(self, status_code: int, body: str):
+        self.status_code = status_code
+        self.text = body
+
+
+class StubClient(BinanceClient):
+    """BinanceClient con _send_uncached simulado: cuenta solicitudes y tarda `delay` segundos"""
+
+    def __init__(self, delay: float = 0.0, status_code: int = 200, error: Exception = None):
+        super().__init__()
+        self.delay = delay
+        self.status_code = status_code
+        self.error = error
+        self.calls = []
+        self._calls_lock = threading.Lock()
+
+    def _send_uncached(self, base_url, path, params, timeout):
+        with self._calls_lock:
+            self.calls.append(dict(params or {}))
+            number = len(self.calls)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return StubResponse(self.status_code, f"respuesta {number}")
+
+
+PATH = "/fapi/v1/klines"
+
+
+def send(client: StubClient, params: dict, cache_ttl: float = 10):
+    return client._send(client.BASE_URL, PATH, params, cache_ttl=cache_ttl)
+
+
+def main():
+    print("=== TEST DE CACHÉ DE RESPUESTAS ===\n")
+
+    print("1. Clave independiente del orden de los parámetros...")
+    client = StubClient()
+    first = send(client, {'symbol': 'ETHUSDT', 'interval': '1d', 'limit': 50})
+    second = send(client, {'limit': 50, 'interval': '1d', 'symbol': 'ETHUSDT'})
+    other = send(client, {'symbol': 'ETHUSDT', 'interval': '1d', 'limit': 51})
+    assert second is first and other is not first
+    assert len(client.calls) == 2
+    assert client.cache.stats() == {'hits': 1, 'misses': 2, 'coalesced': 0, 'entries': 2}
+    # Sin cache_ttl no se usa la caché
+    send(client, {'symbol': 'ETHUSDT', 'interval': '1d', 'limit': 50}, cache_ttl=0)
+    assert len(client.calls) == 3
+    print(f"   OK {client.cache.stats()}")
+
+    print("\n2. Caducidad por TTL...")
+    client = StubClient()
+    params = {'symbol': 'ETHUSDT', 'interval': '1d', 'limit': 50}
+    first = send(client, params, cache_ttl=0.2)
+    assert send(client, params, cache_ttl=0.2) is first
+    time.sleep(0.25)
+    assert send(client, params, cache_ttl=0.2) is not first
+    assert len(client.calls) == 2
+    print("   OK (reutilizada dentro del TTL, nueva solicitud al caducar)")
+
+    print("\n3. Caducidad al cierre de la vela en progreso (antes que el TTL)...")
+    client = StubClient()
+    # Reloj del servidor 150 ms antes del cierre de una vela de 5m
+    local_ms = int(time.time() * 1000)
+    _, close_time = BinanceClient.candle_bounds('5m', local_ms)
+    client.time_offset_ms = close_time - 150 - local_ms
+    params = {'symbol': 'ETHUSDT', 'interval': '5m', 'limit': 50}
+    first = send(client, params, cache_ttl=10)
+    assert send(client, params, cache_ttl=10) is first
+    time.sleep(0.2)
+    assert send(client, params, cache_ttl=10) is not first
+    assert len(client.calls) == 2
+    print("   OK (la respuesta no sobrevive al cierre de la vela)")
+
+    print("\n4. Solicitudes simultáneas idénticas: una sola solicitud...")
+    client = StubClient(delay=0.2)
+    params = {'symbol': 'ETHUSDT', 'interval': '1h', 'limit': 50}
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: send(client, params), range(8)))
+        others = list(executor.map(lambda i: send(client, {**params, 'limit': 60 + i % 2}), range(4)))
+    assert len({id(r) for r in responses}) == 1
+    assert len({id(r) for r in others}) == 2
+    assert len(client.calls) == 3
+    stats = client.cache.stats()
+    assert stats['misses'] == 3 and stats['coalesced'] + stats['hits'] == 9
+    print(f"   OK (12 llamadas -> {len(client.calls)} solicitudes) {stats}")
+
+    print("\n5. Errores: no se guardan y se propagan a todos los que esperan...")
+    client = StubClient(status_code=500)
+    send(client, params)
+    send(client, params)
+    assert len(client.calls) == 2 and client.cache.stats()['entries'] == 0
+
+    client = StubClient(delay=0.2, error=ConnectionError("sin conexión"))
+
+    def attempt(_):
+        try:
+            send(client, params)
+        except ConnectionError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        errors = list(executor.map(attempt, range(4)))
+    assert errors == ["sin conexión"] * 4 and len(client.calls) == 1
+    assert client.cache._in_flight == {}
+    print("   OK")
+
+    print("\n6. Error al calcular la caducidad: nadie queda esperando...")
+    cache = ResponseCache()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        time.sleep(0.2)
+        return "respuesta"
+
+    def broken_expiry(value):
+        raise ValueError("caducidad inválida")
+
+    def attempt_expiry(_):
+        try:
+            cache.get_or_fetch('clave', fetch, broken_expiry)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pending = [executor.submit(attempt_expiry, i) for i in range(4)]
+        errors = [future.result(timeout=5) for future in pending]
+    assert errors == ["caducidad inválida"] * 4 and len(fetches) == 1
+    assert cache._in_flight == {}
+    # Una llamada posterior vuelve a solicitar en lugar de bloquearse
+    assert cache.get_or_fetch('clave', fetch, lambda value: time.time() + 10) == "respuesta"
+    assert len(fetches) == 2
+    print("   OK")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
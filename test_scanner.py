@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script para probar el escáner multi-símbolo contra el servidor HTTP local
+de test_async_client.py (sin conexión a internet), incluidos los fallos de
+SPOT: par inexistente o sin velas (se usa FUTUROS) frente a errores reales.
+"""
+
+import asyncio
+import threading
+import time
+
+from aiohttp import web
+
+from analisis_tecnico import TradingAnalysis
+from src.rate_limiter import WeightScheduler
+from src.scanner import MarketScanner
+from test_async_client import build_klines, create_stand_in_app
+
+
+def create_spot_failure_app() -> web.Application:
+    """SPOT: NOSPOT no existe (-1121), EMPTY sin velas, BROKEN responde 500"""
+
+    async def futures_klines(request):
+        return web.json_response(build_klines(int(request.query.get('limit', 200))))
+
+    async def spot_klines(request):
+        symbol = request.query['symbol']
+        if symbol == 'NOSPOTUSDT':
+            return web.json_response({'code': -1121, 'msg': 'Invalid symbol.'}, status=400)
+        if symbol == 'EMPTYUSDT':
+            return web.json_response([])
+        if symbol == 'BROKENUSDT':
+            return web.json_response({'code': -1000, 'msg': 'Internal error'}, status=500)
+        return web.json_response(build_klines(int(request.query.get('limit', 200))))
+
+    app = web.Application()
+    app.router.add_get('/fapi/v1/klines', futures_klines)
+    app.router.add_get('/api/v3/klines', spot_klines)
+    return app
+
+
+def start_server_in_thread(delay: float, stats: dict, app_factory=None) -> str:
+    """Levanta el servidor local en un hilo con su propio event loop y devuelve su URL"""
+    ready = threading.Event()
+    holder = {}
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        runner = web.AppRunner(app_factory() if app_factory else create_stand_in_app(delay, stats))
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        loop.run_until_complete(site.start())
+        holder['port'] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{holder['port']}"
+
+
+def main():
+    print("=== TEST DE ESCÁNER MULTI-SÍMBOLO (servidor local) ===\n")
+
+    delay = 0.1
+    stats = {'requests': 0, 'connections': set()}
+    base_url = start_server_in_thread(delay, stats)
+    # El servidor local no limita el peso: registrar un límite alto para medir solo la concurrencia
+    WeightScheduler.for_host(base_url.split('//')[1], 1_000_000)
+
+    analysis = TradingAnalysis()
+    symbols = [f"SYM{i:03d}USDT" for i in range(300)]
+    intervals = ['4h', '1h', '15m']
+
+    scanner = MarketScanner(max_concurrency=50, base_url=base_url, spot_url=base_url)
+    start = time.perf_counter()
+    table, errors = scanner.scan(
+        symbols, intervals,
+        lambda interval, df_futures, df_spot, indicators: analysis.analyze_timeframe(
+            interval, limit=50, df_futures=df_futures, df_spot=df_spot, indicators=indicators
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"1. Símbolos: {len(table)} | errores: {len(errors)} | solicitudes: {stats['requests']}")
+    print(f"2. Duración: {elapsed:.1f}s (latencia simulada {delay}s, concurrencia 50)")
+    print(f"   Secuencial equivaldría a ~{stats['requests'] * delay:.0f}s")
+    print("\n3. Primeras filas del ranking:")
+    print(table.head(5).to_string(index=False))
+
+    assert len(table) == len(symbols) and not errors
+    assert elapsed < 300, "El escaneo no cabe en una vela de 5 minutos"
+
+    print("\n" + analysis.reporter.generate_scan_report(table.head(3), intervals, errors, elapsed))
+
+    print("4. Fallos de SPOT: solo un par inexistente o vacío usa FUTUROS...")
+    failure_url = start_server_in_thread(0, {}, create_spot_failure_app)
+    WeightScheduler.for_host(failure_url.split('//')[1], 1_000_000)
+    scanner = MarketScanner(max_concurrency=10, base_url=failure_url, spot_url=failure_url)
+    data, errors = asyncio.run(scanner.fetch_all_arrays(
+        ['ETHUSDT', 'NOSPOTUSDT', 'EMPTYUSDT', 'BROKENUSDT'], ['1h'], limit=50
+    ))
+    assert data[('ETHUSDT', '1h')][1] is not None
+    assert data[('NOSPOTUSDT', '1h')][1] is None and data[('EMPTYUSDT', '1h')][1] is None
+    assert ('BROKENUSDT', '1h') not in data and list(errors) == ['BROKENUSDT']
+    print(f"   OK (BROKENUSDT -> {errors['BROKENUSDT']})")
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Script para verificar analyze_volume_series y analyze_last_candles_series
+(vectorizadas, todas las velas) contra analyze_volume y analyze_last_candles
+aplicadas vela a vela. Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src.indicators import TechnicalIndicators
+from test_streaming_indicators import build_dataframe
+
+
+def main():
+    print("=== TEST DE ANÁLISIS DE VOLUMEN Y VELAS (SERIE COMPLETA) ===\n")
+
+    df = build_dataframe(400, seed=21)
+    volume = TechnicalIndicators.analyze_volume_series(df, 20)
+    candles = TechnicalIndicators.analyze_last_candles_series(df, 3)
+
+    print("1. Comparación vela a vela con las funciones originales...")
+    worst = 0.0
+    mismatched_labels = 0
+    for i in range(5, len(df)):
+        window = df.iloc[:i + 1]
+        expected_volume = TechnicalIndicators.analyze_volume(window, 20)
+        for key, value in expected_volume.items():
+            worst = max(worst, abs(value - volume[key].iloc[i]) / max(1.0, abs(value)))
+
+        expected_candles = TechnicalIndicators.analyze_last_candles(window, 3)
+        mismatched_labels += int(expected_candles['trend'] != candles['trend'].iloc[i])
+        mismatched_labels += int(expected_candles['volume_trend'] != candles['volume_trend'].iloc[i])
+        mismatched_labels += int(expected_candles['bullish_count'] != candles['bullish_count'].iloc[i])
+
+    print(f"   Volumen - diferencia relativa máxima: {worst:.2e}")
+    print(f"   Velas - etiquetas distintas: {mismatched_labels}")
+    print(f"   Tendencias: {candles['trend'].value_counts().to_dict()}")
+    assert worst < 1e-9
+    assert mismatched_labels == 0
+
+    print("\n2. Velocidad (1.000.000 de velas)...")
+    big = build_dataframe(1_000_000, seed=2)
+    start = time.perf_counter()
+    TechnicalIndicators.analyze_volume_series(big, 20)
+    TechnicalIndicators.analyze_last_candles_series(big, 3)
+    print(f"   Serie completa: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    for i in range(1000, 1200):
+        window = big.iloc[:i + 1]
+        TechnicalIndicators.analyze_volume(window, 20)
+        TechnicalIndicators.analyze_last_candles(window, 3)
+    per_bar = (time.perf_counter() - start) / 200
+    print(f"   Vela a vela: {per_bar * 1000:.2f} ms por vela (~{per_bar * len(big) / 60:.0f} min para toda la serie)")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script para verificar la versión vectorizada de SL/TP por ATR: valores
+idénticos a calculate_sl_tp_with_atr en ambas direcciones, códigos de límite
+(1.5% - 3.0%), selección por dirección y velocidad frente a llamadas por vela.
+Usa datos sintéticos (sin conexión a internet).
+"""
+
+import time
+
+import numpy as np
+
+from src.indicators import TechnicalIndicators
+
+
+def main():
+    print("=== TEST DE SL/TP VECTORIZADO ===\n")
+    rng = np.random.default_rng(11)
+    count = 20_000
+    price = rng.uniform(0.01, 60_000, count)
+    atr = price * rng.uniform(0.0, 0.03, count)
+
+    print("1. Arrays vs calculate_sl_tp_with_atr (LONG y SHORT)...")
+    levels = TechnicalIndicators.calculate_sl_tp_arrays(price, atr)
+    labels = {
+        TechnicalIndicators.SL_CLAMP_NONE: None,
+        TechnicalIndicators.SL_CLAMP_MAX: "MÁXIMO (3.0%)",
+        TechnicalIndicators.SL_CLAMP_MIN: "MÍNIMO (1.5%)"
+    }
+    for i in range(0, count, 7):
+        for side in ('long', 'short'):
+            expected = TechnicalIndicators.calculate_sl_tp_with_atr(price[i], atr[i], side.upper())
+            for key in ('sl', 'tp1', 'tp2'):
+                assert levels[f'{side}_{key}'][i] == expected[key], (i, side, key)
+            for key in ('sl_pct', 'tp1_pct', 'tp2_pct', 'sl_base_pct'):
+                assert levels[key][i] == expected[key], (i, key)
+            assert labels[int(levels['clamp'][i])] == expected['limite_aplicado']
+    clamps = {code: int((levels['clamp'] == code).sum()) for code in labels}
+    print(f"   OK | sin límite {clamps[0]}, máximo {clamps[1]}, mínimo {clamps[-1]}")
+
+    print("\n2. Límites exactos y ATR sin calcular (NaN)...")
+    edge = TechnicalIndicators.calculate_sl_tp_arrays(
+        np.array([100.0, 100.0, 100.0, 100.0]), np.array([0.75, 1.5, np.nan, 2.0])
+    )
+    assert edge['clamp'].tolist() == [0, 0, 0, 1]
+    assert edge['sl_pct'][0] == 1.5 and edge['sl_pct'][1] == 3.0 and edge['sl_pct'][3] == 3.0
+    assert np.isnan(edge['sl_pct'][2]) and np.isnan(edge['long_sl'][2])
+    print("   OK")
+
+    print("\n3. Selección por dirección de cada vela...")
+    direction = rng.choice(np.array([1, -1], dtype=np.int8), count)
+    selected = TechnicalIndicators.select_sl_tp(levels, direction)
+    for key in ('sl', 'tp1', 'tp2'):
+        expected = np.where(direction == 1, levels[f'long_{key}'], levels[f'short_{key}'])
+        assert np.array_equal(selected[key], expected)
+    assert np.all((selected['sl'] < price) == (direction == 1))
+    print("   OK")
+
+    print("\n4. Parámetros de estrategia distintos (multiplicador y límites)...")
+    custom = TechnicalIndicators.calculate_sl_tp_arrays(price, atr, atr_multiplier=1.5,
+                                                        min_sl_pct=1.0, max_sl_pct=2.0,
+                                                        tp1_ratio=1.2, tp2_ratio=3.0)
+    base = atr * 1.5 / price * 100
+    assert np.allclose(custom['sl_pct'], np.clip(base, 1.0, 2.0), rtol=1e-15)
+    assert np.allclose(custom['tp2_pct'], custom['sl_pct'] * 3.0, rtol=1e-15)
+    print("   OK")
+
+    print("\n5. Velocidad (todas las velas vs una llamada por vela)...")
+    start = time.perf_counter()
+    TechnicalIndicators.calculate_sl_tp_arrays(price, atr)
+    vector_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for i in range(count):
+        TechnicalIndicators.calculate_sl_tp_with_atr(price[i], atr[i], 'LONG')
+        TechnicalIndicators.calculate_sl_tp_with_atr(price[i], atr[i], 'SHORT')
+    scalar_ms = (time.perf_counter() - start) * 1000
+    print(f"   {count} velas x 2 direcciones: {vector_ms:.2f} ms vectorizado vs {scalar_ms:.0f} ms escalar")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
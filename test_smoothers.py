@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script para comparar los suavizados de src/smoothers (numba y NumPy) con
+pandas ewm(adjust=False) en 1.000.000 de velas sintéticas: resultados y velocidad.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from src import smoothers
+
+
+def pandas_reference(close: pd.Series, high: pd.Series, low: pd.Series) -> dict:
+    """Cálculo original con pandas (EMA 21, RSI 14 y ATR 14 de Wilder)"""
+    ema = close.ewm(span=21, adjust=False).mean()
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    rs = gain.ewm(alpha=1 / 14, adjust=False).mean() / loss.ewm(alpha=1 / 14, adjust=False).mean()
+    rsi = 100 - (100 / (1 + rs))
+
+    tr = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+    atr = tr.ewm(alpha=1 / 14, adjust=False).mean()
+
+    return {'ema': ema.to_numpy(), 'rsi': rsi.to_numpy(), 'atr': atr.to_numpy()}
+
+
+def backend_result(close: np.ndarray, high: np.ndarray, low: np.ndarray) -> dict:
+    return {
+        'ema': smoothers.ewm(close, 2 / 22),
+        'rsi': smoothers.wilder_rsi(close, 14),
+        'atr': smoothers.wilder_atr(high, low, close, 14)
+    }
+
+
+def max_relative_difference(expected: dict, actual: dict) -> float:
+    worst = 0.0
+    for name, reference in expected.items():
+        valid = ~np.isnan(reference)
+        assert np.array_equal(valid, ~np.isnan(actual[name])), name
+        diff = np.abs(actual[name][valid] - reference[valid]) / np.maximum(1.0, np.abs(reference[valid]))
+        worst = max(worst, float(diff.max()))
+    return worst
+
+
+def timed(function, *args, runs: int = 3) -> float:
+    """Mejor tiempo (ms) de varias ejecuciones"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("=== TEST DE SUAVIZADOS (EMA / WILDER) ===\n")
+    print(f"Backend por defecto: {smoothers.BACKEND}\n")
+
+    count = 1_000_000
+    rng = np.random.default_rng(1)
+    close = 3800 + np.cumsum(rng.normal(0, 4, count))
+    high = close + rng.uniform(0, 5, count)
+    low = close - rng.uniform(0, 5, count)
+    close_s, high_s, low_s = pd.Series(close), pd.Series(high), pd.Series(low)
+
+    expected = pandas_reference(close_s, high_s, low_s)
+    pandas_ms = timed(pandas_reference, close_s, high_s, low_s)
+    print(f"pandas: {pandas_ms:.0f} ms")
+
+    backends = ['numpy'] + (['numba'] if smoothers.njit is not None else [])
+    default = smoothers.BACKEND
+    try:
+        for backend in backends:
+            smoothers.set_backend(backend)
+            backend_result(close[:100], high[:100], low[:100])  # compilación JIT
+            worst = max_relative_difference(expected, backend_result(close, high, low))
+            backend_ms = timed(backend_result, close, high, low)
+            print(f"{backend}: {backend_ms:.0f} ms ({pandas_ms / backend_ms:.1f}x) | "
+                  f"diferencia relativa máxima {worst:.2e}")
+            assert worst < 1e-9
+    finally:
+        smoothers.set_backend(default)
+
+    if smoothers.njit is None:
+        print("\nnumba no está instalado: se usa el backend NumPy")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Script para verificar el reloj del servidor y los límites de vela calculados
+localmente: sync_time / server_now_ms con un /fapi/v1/time simulado (desfases
+positivos y negativos, caché del desfase, lecturas simultáneas desde varios
+hilos), candle_bounds exactamente en
+open_time, close_time y close_time + 1, alineamiento semanal (lunes 00:00 UTC)
+y should_update_timeframe cuando el reloj local va por delante del servidor.
+Sin conexión a internet.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from analisis_tecnico import TradingAnalysis
+from src.binance_client import BinanceClient
+
+
+class StubTimeClient(BinanceClient):
+    """BinanceClient cuyo /fapi/v1/time devuelve la hora local + `true_offset_ms` con latencia simétrica"""
+
+    def __init__(self, true_offset_ms: int, latency: float = 0.02):
+        super().__init__()
+        self.true_offset_ms = true_offset_ms
+        self.latency = latency
+        self.time_requests = 0
+
+    def get_server_time(self) -> int:
+        self.time_requests += 1
+        time.sleep(self.latency / 2)
+        server_time = int(time.time() * 1000) + self.true_offset_ms
+        time.sleep(self.latency / 2)
+        return server_time
+
+
+def utc_ms(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def main():
+    print("=== TEST DE RELOJ DEL SERVIDOR Y LÍMITES DE VELA ===\n")
+
+    print("1. candle_bounds en open_time, close_time y close_time + 1...")
+    reference = utc_ms(2025, 11, 3, 13, 47, 12) + 345
+    for interval, interval_ms in BinanceClient.INTERVAL_MS.items():
+        open_time, close_time = BinanceClient.candle_bounds(interval, reference)
+        assert open_time <= reference <= close_time and close_time - open_time == interval_ms - 1
+        assert BinanceClient.candle_bounds(interval, open_time) == (open_time, close_time), interval
+        assert BinanceClient.candle_bounds(interval, close_time) == (open_time, close_time), interval
+        assert BinanceClient.candle_bounds(interval, close_time + 1) == (close_time + 1, close_time + interval_ms), interval
+        assert BinanceClient.candle_bounds(interval, open_time - 1) == (open_time - interval_ms, open_time - 1), interval
+    assert BinanceClient.candle_bounds('4h', reference) == (utc_ms(2025, 11, 3, 12), utc_ms(2025, 11, 3, 16) - 1)
+    assert BinanceClient.candle_bounds('15m', reference)[0] == utc_ms(2025, 11, 3, 13, 45)
+    try:
+        BinanceClient.candle_bounds('1M', reference)
+        raise AssertionError("1M debería fallar")
+    except ValueError:
+        pass
+    print("   OK")
+
+    print("\n2. Velas semanales: abren el lunes 00:00 UTC...")
+    week_ms = BinanceClient.INTERVAL_MS['1w']
+    for timestamp in (utc_ms(2024, 1, 1), utc_ms(2024, 1, 7, 23, 59, 59) + 999, utc_ms(2025, 11, 5, 8),
+                      0, utc_ms(1969, 12, 28, 12)):
+        open_time, close_time = BinanceClient.candle_bounds('1w', timestamp)
+        opened = datetime.fromtimestamp(open_time / 1000, tz=timezone.utc)
+        assert opened.weekday() == 0 and opened.hour == opened.minute == opened.second == 0, opened
+        assert open_time <= timestamp <= close_time == open_time + week_ms - 1
+    # 2024-01-01 fue lunes: el domingo 23:59:59.999 es el último instante de esa vela
+    assert BinanceClient.candle_bounds('1w', utc_ms(2024, 1, 8) - 1) == (utc_ms(2024, 1, 1), utc_ms(2024, 1, 8) - 1)
+    assert BinanceClient.candle_bounds('1w', utc_ms(2024, 1, 8))[0] == utc_ms(2024, 1, 8)
+    # Antes del epoch (timestamps negativos) el alineamiento se mantiene
+    assert BinanceClient.candle_bounds('1w', -1)[0] == utc_ms(1969, 12, 29)
+    print("   OK")
+
+    print("\n3. sync_time con desfases positivos y negativos...")
+    for true_offset in (1234, -2500, 0):
+        client = StubTimeClient(true_offset)
+        offset = client.sync_time()
+        assert abs(offset - true_offset) <= 15, (offset, true_offset)
+        now = client.server_now_ms()
+        assert abs(now - (int(time.time() * 1000) + true_offset)) <= 15
+        print(f"   desfase real {true_offset:+d} ms -> estimado {offset:+d} ms")
+
+    print("\n4. server_now_ms reutiliza el desfase hasta que caduca...")
+    client = StubTimeClient(-800)
+    for _ in range(100):
+        client.server_now_ms()
+    assert client.time_requests == 1
+    client._time_synced_at -= BinanceClient.TIME_SYNC_INTERVAL + 1
+    client.server_now_ms()
+    assert client.time_requests == 2
+    print("   OK (1 solicitud para 100 lecturas; nueva solicitud al caducar)")
+
+    print("\n5. Primera lectura simultánea desde varios hilos (como fetch_timeframes)...")
+    client = StubTimeClient(-800, latency=0.1)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        readings = list(executor.map(lambda _: client.server_now_ms(), range(8)))
+    assert client.time_requests == 1
+    assert max(readings) - min(readings) < 200
+    # Al caducar el desfase, también una sola solicitud
+    client._time_synced_at -= BinanceClient.TIME_SYNC_INTERVAL + 1
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: client.server_now_ms(), range(8)))
+    assert client.time_requests == 2
+    print("   OK (8 hilos -> 1 solicitud a /fapi/v1/time, también al caducar)")
+
+    print("\n6. should_update_timeframe con el reloj local por delante del servidor...")
+    analysis = TradingAnalysis()
+    local_ms = int(time.time() * 1000)
+    local_open, _ = BinanceClient.candle_bounds('15m', local_ms)
+    # Servidor 1 s antes de la apertura de la vela local: sigue en la vela anterior
+    client = StubTimeClient(local_open - 1000 - local_ms, latency=0)
+    client.sync_time()
+    analysis.client = client
+    previous_close = local_open - 1
+    state = {'timeframes': {'15min': {'last_candle_close_time': previous_close}}}
+    assert not analysis.should_update_timeframe('15m', state)
+    state['timeframes']['15min']['last_candle_close_time'] = previous_close - BinanceClient.INTERVAL_MS['15m']
+    assert analysis.should_update_timeframe('15m', state)
+    print(f"   OK (desfase {client.time_offset_ms} ms: la vela sigue abierta en el servidor)")
+
+    print("\n✅ OK")
+
+
+if __name__ == "__main__":
+    main()